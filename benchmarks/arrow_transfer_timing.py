@@ -0,0 +1,106 @@
+"""
+Benchmark: result transfer from Postgres into pandas, DB-API vs COPY to Arrow
+Copies a mart (mart_company_performance by default) into a temporary table of
+N rows and reads it back three ways, reporting the median seconds of each:
+  - read_sql_query: pd.read_sql_query, as PortfolioStore.load does
+  - fetchall: cursor rows to DataFrame.from_records, the plain DB-API path
+  - copy_arrow: COPY ... TO STDOUT parsed by pyarrow (DB_ARROW_TRANSFER)
+
+Usage (with the database from .env populated and dbt built):
+    python benchmarks/arrow_transfer_timing.py [--rows 10000 100000 1000000]
+        [--table reporting.mart_company_performance] [--repeat 3]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pe_dashboard'))
+
+BENCH_TABLE = 'arrow_transfer_bench'
+
+def read_sql_query(conn, sql):
+    return pd.read_sql_query(sql, conn)
+
+def fetchall(conn, sql):
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+    finally:
+        cursor.close()
+
+def copy_arrow(conn, sql):
+    from arrow_transfer import read_arrow
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        return read_arrow(cursor, sql)
+    finally:
+        cursor.close()
+
+PATHS = {
+    'read_sql_query': read_sql_query,
+    'fetchall': fetchall,
+    'copy_arrow': copy_arrow,
+}
+
+def make_table(conn, source, rows):
+    """Temporary table of `rows` rows repeating the source table's rows"""
+    cursor = conn.connection.dbapi_connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE {BENCH_TABLE} AS
+        SELECT source.*
+        FROM {source} AS source
+        CROSS JOIN generate_series(1, ceil(%s::numeric / (SELECT count(*) FROM {source}))::int)
+        LIMIT %s
+    """, (rows, rows))
+    cursor.execute(f"ANALYZE {BENCH_TABLE}")
+    cursor.close()
+
+def time_path(read, conn, sql, repeat):
+    """(median seconds, frame MiB)"""
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        frame = read(conn, sql)
+        seconds.append(time.perf_counter() - start)
+    size = frame.memory_usage(deep=True).sum() / 2**20
+    del frame
+    return float(np.median(seconds)), size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--table', default='reporting.mart_company_performance')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from db_connection import get_db_engine
+
+    sql = f"SELECT * FROM {BENCH_TABLE}"
+    print(f"{'rows':>8}{'cols':>6}  {'path':<16}{'seconds':>9}{'rows/s':>12}{'frame (MiB)':>13}{'speedup':>9}")
+    with get_db_engine().connect() as conn:
+        for rows in args.rows:
+            make_table(conn, args.table, rows)
+            baseline = None
+            for name, read in PATHS.items():
+                seconds, size = time_path(read, conn, sql, args.repeat)
+                baseline = baseline or seconds
+                columns = len(read(conn, f"{sql} LIMIT 0").columns)
+                print(f"{rows:>8}{columns:>6}  {name:<16}{seconds:>9.3f}{rows / seconds:>12,.0f}"
+                      f"{size:>13.1f}{baseline / seconds:>8.1f}x")
+            conn.rollback()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: stg_budget_monthly_spread build time against companies x budget years
+Fills scratch copies of the model's sources with synthetic companies, a
+budget per company and year, and monthly revenue actuals, then runs the
+compiled model over them. A quarter of the companies get their own phasing
+profile and half of the industries one, so every kind of profile is used.
+Prints the median milliseconds per size and per thousand budget months; the
+latter stays flat when the model is linear in companies x months. The scratch
+schema is rolled back afterwards.
+
+Usage (with the database from .env reachable and dbt configured):
+    python benchmarks/budget_phasing_scaling.py [--companies 500 1000 2000 4000]
+        [--years 10] [--repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'pe_dashboard'))
+
+DBT_DIR = os.path.join(ROOT, 'dbt_pe')
+COMPILED_MODEL = os.path.join(DBT_DIR, 'target', 'compiled', 'dbt_pe', 'models', 'staging', 'stg_budget_monthly_spread.sql')
+SCHEMA = 'budget_phasing_scaling'
+INDUSTRIES = 8
+FIRST_YEAR = 2015
+
+def compile_model():
+    """The model's SQL with actuals phasing on, reading its sources and seed from SCHEMA"""
+    subprocess.run(
+        ['dbt', 'compile', '--select', 'stg_budget_monthly_spread', '--quiet',
+         '--vars', '{budget_phasing_from_actuals: true}'],
+        cwd=DBT_DIR, check=True, stdout=subprocess.DEVNULL
+    )
+    with open(COMPILED_MODEL) as f:
+        sql = f.read()
+    return (sql.replace('"raw_data".', f'"{SCHEMA}".')
+               .replace('"dbt_stg"."budget_phasing_profiles"', f'"{SCHEMA}"."budget_phasing_profiles"'))
+
+def make_sources(cursor, companies, years):
+    """Scratch sources: `companies` companies with budgets and actuals for `years` years"""
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in ('dim_company', 'dim_date', 'fact_financials_monthly', 'fact_budget'):
+        cursor.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE raw_data.{table} INCLUDING DEFAULTS)")
+    cursor.execute(f"CREATE TABLE {SCHEMA}.budget_phasing_profiles (LIKE dbt_stg.budget_phasing_profiles)")
+
+    cursor.execute(f"""
+        INSERT INTO {SCHEMA}.dim_company (company_id, company_name, industry)
+        SELECT 'S' || lpad(i::text, 5, '0'), 'Synthetic ' || i, 'Industry ' || i %% {INDUSTRIES}
+        FROM generate_series(1, %s) i
+    """, (companies,))
+    cursor.execute(f"""
+        INSERT INTO {SCHEMA}.dim_date (date_id, date, year, month, quarter, year_month,
+            month_name, day_of_week, is_month_end, is_quarter_end, is_year_end)
+        SELECT to_char(d, 'YYYYMMDD')::int, d, extract(year FROM d), extract(month FROM d),
+            extract(quarter FROM d), to_char(d, 'YYYY-MM'), to_char(d, 'FMMonth'),
+            extract(dow FROM d), false, false, false
+        FROM generate_series(make_date(%s, 1, 1), make_date(%s, 12, 1), interval '1 month') d
+    """, (FIRST_YEAR, FIRST_YEAR + years - 1))
+    cursor.execute(f"""
+        INSERT INTO {SCHEMA}.fact_financials_monthly (company_id, date_id, revenue, currency)
+        SELECT c.company_id, d.date_id, round((50 + 20 * sin(d.month) + random() * 10)::numeric, 2), 'EUR'
+        FROM {SCHEMA}.dim_company c
+        CROSS JOIN {SCHEMA}.dim_date d
+    """)
+    cursor.execute(f"""
+        INSERT INTO {SCHEMA}.fact_budget (company_id, fiscal_year, currency,
+            revenue_budget, ebitda_budget, cash_from_ops_budget, capex_budget, net_debt_budget)
+        SELECT c.company_id, y, 'EUR', 700, 140, 100, 50, 400
+        FROM {SCHEMA}.dim_company c
+        CROSS JOIN generate_series(%s, %s) y
+    """, (FIRST_YEAR, FIRST_YEAR + years - 1))
+    cursor.execute(f"""
+        INSERT INTO {SCHEMA}.budget_phasing_profiles (scope, scope_id, month, weight)
+        SELECT 'default', null, m, 1 FROM generate_series(1, 12) m
+        UNION ALL
+        SELECT 'industry', 'Industry ' || i, m, 1 + (m + i) % 4
+        FROM generate_series(0, {INDUSTRIES // 2 - 1}) i CROSS JOIN generate_series(1, 12) m
+        UNION ALL
+        SELECT 'company', company_id, m, 1 + m % 3
+        FROM {SCHEMA}.dim_company CROSS JOIN generate_series(1, 12) m
+        WHERE right(company_id, 1) IN ('0', '4')
+    """)
+    for table in ('dim_company', 'dim_date', 'fact_financials_monthly', 'fact_budget', 'budget_phasing_profiles'):
+        cursor.execute(f"ANALYZE {SCHEMA}.{table}")
+
+def time_model(cursor, sql, repeat):
+    """(median milliseconds, rows, {phasing_profile: budget months})"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(f"CREATE TEMPORARY TABLE phased AS {sql}")
+        seconds.append(time.perf_counter() - start)
+        cursor.execute("SELECT phasing_profile, count(*) FROM phased GROUP BY 1")
+        profiles = dict(cursor.fetchall())
+        cursor.execute("DROP TABLE phased")
+    return float(np.median(seconds)) * 1000, sum(profiles.values()), profiles
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--companies', type=int, nargs='+', default=[500, 1000, 2000, 4000])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    import psycopg2
+    from db_connection import get_connection_string
+
+    sql = compile_model()
+    conn = psycopg2.connect(get_connection_string())
+    try:
+        cursor = conn.cursor()
+        print(f"{'companies':>10}{'years':>7}{'budget months':>15}{'ms':>10}{'ms / 1k months':>16}  profiles")
+        for companies in args.companies:
+            make_sources(cursor, companies, args.years)
+            ms, rows, profiles = time_model(cursor, sql, args.repeat)
+            print(f"{companies:>10}{args.years:>7}{rows:>15}{ms:>10.0f}{ms / rows * 1000:>16.1f}  "
+                  + ', '.join(f"{name} {count}" for name, count in sorted(profiles.items())))
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
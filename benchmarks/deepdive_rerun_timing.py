@@ -0,0 +1,166 @@
+"""
+Benchmark: Company Deep Dive script time per rerun
+Runs the deep-dive page with Streamlit's AppTest against a synthetic company
+(C001) with N years of monthly history, three KPIs and M comments, served
+from an in-memory PortfolioStore, and reports the first run and the median
+rerun time of the page script for each section. Pages without a section
+selector are timed as a whole. No database is needed.
+
+Usage:
+    python benchmarks/deepdive_rerun_timing.py [--years 10] [--comments 100 1000 5000]
+        [--reruns 5] [--page pe_dashboard/views/company_deepdive.py]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'pe_dashboard'))
+
+import data_store
+from data_store import DATASETS, PortfolioStore
+from streamlit.testing.v1 import AppTest
+
+KPI_NAMES = ['Homes Passed (000s)', 'ARPU (€ / month)', 'Churn Rate (%)']
+
+def pct_change(values, periods):
+    return (pd.Series(values).pct_change(periods) * 100).round(2).to_numpy()
+
+def synthetic_frames(years, comment_count, seed=0):
+    """Deep-dive datasets for one company, ending December 2024"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end='2024-12-01', periods=years * 12, freq='MS')
+    months = len(dates)
+    revenue = np.round(30 + np.cumsum(rng.normal(0.1, 1.0, months)).clip(-20), 2)
+    ebitda = np.round(revenue * rng.uniform(0.15, 0.30, months), 2)
+    gross_profit = np.round(revenue * rng.uniform(0.45, 0.55, months), 2)
+    ltm_ebitda = pd.Series(ebitda).rolling(12).sum().to_numpy()
+
+    base = pd.DataFrame({
+        'company_id': 'C001',
+        'date': dates,
+        'year': dates.year,
+        'month': dates.month,
+        'year_month': dates.strftime('%Y-%m'),
+    })
+    financials = base.assign(
+        company_name='Synthetic Co',
+        industry='Telecom Infrastructure',
+        employees=1200,
+        revenue=revenue,
+        gross_profit=gross_profit,
+        gross_margin_pct=np.round(gross_profit / revenue * 100, 2),
+        operating_expenses=np.round(gross_profit - ebitda, 2),
+        opex_pct_of_revenue=np.round((gross_profit - ebitda) / revenue * 100, 2),
+        ebitda=ebitda,
+        ebitda_margin=np.round(ebitda / revenue * 100, 2),
+        revenue_mom_growth_pct=pct_change(revenue, 1),
+        ebitda_mom_growth_pct=pct_change(ebitda, 1),
+        revenue_yoy_growth_pct=pct_change(revenue, 12),
+        ebitda_yoy_growth_pct=pct_change(ebitda, 12),
+        margin_change_bps=np.round(np.diff(ebitda / revenue, prepend=np.nan) * 10000, 0),
+        cash_conversion_pct=np.round(rng.uniform(60, 110, months), 1),
+        net_leverage_ratio=np.where(np.isnan(ltm_ebitda), np.nan, np.round(rng.uniform(1, 6, months), 2)),
+    )
+
+    budget_revenue = np.round(revenue * rng.uniform(0.9, 1.1, months), 2)
+    budget_ebitda = np.round(ebitda * rng.uniform(0.9, 1.1, months), 2)
+    by_year = base['year']
+    budget = base.assign(
+        actual_revenue=revenue,
+        budget_revenue=budget_revenue,
+        variance_revenue_pct=np.round((revenue / budget_revenue - 1) * 100, 1),
+        actual_ebitda=ebitda,
+        budget_ebitda=budget_ebitda,
+        variance_ebitda_pct=np.round((ebitda / budget_ebitda - 1) * 100, 1),
+        ytd_actual_revenue=pd.Series(revenue).groupby(by_year).cumsum().to_numpy(),
+        ytd_budget_revenue=pd.Series(budget_revenue).groupby(by_year).cumsum().to_numpy(),
+        ytd_actual_ebitda=pd.Series(ebitda).groupby(by_year).cumsum().to_numpy(),
+        ytd_budget_ebitda=pd.Series(budget_ebitda).groupby(by_year).cumsum().to_numpy(),
+    )
+    budget['ytd_variance_revenue_pct'] = np.round(
+        (budget['ytd_actual_revenue'] / budget['ytd_budget_revenue'] - 1) * 100, 1)
+    budget['ytd_variance_ebitda_pct'] = np.round(
+        (budget['ytd_actual_ebitda'] / budget['ytd_budget_ebitda'] - 1) * 100, 1)
+
+    kpis = pd.concat([
+        base.assign(kpi_name=name, kpi_value=np.round(rng.uniform(10, 100, months), 2))
+        for name in KPI_NAMES
+    ], ignore_index=True).sort_values(['date', 'kpi_name'], ignore_index=True)
+    kpis['mom_change_pct'] = kpis.groupby('kpi_name')['kpi_value'].pct_change().mul(100).round(2)
+    kpis['risk_flag'] = False
+
+    comments = pd.DataFrame({
+        'company_id': 'C001',
+        'comment_date': np.sort(rng.choice(dates.date, comment_count))[::-1],
+        'author': rng.choice(['A. Lindqvist', 'M. Berg', 'J. Novak'], comment_count),
+        'role': rng.choice(['Investment Director', 'Associate', 'CFO'], comment_count),
+        'comment_text': [f"Monthly review note {i}: trading in line with plan." for i in range(comment_count)],
+    })
+
+    frames = {
+        'financials': financials,
+        'budget_variance': budget,
+        'kpis': kpis,
+        'comments': comments,
+    }
+    for name, dataset in DATASETS.items():
+        frames.setdefault(name, pd.DataFrame({dataset.key: pd.Series(dtype=object)}))
+    return frames
+
+def time_runs(app, reruns):
+    """(first run, median rerun) seconds of the page script"""
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+    seconds = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        seconds.append(time.perf_counter() - start)
+    return first, float(np.median(seconds))
+
+def time_page(page, store, reruns):
+    """{section: (first run, median rerun)} for each deep-dive section"""
+    data_store.get_store = lambda: store
+    app = AppTest.from_file(page, default_timeout=600)
+    app.run()
+    try:
+        selector = app.radio(key='deepdive_section')
+    except KeyError:
+        return {'(whole page)': time_runs(AppTest.from_file(page, default_timeout=600), reruns)}
+
+    timings = {}
+    for section in selector.options:
+        app = AppTest.from_file(page, default_timeout=600)
+        app.session_state['deepdive_section'] = section
+        timings[section] = time_runs(app, reruns)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--comments', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--page', default=os.path.join(ROOT, 'pe_dashboard', 'views', 'company_deepdive.py'))
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(f"{'years':>6}{'comments':>10}  {'section':<26}{'first run (s)':>15}{'rerun p50 (s)':>15}")
+    for comment_count in args.comments:
+        store = PortfolioStore(synthetic_frames(args.years, comment_count), version=None)
+        for section, (first, rerun) in time_page(args.page, store, args.reruns).items():
+            print(f"{args.years:>6}{comment_count:>10}  {section:<26}{first:>15.3f}{rerun:>15.3f}")
+
+if __name__ == "__main__":
+    main()
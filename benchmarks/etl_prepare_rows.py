@@ -0,0 +1,132 @@
+"""
+Benchmark: row preparation in the ETL loaders
+Compares the original iterrows() preparation with the vectorized
+prepare_rows() layer on synthetic Financials_Monthly and KPIs_Monthly frames.
+
+Usage:
+    python benchmarks/etl_prepare_rows.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raw_data'))
+from etl_load_data import FINANCIALS_COLUMNS, KPI_COLUMNS, prepare_rows
+
+FINANCIAL_SOURCE_COLUMNS = [
+    source for _, source, cast in FINANCIALS_COLUMNS if cast == 'float'
+]
+
+KPI_NAMES = ['Homes Passed (000s)', 'ARPU (€ / month)', 'Churn Rate (%)']
+
+def synthetic_financials(n_rows, seed=0):
+    """Financials_Monthly-shaped frame with ~1% missing values"""
+    rng = np.random.default_rng(seed)
+    n_companies = max(1, n_rows // 120)
+    months = np.arange(n_rows) % 120
+    df = pd.DataFrame({
+        'CompanyID': [f"C{i:05d}" for i in np.arange(n_rows) // 120 % n_companies],
+        'YearMonth': [f"{2015 + m // 12}-{m % 12 + 1:02d}" for m in months],
+    })
+    for column in FINANCIAL_SOURCE_COLUMNS:
+        values = rng.normal(50, 20, n_rows).round(2)
+        values[rng.random(n_rows) < 0.01] = np.nan
+        df[column] = values
+    return df
+
+def synthetic_kpis(n_rows, seed=0):
+    """KPIs_Monthly-shaped (long format) frame"""
+    rng = np.random.default_rng(seed)
+    index = np.arange(n_rows)
+    months = index // len(KPI_NAMES) % 120
+    return pd.DataFrame({
+        'CompanyID': [f"C{i:05d}" for i in index // (120 * len(KPI_NAMES))],
+        'YearMonth': [f"{2015 + m // 12}-{m % 12 + 1:02d}" for m in months],
+        'KPI_Name': np.array(KPI_NAMES, dtype=object)[index % len(KPI_NAMES)],
+        'KPI_Value': rng.normal(100, 10, n_rows).round(4),
+    })
+
+def _legacy_date_id(year_month_str):
+    if pd.isna(year_month_str):
+        return None
+    try:
+        date = datetime.strptime(str(year_month_str), '%Y-%m')
+        return int(date.strftime('%Y%m%d'))
+    except ValueError:
+        return None
+
+def legacy_financials(df):
+    """Original load_fact_financials preparation loop"""
+    rows = []
+    for _, row in df.iterrows():
+        date_id = _legacy_date_id(row.get('YearMonth'))
+        if date_id is None:
+            continue
+        rows.append((row['CompanyID'], date_id) + tuple(
+            float(row[column]) if pd.notna(row.get(column)) else None
+            for column in FINANCIAL_SOURCE_COLUMNS
+        ) + ('EUR',))
+    return rows
+
+def legacy_kpis(df, kpi_mapping):
+    """Original load_fact_kpis preparation loop"""
+    rows = []
+    for _, row in df.iterrows():
+        date_id = _legacy_date_id(row.get('YearMonth'))
+        kpi_name = row.get('KPI_Name')
+        if date_id is None or kpi_name is None or kpi_name not in kpi_mapping:
+            continue
+        rows.append((
+            row['CompanyID'],
+            date_id,
+            kpi_mapping[kpi_name],
+            float(row['KPI_Value']) if pd.notna(row.get('KPI_Value')) else None
+        ))
+    return rows
+
+def vectorized_financials(df):
+    return prepare_rows(df.assign(Currency='EUR'), FINANCIALS_COLUMNS, required=('date_id',))
+
+def vectorized_kpis(df, kpi_mapping):
+    return prepare_rows(
+        df.assign(kpi_id=df['KPI_Name'].map(kpi_mapping)),
+        KPI_COLUMNS,
+        required=('date_id', 'kpi_id')
+    )
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    kpi_mapping = {name: i + 1 for i, name in enumerate(KPI_NAMES)}
+
+    print(f"{'frame':<12}{'rows':>10}{'iterrows (s)':>15}{'vectorized (s)':>17}{'speedup':>10}")
+    for size in args.sizes:
+        financials = synthetic_financials(size)
+        kpis = synthetic_kpis(size)
+
+        cases = [
+            ('financials', legacy_financials, vectorized_financials, (financials,)),
+            ('kpis', legacy_kpis, vectorized_kpis, (kpis, kpi_mapping)),
+        ]
+        for name, legacy, vectorized, args_ in cases:
+            legacy_time, legacy_rows = timed(legacy, *args_)
+            vector_time, vector_rows = timed(vectorized, *args_)
+            assert legacy_rows == vector_rows, f"{name}: prepared rows differ"
+            print(f"{name:<12}{size:>10,}{legacy_time:>15.3f}{vector_time:>17.3f}"
+                  f"{legacy_time / vector_time:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: peak memory of whole-sheet vs chunked fact loading
+Writes synthetic Financials_Monthly exports (CSV and Parquet) and measures
+the peak RSS of reading + preparing them whole or in chunks, each run in a
+fresh process. The database write is left out so only the pipeline's own
+memory is measured.
+
+Usage:
+    python benchmarks/etl_streaming_memory.py [--sizes 100000 1000000] [--chunk-sizes 10000 50000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'raw_data'))
+from etl_load_data import FINANCIALS_COLUMNS, prepare_frame
+from etl_prepare_rows import synthetic_financials
+from sheet_exports import SheetExport, iter_chunks
+
+def peak_rss_mib():
+    """High-water RSS of this process (VmHWM; unlike ru_maxrss it is not
+    inherited from the parent across exec)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available (Linux only)")
+
+def run_child(path, chunk_size):
+    """Read + prepare one export; print rows, seconds and peak RSS in MiB"""
+    start = time.perf_counter()
+    if chunk_size:
+        source = SheetExport(path, chunk_size)
+    else:
+        source = SheetExport(path).read()
+
+    rows = 0
+    for chunk in iter_chunks(source):
+        rows += len(prepare_frame(
+            chunk.assign(Currency='EUR'), FINANCIALS_COLUMNS, required=('date_id',)
+        ))
+    elapsed = time.perf_counter() - start
+    print(rows, elapsed, peak_rss_mib())
+
+def measure(path, chunk_size):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', path, str(chunk_size or 0)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return int(output[0]), float(output[1]), float(output[2])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[10_000, 50_000])
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'format':<9}{'rows':>11}{'chunk size':>12}{'seconds':>10}{'peak RSS (MiB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            df = synthetic_financials(size)
+            paths = {
+                'parquet': os.path.join(tmp, f"financials_{size}.parquet"),
+                'csv': os.path.join(tmp, f"financials_{size}.csv"),
+            }
+            df.to_parquet(paths['parquet'], index=False)
+            df.to_csv(paths['csv'], index=False)
+            del df
+
+            for export_format, path in paths.items():
+                for chunk_size in [None] + args.chunk_sizes:
+                    rows, seconds, peak = measure(path, chunk_size)
+                    assert rows == size, f"{export_format}: prepared {rows} of {size} rows"
+                    label = f"{chunk_size:,}" if chunk_size else 'whole'
+                    print(f"{export_format:<9}{size:>11,}{label:>12}{seconds:>10.2f}{peak:>16.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: deep-dive chart build and serialization time, with and without the figure cache
+For each chart (trends, budget vs actual, one KPI) on synthetic monthly
+series, times what st.plotly_chart costs per rerun:
+  - build: construct the figure, then convert and serialize it the way
+    st.plotly_chart does
+  - cached: load the figure from the FigureCache's JSON, then the same
+    conversion and serialization
+Series of WEBGL_MIN_POINTS or more are drawn with Scattergl.
+
+Usage:
+    python benchmarks/figure_build_timing.py [--years 10 100] [--repeat 20]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.io as pio
+import plotly.tools
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from deepdive_rerun_timing import synthetic_frames
+from charts import FigureCache, budget_figure, kpi_figure, trends_figure
+
+def serialize(fig):
+    """What st.plotly_chart does with a figure"""
+    figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+def time_ms(func, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(f"{'points':>7}  {'chart':<8}{'trace':<11}{'build (ms)':>11}{'cached (ms)':>12}{'json (KiB)':>11}")
+    for years in args.years:
+        frames = synthetic_frames(years, comment_count=0)
+        financials = frames['financials']
+        kpis = frames['kpis']
+        charts = {
+            'trends': lambda: trends_figure(financials),
+            'budget': lambda: budget_figure(frames['budget_variance']),
+            'kpi': lambda: kpi_figure(kpis[kpis['kpi_name'] == kpis['kpi_name'].iloc[0]]),
+        }
+
+        cache = FigureCache(max_bytes=256 * 1024 * 1024)
+        for chart_id, build in charts.items():
+            fig = cache.get('C001', chart_id, 'v1', build)
+            spec = serialize(fig)
+            build_ms = time_ms(lambda: serialize(build()), args.repeat)
+            cached_ms = time_ms(
+                lambda: serialize(cache.get('C001', chart_id, 'v1', build)), args.repeat
+            )
+            trace = type(fig.data[-1]).__name__
+            print(f"{len(financials):>7}  {chart_id:<8}{trace:<11}{build_ms:>11.2f}"
+                  f"{cached_ms:>12.2f}{len(spec) / 1024:>11.1f}")
+
+if __name__ == "__main__":
+    main()
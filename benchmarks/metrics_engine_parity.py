@@ -0,0 +1,169 @@
+"""
+Benchmark: NumPy metrics engine, parity with stg_financials_enhanced and speed
+Generates synthetic monthly financials (companies starting at different
+months, some with under a year of history, negative and zero values, nulls,
+rounding ties), runs the compiled stg_financials_enhanced model over them in
+a scratch schema that is rolled back afterwards, and compares every derived
+column with pe_dashboard/metrics_engine.py. Then times the engine on
+--companies x --months rows. Exits non-zero if any value differs.
+
+Usage (with the database from .env reachable and dbt configured):
+    python benchmarks/metrics_engine_parity.py [--parity-companies 200]
+        [--companies 1000] [--months 120] [--repeat 5]
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'pe_dashboard'))
+
+from metrics_engine import BASE_MEASURES, METRIC_COLUMNS, compute_metrics
+
+DBT_DIR = os.path.join(ROOT, 'dbt_pe')
+COMPILED_MODEL = os.path.join(DBT_DIR, 'target', 'compiled', 'dbt_pe', 'models', 'staging', 'stg_financials_enhanced.sql')
+SCHEMA = 'metrics_parity'
+
+def synthetic_base(companies, months, late_starts=True, seed=0):
+    """base_data-shaped rows: one per company and month, ending December 2024"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end='2024-12-01', periods=months, freq='MS')
+    # Later starts give some companies less than a year of history
+    starts = rng.choice([0, 0, 0, months // 2, months - 8], companies) if late_starts else np.zeros(companies, int)
+    company_index = np.repeat(np.arange(companies), months - starts)
+    date_index = np.concatenate([np.arange(start, months) for start in starts])
+    rows = len(company_index)
+
+    def money(scale):
+        return np.round(rng.normal(scale, scale * 0.6, rows), 2)
+
+    base = pd.DataFrame({
+        'company_id': np.char.add('S', np.char.zfill(company_index.astype(str), 5)),
+        'date': dates[date_index].date,
+        'year': dates.year[date_index],
+        'month': dates.month[date_index],
+        'quarter': dates.quarter[date_index],
+        'year_month': dates.strftime('%Y-%m')[date_index],
+    })
+    base['company_name'] = 'Synthetic ' + base['company_id']
+    base['industry'] = 'Synthetic'
+    employees = rng.choice([0, 50, 400, 1200], companies).astype(float)
+    employees[rng.random(companies) < 0.05] = np.nan
+    base['employees'] = employees[company_index]
+    for name in BASE_MEASURES:
+        base[name] = money(20.0)
+    base['ebitda_margin'] = np.round(rng.uniform(-60, 60, rows), 2)
+    base['revenue'] = np.where(rng.random(rows) < 0.03, 0.0, base['revenue'])
+    # Exact halves at the rounding digit: cash conversion 12.25 -> 12.3
+    ties = rng.random(rows) < 0.02
+    base.loc[ties, 'ebitda'] = 4.0
+    base.loc[ties, 'cash_from_ops'] = 0.49
+    for name in BASE_MEASURES:
+        base.loc[rng.random(rows) < 0.03, name] = np.nan
+    base['currency'] = 'EUR'
+    return base
+
+def compile_model():
+    """The model's full-refresh SQL, reading its sources from SCHEMA"""
+    subprocess.run(
+        ['dbt', 'compile', '--select', 'stg_financials_enhanced', '--full-refresh', '--quiet'],
+        cwd=DBT_DIR, check=True, stdout=subprocess.DEVNULL
+    )
+    with open(COMPILED_MODEL) as f:
+        return f.read().replace('"raw_data".', f'"{SCHEMA}".')
+
+def run_model(cursor, base, sql):
+    """Load base into scratch copies of the source tables and run the model"""
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in ('fact_financials_monthly', 'dim_company', 'dim_date'):
+        cursor.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE raw_data.{table})")
+
+    companies = base.drop_duplicates('company_id')
+    execute_values(cursor, f"""
+        INSERT INTO {SCHEMA}.dim_company (company_id, company_name, industry, employees) VALUES %s
+    """, [
+        (row.company_id, row.company_name, row.industry, None if pd.isna(row.employees) else int(row.employees))
+        for row in companies.itertuples()
+    ])
+
+    dates = base.drop_duplicates('date')
+    execute_values(cursor, f"""
+        INSERT INTO {SCHEMA}.dim_date (date_id, date, year, month, quarter, year_month,
+            month_name, day_of_week, is_month_end, is_quarter_end, is_year_end) VALUES %s
+    """, [
+        (int(row.date.strftime('%Y%m%d')), row.date, row.year, row.month, row.quarter, row.year_month,
+         row.date.strftime('%B'), row.date.isoweekday() % 7, False, False, False)
+        for row in dates.itertuples()
+    ])
+
+    columns = ['company_id', 'date_id'] + [
+        'ebitda_margin_pct' if name == 'ebitda_margin' else name for name in BASE_MEASURES
+    ] + ['currency']
+    values = base[BASE_MEASURES].astype(object).where(base[BASE_MEASURES].notna(), None)
+    execute_values(cursor, f"""
+        INSERT INTO {SCHEMA}.fact_financials_monthly (financial_id, {', '.join(columns)}) VALUES %s
+    """, [
+        (i, company_id, int(date.strftime('%Y%m%d')), *measures, 'EUR')
+        for i, (company_id, date, measures) in enumerate(
+            zip(base['company_id'], base['date'], values.itertuples(index=False, name=None)), start=1
+        )
+    ], page_size=5000)
+
+    cursor.execute(f"SELECT * FROM ({sql}) AS model ORDER BY company_id, date")
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+def compare(expected, actual):
+    """{column: number of rows that differ}"""
+    differences = {}
+    for column in METRIC_COLUMNS:
+        want = expected[column].to_numpy(dtype='float64', na_value=np.nan)
+        got = actual[column].to_numpy(dtype='float64', na_value=np.nan)
+        same = (np.isnan(want) & np.isnan(got)) | np.isclose(want, got, rtol=1e-12, atol=1e-9)
+        differences[column] = int((~same).sum())
+    return differences
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parity-companies', type=int, default=200)
+    parser.add_argument('--companies', type=int, default=1000)
+    parser.add_argument('--months', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    import psycopg2
+    from db_connection import get_connection_string
+
+    base = synthetic_base(args.parity_companies, args.months)
+    conn = psycopg2.connect(get_connection_string())
+    try:
+        expected = run_model(conn.cursor(), base, compile_model())
+    finally:
+        conn.rollback()
+        conn.close()
+    differences = compare(expected, compute_metrics(base))
+    mismatched = {column: count for column, count in differences.items() if count}
+    print(f"parity: {len(expected)} rows x {len(METRIC_COLUMNS)} columns, "
+          f"{'all equal' if not mismatched else f'differences {mismatched}'}")
+
+    base = synthetic_base(args.companies, args.months, late_starts=False, seed=1)
+    seconds = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        compute_metrics(base)
+        seconds.append(time.perf_counter() - start)
+    print(f"compute_metrics: {args.companies} companies x {args.months} months ({len(base)} rows) "
+          f"in {np.median(seconds) * 1000:.1f} ms (median of {args.repeat})")
+    sys.exit(1 if mismatched else 0)
+
+if __name__ == "__main__":
+    main()
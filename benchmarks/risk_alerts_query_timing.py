@@ -0,0 +1,127 @@
+"""
+Benchmark: portfolio-wide risk screening, three flag tables vs mart_risk_alerts
+Copies stg_financials_enhanced, stg_kpis_analysis, mart_budget_variance and
+mart_risk_alerts into temporary tables with each company repeated N times
+(under a new company id), indexed as dbt indexes them, and times the query
+listing every company's flags in its latest month two ways:
+  - flag_tables: latest month per company from each table, then its flags
+  - risk_alerts: the current alerts the dashboard's store loads (partial index)
+Prints the median milliseconds and the plan's top scan of each.
+
+Usage (with the database from .env populated and dbt built):
+    python benchmarks/risk_alerts_query_timing.py [--copies 10 100 1000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pe_dashboard'))
+
+TABLES = {
+    'bench_financials': 'dbt_stg.stg_financials_enhanced',
+    'bench_kpis': 'dbt_stg.stg_kpis_analysis',
+    'bench_budget_variance': 'reporting.mart_budget_variance',
+    'bench_risk_alerts': 'reporting.mart_risk_alerts',
+}
+
+FLAG_TABLES_SQL = """
+    WITH latest_financials AS (
+        SELECT DISTINCT ON (company_id) *
+        FROM bench_financials
+        ORDER BY company_id, date DESC
+    ),
+    latest_kpis AS (
+        SELECT k.*
+        FROM bench_kpis k
+        JOIN (SELECT company_id, max(date) AS date FROM bench_kpis GROUP BY company_id) l
+            USING (company_id, date)
+    ),
+    latest_budget AS (
+        SELECT DISTINCT ON (company_id) *
+        FROM bench_budget_variance
+        ORDER BY company_id, date DESC
+    )
+    SELECT company_id, date, 'revenue_risk_flag' AS flag FROM latest_financials WHERE revenue_risk_flag
+    UNION ALL SELECT company_id, date, 'margin_risk_flag' FROM latest_financials WHERE margin_risk_flag
+    UNION ALL SELECT company_id, date, 'leverage_risk_flag' FROM latest_financials WHERE leverage_risk_flag
+    UNION ALL SELECT company_id, date, 'liquidity_risk_flag' FROM latest_financials WHERE liquidity_risk_flag
+    UNION ALL SELECT company_id, date, 'risk_flag' FROM latest_kpis WHERE risk_flag
+    UNION ALL SELECT company_id, date, 'budget_risk_flag' FROM latest_budget WHERE budget_risk_flag
+"""
+
+RISK_ALERTS_SQL = """
+    SELECT *
+    FROM bench_risk_alerts
+    WHERE is_current
+    ORDER BY company_id, source
+"""
+
+def make_tables(cursor, copies):
+    """Temporary copies of TABLES with each company repeated `copies` times"""
+    for bench, source in TABLES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {bench}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {bench} (LIKE {source})")
+        columns = [column.name for column in _columns(cursor, source)]
+        select = ', '.join(
+            "t.company_id || '_' || n" if column == 'company_id' else f"t.{column}" for column in columns
+        )
+        cursor.execute(f"""
+            INSERT INTO {bench} ({', '.join(columns)})
+            SELECT {select}
+            FROM {source} t
+            CROSS JOIN generate_series(1, %s) n
+        """, (copies,))
+        cursor.execute(f"CREATE INDEX ON {bench} (company_id, date)")
+    cursor.execute("CREATE INDEX ON bench_risk_alerts (company_id, source) WHERE is_current")
+    for bench in TABLES:
+        cursor.execute(f"ANALYZE {bench}")
+
+def _columns(cursor, table):
+    cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+    return cursor.description
+
+def time_query(cursor, sql, repeat):
+    """(median milliseconds, rows, top scan node of the plan)"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql)
+        rows = len(cursor.fetchall())
+        seconds.append(time.perf_counter() - start)
+    cursor.execute(f"EXPLAIN (COSTS OFF) {sql}")
+    plan = [row[0].strip(' ->') for row in cursor.fetchall()]
+    scans = [line for line in plan if 'Scan' in line]
+    return float(np.median(seconds)) * 1000, rows, scans[0] if scans else plan[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copies', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    import psycopg2
+    from db_connection import get_connection_string
+
+    conn = psycopg2.connect(get_connection_string())
+    try:
+        cursor = conn.cursor()
+        print(f"{'copies':>7}{'companies':>11}  {'query':<13}{'ms':>9}{'rows':>7}  plan")
+        for copies in args.copies:
+            make_tables(cursor, copies)
+            cursor.execute("SELECT count(DISTINCT company_id) FROM bench_financials")
+            companies = cursor.fetchone()[0]
+            for name, sql in (('flag_tables', FLAG_TABLES_SQL), ('risk_alerts', RISK_ALERTS_SQL)):
+                ms, rows, scan = time_query(cursor, sql, args.repeat)
+                print(f"{copies:>7}{companies:>11}  {name:<13}{ms:>9.1f}{rows:>7}  {scan}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
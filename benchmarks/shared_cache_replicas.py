@@ -0,0 +1,111 @@
+"""
+Benchmark: dashboard replicas warming up with and without the shared cache
+Starts N processes at once, each loading the in-memory portfolio store the
+way a freshly restarted replica does, and reports the load time and how many
+table scans the database served (from pg_stat_user_tables). Without
+DASHBOARD_CACHE_DIR every replica reads every dataset; with it the first
+replica per dataset reads and the others wait for its Parquet file.
+
+Usage (with the database from .env populated and dbt built):
+    python benchmarks/shared_cache_replicas.py [--replicas 1 4 8]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pe_dashboard')
+
+SCAN_QUERY = """
+    SELECT coalesce(sum(seq_scan + coalesce(idx_scan, 0)), 0)
+    FROM pg_stat_user_tables
+    WHERE schemaname || '.' || relname = ANY(%s)
+"""
+
+def replica(cache_dir, version, ready, start_event, results):
+    """One replica start: load the store and report the seconds it took"""
+    if cache_dir:
+        os.environ['DASHBOARD_CACHE_DIR'] = cache_dir
+    sys.path.append(DASHBOARD_DIR)
+    logging.disable(logging.WARNING)
+    from data_store import PortfolioStore
+    from db_connection import get_db_engine
+
+    engine = get_db_engine()
+    engine.connect().close()
+    ready.put(os.getpid())
+    start_event.wait()
+    start = time.perf_counter()
+    PortfolioStore.load(engine, version)
+    results.put(time.perf_counter() - start)
+    engine.dispose()
+
+def table_scans(tables):
+    from db_connection import get_connection_string
+    import psycopg2
+
+    conn = psycopg2.connect(get_connection_string())
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SCAN_QUERY, (tables,))
+        return int(cursor.fetchone()[0])
+    finally:
+        conn.close()
+
+def run(replicas, cache_dir, version, tables):
+    context = multiprocessing.get_context('spawn')
+    start_event = context.Event()
+    ready = context.Queue()
+    results = context.Queue()
+    processes = [
+        context.Process(target=replica, args=(cache_dir, version, ready, start_event, results))
+        for _ in range(replicas)
+    ]
+    for process in processes:
+        process.start()
+    # Let the replicas import and connect before starting the clock
+    for _ in processes:
+        ready.get()
+
+    scans_before = table_scans(tables)
+    start = time.perf_counter()
+    start_event.set()
+    seconds = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    # Backends flush their statistics on exit
+    time.sleep(1)
+    return elapsed, np.array(seconds), table_scans(tables) - scans_before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--replicas', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    sys.path.append(DASHBOARD_DIR)
+    logging.disable(logging.WARNING)
+    from data_store import DATASETS
+    from db_connection import get_data_version
+
+    version = get_data_version()
+    tables = [dataset.table for dataset in DATASETS.values()]
+
+    print(f"{'replicas':>8}  {'cache':<8}{'wall (s)':>10}{'p50 (s)':>9}{'max (s)':>9}{'db scans':>10}")
+    for replicas in args.replicas:
+        for mode in ('none', 'shared'):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                elapsed, seconds, scans = run(
+                    replicas, cache_dir if mode == 'shared' else None, version, tables
+                )
+            print(f"{replicas:>8}  {mode:<8}{elapsed:>10.2f}{np.median(seconds):>9.2f}"
+                  f"{seconds.max():>9.2f}{scans:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+{#
+    Query plans of stg_financials_enhanced (full refresh) before and after
+    its window passes were merged into one CTE with named WINDOW clauses.
+
+    Recorded on PostgreSQL 16.2 with synthetic sources of 1,000 companies x
+    120 months (120,000 rows; see benchmarks/metrics_engine_parity.py), via
+        dbt compile --select stg_financials_enhanced --full-refresh
+        EXPLAIN (ANALYZE, COSTS OFF) <target/compiled/.../stg_financials_enhanced.sql>
+    Join and scan nodes below the windows are the same in both and omitted.
+
+    Before: three WindowAgg nodes (lags, LTM, YTD), two sorts, and four
+    InitPlans each scanning base_data again for max(year). 2,103 ms.
+
+    Subquery Scan on with_ytd (actual time=504.481..2094.273 rows=120000 loops=1)
+      ->  WindowAgg (actual time=504.454..1418.375 rows=120000 loops=1)
+            InitPlan 2 (returns $1)
+              ->  Aggregate (actual time=32.121..32.123 rows=1 loops=1)
+                    ->  CTE Scan on base_data base_data_1 (actual time=0.015..17.747 rows=120000 loops=1)
+            InitPlan 3 (returns $2)
+              ->  Aggregate (actual time=29.978..29.979 rows=1 loops=1)
+                    ->  CTE Scan on base_data base_data_2 (actual time=0.008..16.839 rows=120000 loops=1)
+            InitPlan 4 (returns $3)
+              ->  Aggregate (actual time=22.137..22.139 rows=1 loops=1)
+                    ->  CTE Scan on base_data base_data_3 (actual time=0.003..12.348 rows=120000 loops=1)
+            InitPlan 5 (returns $4)
+              ->  Aggregate (actual time=22.734..22.735 rows=1 loops=1)
+                    ->  CTE Scan on base_data base_data_4 (actual time=0.003..12.658 rows=120000 loops=1)
+            ->  Incremental Sort (actual time=397.442..1094.856 rows=120000 loops=1)
+                  Sort Key: with_rolling.company_id, with_rolling.year, with_rolling.date
+                  Presorted Key: with_rolling.company_id
+                  ->  Subquery Scan on with_rolling (actual time=396.547..972.404 rows=120000 loops=1)
+                        ->  WindowAgg (actual time=396.545..946.727 rows=120000 loops=1)
+                              ->  Subquery Scan on with_lag (actual time=396.516..632.184 rows=120000 loops=1)
+                                    ->  WindowAgg (actual time=396.514..612.081 rows=120000 loops=1)
+                                          ->  Sort (actual time=396.494..426.012 rows=120000 loops=1)
+                                                Sort Key: base_data.company_id, base_data.date
+                                                Sort Method: external merge  Disk: 20560kB
+                                                ->  CTE Scan on base_data (actual time=0.406..288.773 rows=120000 loops=1)
+    Execution Time: 2103.121 ms
+
+    After: both named windows sort by (company_id, year, date), so one sort
+    feeds two stacked WindowAggs, and max(year) is one Aggregate. 1,761 ms.
+
+    Subquery Scan on windowed (actual time=363.140..1748.309 rows=120000 loops=1)
+      ->  WindowAgg (actual time=363.114..1054.240 rows=120000 loops=1)
+            ->  WindowAgg (actual time=363.088..762.973 rows=120000 loops=1)
+                  ->  Sort (actual time=363.054..392.550 rows=120000 loops=1)
+                        Sort Key: base_data.company_id, base_data.year, base_data.date
+                        Sort Method: external merge  Disk: 21216kB
+                        ->  Nested Loop (actual time=208.283..262.081 rows=120000 loops=1)
+                              ->  Aggregate (actual time=208.262..208.264 rows=1 loops=1)
+                                    ->  CTE Scan on base_data base_data_1 (actual time=0.477..196.566 rows=120000 loops=1)
+                              ->  CTE Scan on base_data (actual time=0.014..18.727 rows=120000 loops=1)
+    Execution Time: 1760.959 ms
+#}
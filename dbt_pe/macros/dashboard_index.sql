@@ -0,0 +1,48 @@
+{#
+    Post-hook creating a btree index on the columns the dashboard filters and
+    sorts by, optionally CLUSTERing the table on it, then ANALYZE so the
+    planner has statistics for the freshly built table.
+
+    Usage in a model config:
+        post_hook="{{ dashboard_index(['company_id', 'date'], cluster=true) }}"
+
+    With where, the index is partial: it only holds the rows matching that
+    predicate, for queries that filter on it.
+
+    The index name includes a hash of the run start time because the previous
+    version of the table (and its indexes) still exists while the hook runs.
+    Incremental models keep their table between runs, so the index is only
+    created (and the table only clustered) when the table was built from
+    scratch; CLUSTER rewrites the whole table.
+#}
+{% macro dashboard_index(columns, cluster=false, where=none) -%}
+
+    {%- set prefix = this.identifier ~ '_' ~ columns | join('_') ~ ('_partial' if where else '') -%}
+    {%- set index_name = prefix ~ '_' ~ local_md5(run_started_at | string)[:8] -%}
+
+    {%- set has_index = false -%}
+    {%- if execute -%}
+        {%- set existing = run_query(
+            "select count(*) from pg_indexes"
+            ~ " where schemaname = '" ~ this.schema ~ "'"
+            ~ " and tablename = '" ~ this.identifier ~ "'"
+            ~ " and indexname ~ '^" ~ prefix ~ "_[0-9a-f]{8}$'"
+        ) -%}
+        {%- set has_index = existing.columns[0].values()[0] > 0 -%}
+    {%- endif -%}
+
+    {%- if not has_index %}
+    create index "{{ index_name }}"
+        on {{ this }} ({{ columns | join(', ') }})
+        {%- if where %}
+        where {{ where }}
+        {%- endif %};
+
+    {%- if cluster %}
+    cluster {{ this }} using "{{ index_name }}";
+    {%- endif %}
+    {%- endif %}
+
+    analyze {{ this }};
+
+{%- endmacro %}
@@ -0,0 +1,61 @@
+{#
+    Fund-level aggregates of mart_company_performance rows: company count,
+    totals, weighted and mean margins, LTM sums, the spread of net leverage
+    and risk flag counts. Used in the select list of a query grouped by fund
+    (and month, in mart_fund_summary).
+#}
+{% macro fund_rollup_columns() %}
+    count(*) as company_count,
+
+    -- Totals
+    sum(revenue) as total_revenue,
+    sum(ebitda) as total_ebitda,
+    sum(net_income) as total_net_income,
+    sum(cash_from_ops) as total_cash_from_ops,
+    sum(capex) as total_capex,
+    sum(net_debt) as total_net_debt,
+
+    -- Margins: revenue-weighted, and the simple mean across companies
+    case
+        when sum(revenue) > 0 then
+            round((sum(ebitda) / sum(revenue) * 100)::numeric, 2)
+        else null
+    end as weighted_ebitda_margin,
+    round(avg(ebitda_margin)::numeric, 2) as avg_ebitda_margin,
+    case
+        when sum(revenue) > 0 then
+            round((sum(gross_profit) / sum(revenue) * 100)::numeric, 2)
+        else null
+    end as weighted_gross_margin_pct,
+
+    -- LTM sums
+    sum(ltm_revenue) as total_ltm_revenue,
+    sum(ltm_ebitda) as total_ltm_ebitda,
+    case
+        when sum(ltm_revenue) > 0 then
+            round((sum(ltm_ebitda) / sum(ltm_revenue) * 100)::numeric, 2)
+        else null
+    end as ltm_ebitda_margin,
+
+    -- Leverage distribution (companies with a full LTM window)
+    case
+        when sum(ltm_ebitda) filter (where net_leverage_ratio is not null) > 0 then
+            round((sum(net_debt) filter (where net_leverage_ratio is not null)
+                   / sum(ltm_ebitda) filter (where net_leverage_ratio is not null))::numeric, 2)
+        else null
+    end as portfolio_net_leverage,
+    min(net_leverage_ratio) as min_net_leverage,
+    round(percentile_cont(0.25) within group (order by net_leverage_ratio)::numeric, 2) as p25_net_leverage,
+    round(percentile_cont(0.5) within group (order by net_leverage_ratio)::numeric, 2) as median_net_leverage,
+    round(percentile_cont(0.75) within group (order by net_leverage_ratio)::numeric, 2) as p75_net_leverage,
+    max(net_leverage_ratio) as max_net_leverage,
+
+    -- Risk flag counts
+    count(*) filter (where revenue_risk_flag) as revenue_risk_count,
+    count(*) filter (where margin_risk_flag) as margin_risk_count,
+    count(*) filter (where leverage_risk_flag) as leverage_risk_count,
+    count(*) filter (where liquidity_risk_flag) as liquidity_risk_count,
+    count(*) filter (
+        where revenue_risk_flag or margin_risk_flag or leverage_risk_flag or liquidity_risk_flag
+    ) as flagged_company_count
+{% endmacro %}
@@ -0,0 +1,35 @@
+{#
+    on-run-end hook: append one row per dbt run/build to reporting.dbt_run_log
+    and announce it on the data_version NOTIFY channel (shared with the ETL's
+    raw_data.etl_run_log). The dashboard keys its caches on the latest logged
+    runs, so it only ever swaps in data from a finished run.
+#}
+{% macro record_dbt_run(results) -%}
+
+    {%- if execute and flags.WHICH in ('run', 'build') -%}
+
+        {%- set models_built = results | selectattr('node.resource_type', 'equalto', 'model')
+                                       | selectattr('status', 'equalto', 'success') | list | length -%}
+        {%- set errors = results | selectattr('status', 'in', ['error', 'fail']) | list | length -%}
+
+        create table if not exists reporting.dbt_run_log (
+            invocation_id varchar(64) primary key,
+            run_started_at timestamp not null,
+            finished_at timestamp not null default now(),
+            models_built integer not null,
+            errors integer not null
+        );
+
+        insert into reporting.dbt_run_log (invocation_id, run_started_at, models_built, errors)
+        values (
+            '{{ invocation_id }}',
+            '{{ run_started_at }}'::timestamp,
+            {{ models_built }},
+            {{ errors }}
+        );
+
+        select pg_notify('data_version', 'dbt:{{ invocation_id }}');
+
+    {%- endif -%}
+
+{%- endmacro %}
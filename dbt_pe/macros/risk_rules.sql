@@ -0,0 +1,86 @@
+{#
+    Risk rules from seeds/risk_rules.csv, evaluated with one join of the
+    rules against the rows they apply to, so adding a rule or changing a
+    threshold is a seed change rather than a model change.
+
+    risk_rule_subjects() lists, per subject, the columns rules may compare
+    (metrics) and the flag columns they can set (flags).
+#}
+{% macro risk_rule_subjects() %}
+    {{ return({
+        'financials': {
+            'metrics': [
+                'revenue_mom_growth_pct', 'ebitda_mom_growth_pct', 'revenue_yoy_growth_pct',
+                'ebitda_yoy_growth_pct', 'margin_change_bps', 'ebitda_margin', 'gross_margin_pct',
+                'opex_pct_of_revenue', 'cash_conversion_pct', 'net_leverage_ratio', 'capex_intensity_pct'
+            ],
+            'flags': ['revenue_risk_flag', 'margin_risk_flag', 'leverage_risk_flag', 'liquidity_risk_flag'],
+        },
+        'kpi': {
+            'metrics': ['kpi_value', 'mom_change', 'mom_change_pct', 'yoy_change_pct'],
+            'flags': ['risk_flag'],
+        },
+        'budget': {
+            'metrics': [
+                'variance_revenue_pct_unrounded', 'variance_ebitda_pct_unrounded',
+                'ytd_variance_revenue_pct_unrounded', 'ytd_variance_ebitda_pct_unrounded'
+            ],
+            'flags': ['budget_risk_flag'],
+        },
+    }) }}
+{% endmacro %}
+
+{#
+    One row per row of relation and rule it breaches: the key columns, then
+    rule_id, flag, metric, metric_value, operator, threshold, severity.
+    KPI rules are joined on kpi_name, so each row only meets its own KPI's
+    rules. Null metric values breach nothing.
+#}
+{% macro risk_rule_breaches(relation, subject, keys) %}
+    {%- set metrics = risk_rule_subjects()[subject]['metrics'] -%}
+    select
+        {%- for key in keys %}
+        m.{{ key }},
+        {%- endfor %}
+        r.rule_id,
+        r.flag,
+        r.metric,
+        v.metric_value,
+        r.operator,
+        r.threshold,
+        r.severity
+    from {{ relation }} m
+    join {{ ref('risk_rules') }} r
+        on r.subject = '{{ subject }}'
+        {%- if subject == 'kpi' %}
+        and r.kpi_name = m.kpi_name
+        {%- endif %}
+    cross join lateral (
+        select case r.metric
+            {%- for metric in metrics %}
+            when '{{ metric }}' then m.{{ metric }}::numeric
+            {%- endfor %}
+        end as metric_value
+    ) v
+    where case r.operator
+        when '<' then v.metric_value < r.threshold
+        when '<=' then v.metric_value <= r.threshold
+        when '>' then v.metric_value > r.threshold
+        when '>=' then v.metric_value >= r.threshold
+        when '=' then v.metric_value = r.threshold
+    end
+{% endmacro %}
+
+{#
+    The subject's flag columns per key, for keys with at least one breach;
+    left join it and coalesce the flags to false.
+#}
+{% macro risk_flags(relation, subject, keys) %}
+    select
+        {{ keys | join(', ') }},
+        {%- for flag in risk_rule_subjects()[subject]['flags'] %}
+        bool_or(flag = '{{ flag }}') as {{ flag }}{{ ',' if not loop.last }}
+        {%- endfor %}
+    from ({{ risk_rule_breaches(relation, subject, keys) }}) breaches
+    group by {{ keys | join(', ') }}
+{% endmacro %}
@@ -1,7 +1,10 @@
 {{
     config(
-        materialized='table',
-        schema='reporting'
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['company_id', 'date'],
+        schema='reporting',
+        post_hook="{{ dashboard_index(['company_id', 'date'], cluster=true) }}"
     )
 }}
 
@@ -13,6 +16,40 @@ budget as (
     select * from {{ ref('stg_budget_monthly_spread') }}
 ),
 
+{% if is_incremental() %}
+
+-- Months recomputed in staging since the last run, plus months whose budget changed
+affected as (
+    select company_id, date
+    from financials
+    where dbt_updated_at > (select max(dbt_updated_at) from {{ this }})
+
+    union
+
+    select t.company_id, t.date
+    from {{ this }} t
+    left join budget b
+        on t.company_id = b.company_id
+        and t.date = b.date
+    where (t.budget_revenue, t.budget_ebitda, t.budget_cash_from_ops, t.budget_capex,
+           t.ytd_budget_revenue, t.ytd_budget_ebitda)
+        is distinct from (b.revenue_budget_monthly, b.ebitda_budget_monthly,
+                          b.cash_from_ops_budget_monthly, b.capex_budget_monthly,
+                          b.ytd_revenue_budget, b.ytd_ebitda_budget)
+
+    union
+
+    -- Stored flags that the current risk rules no longer produce
+    select t.company_id, t.date
+    from {{ this }} t
+    left join ({{ risk_flags(this, 'budget', ['company_id', 'date']) }}) f
+        on f.company_id = t.company_id
+        and f.date = t.date
+    where t.budget_risk_flag is distinct from coalesce(f.budget_risk_flag, false)
+),
+
+{% endif %}
+
 variance_calcs as (
     select
         f.company_id,
@@ -31,6 +68,11 @@ variance_calcs as (
                 round(((f.revenue - b.revenue_budget_monthly) / b.revenue_budget_monthly * 100)::numeric, 1)
             else null
         end as variance_revenue_pct,
+        case 
+            when b.revenue_budget_monthly != 0 then
+                ((f.revenue - b.revenue_budget_monthly) / b.revenue_budget_monthly * 100)::numeric
+            else null
+        end as variance_revenue_pct_unrounded,
         
         f.ebitda as actual_ebitda,
         b.ebitda_budget_monthly as budget_ebitda,
@@ -40,6 +82,11 @@ variance_calcs as (
                 round(((f.ebitda - b.ebitda_budget_monthly) / b.ebitda_budget_monthly * 100)::numeric, 1)
             else null
         end as variance_ebitda_pct,
+        case 
+            when b.ebitda_budget_monthly != 0 then
+                ((f.ebitda - b.ebitda_budget_monthly) / b.ebitda_budget_monthly * 100)::numeric
+            else null
+        end as variance_ebitda_pct_unrounded,
         
         f.ebitda_margin as actual_ebitda_margin,
         case 
@@ -64,6 +111,11 @@ variance_calcs as (
                 round(((f.ytd_revenue - b.ytd_revenue_budget) / b.ytd_revenue_budget * 100)::numeric, 1)
             else null
         end as ytd_variance_revenue_pct,
+        case 
+            when b.ytd_revenue_budget != 0 then
+                ((f.ytd_revenue - b.ytd_revenue_budget) / b.ytd_revenue_budget * 100)::numeric
+            else null
+        end as ytd_variance_revenue_pct_unrounded,
         
         f.ytd_ebitda as ytd_actual_ebitda,
         b.ytd_ebitda_budget as ytd_budget_ebitda,
@@ -73,20 +125,41 @@ variance_calcs as (
                 round(((f.ytd_ebitda - b.ytd_ebitda_budget) / b.ytd_ebitda_budget * 100)::numeric, 1)
             else null
         end as ytd_variance_ebitda_pct,
-        
-        case
-            when f.ytd_revenue is not null and b.ytd_revenue_budget != 0 then
-                case 
-                    when ((f.ytd_revenue - b.ytd_revenue_budget) / b.ytd_revenue_budget * 100) < -15 then true
-                    else false
-                end
-            else false
-        end as budget_risk_flag
+        case 
+            when b.ytd_ebitda_budget != 0 then
+                ((f.ytd_ebitda - b.ytd_ebitda_budget) / b.ytd_ebitda_budget * 100)::numeric
+            else null
+        end as ytd_variance_ebitda_pct_unrounded
         
     from financials f
+    {% if is_incremental() %}
+    join affected a
+        on f.company_id = a.company_id
+        and f.date = a.date
+    {% endif %}
     left join budget b 
         on f.company_id = b.company_id 
         and f.date = b.date
+),
+
+-- Rules for budget variance come from seeds/risk_rules.csv and compare the
+-- unrounded percentages; the rounded ones are for display
+risk_flags as (
+    {{ risk_flags('variance_calcs', 'budget', ['company_id', 'date']) }}
+),
+
+final as (
+    select
+        c.*,
+        coalesce(r.budget_risk_flag, false) as budget_risk_flag,
+        f.dbt_updated_at
+    from variance_calcs c
+    join financials f
+        on f.company_id = c.company_id
+        and f.date = c.date
+    left join risk_flags r
+        on r.company_id = c.company_id
+        and r.date = c.date
 )
 
-select * from variance_calcs
+select * from final
@@ -1,7 +1,8 @@
 {{
     config(
         materialized='table',
-        schema='reporting'
+        schema='reporting',
+        post_hook="{{ dashboard_index(['company_id', 'comment_date'], cluster=true) }}"
     )
 }}
 
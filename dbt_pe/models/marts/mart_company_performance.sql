@@ -1,7 +1,10 @@
 {{
     config(
-        materialized='table',
-        schema='reporting'
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['company_id', 'date'],
+        schema='reporting',
+        post_hook="{{ dashboard_index(['company_id', 'date'], cluster=true) }}"
     )
 }}
 
@@ -21,11 +24,61 @@ investments as (
     join {{ source('raw_data', 'dim_fund') }} f on inv.fund_id = f.fund_id
 ),
 
+{% if is_incremental() %}
+
+-- Companies with months recomputed in staging since the last run; the month
+-- previously flagged as latest is reprocessed too
+changed_from as (
+    select company_id, min(date) as changed_from
+    from financials
+    where dbt_updated_at > (select max(dbt_updated_at) from {{ this }})
+    group by company_id
+
+    union all
+
+    select t.company_id, t.date
+    from {{ this }} t
+    where t.is_latest_period
+      and t.company_id in (
+          select company_id from financials
+          where dbt_updated_at > (select max(dbt_updated_at) from {{ this }})
+      )
+
+    union all
+
+    -- Companies whose fund holdings changed are rebuilt in full
+    select company_id, date '0001-01-01'
+    from (
+        (
+            select company_id, fund_id, fund_name, vintage_year, ownership_type from investments
+            except
+            select company_id, fund_id, fund_name, vintage_year, ownership_type from {{ this }}
+        )
+        union all
+        (
+            select company_id, fund_id, fund_name, vintage_year, ownership_type from {{ this }}
+            except
+            select company_id, fund_id, fund_name, vintage_year, ownership_type from investments
+        )
+    ) changed_investments
+),
+
+affected as (
+    select company_id, min(changed_from) as changed_from
+    from changed_from
+    group by company_id
+),
+
+{% endif %}
+
 latest_metrics as (
     select
         company_id,
         max(date) as latest_date
     from financials
+    {% if is_incremental() %}
+    where company_id in (select company_id from affected)
+    {% endif %}
     group by company_id
 ),
 
@@ -75,8 +128,14 @@ performance as (
         case 
             when lm.latest_date = f.date then true 
             else false 
-        end as is_latest_period
+        end as is_latest_period,
+        f.dbt_updated_at
     from financials f
+    {% if is_incremental() %}
+    join affected a
+        on f.company_id = a.company_id
+        and f.date >= a.changed_from
+    {% endif %}
     join investments i on f.company_id = i.company_id
     left join latest_metrics lm on f.company_id = lm.company_id
 )
@@ -0,0 +1,27 @@
+{{
+    config(
+        materialized='table',
+        schema='reporting',
+        post_hook="{{ dashboard_index(['fund_id']) }}"
+    )
+}}
+
+-- One row per fund: the same aggregates as mart_fund_summary, taken over
+-- each company's own latest reported month, so companies reporting through
+-- different months all count. first_date and last_date give the range of
+-- those months.
+
+with latest as (
+    select * from {{ ref('mart_company_performance') }}
+    where is_latest_period
+)
+
+select
+    fund_id,
+    fund_name,
+    vintage_year,
+    min(date) as first_date,
+    max(date) as last_date,
+    {{ fund_rollup_columns() }}
+from latest
+group by fund_id, fund_name, vintage_year
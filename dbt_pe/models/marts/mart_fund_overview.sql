@@ -1,7 +1,10 @@
 {{
     config(
-        materialized='table',
-        schema='reporting'
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='company_id',
+        schema='reporting',
+        post_hook="{{ dashboard_index(['fund_id', 'company_name'], cluster=true) }}"
     )
 }}
 
@@ -21,11 +24,57 @@ companies as (
     select * from {{ source('raw_data', 'dim_company') }}
 ),
 
+{% if is_incremental() %}
+
+-- Companies with months recomputed in staging since the last run, or whose
+-- company or fund attributes changed; their rows are rebuilt for every fund
+affected as (
+    select distinct company_id
+    from {{ ref('stg_financials_enhanced') }}
+    where dbt_updated_at > (select max(dbt_updated_at) from {{ this }})
+
+    union
+
+    select company_id
+    from (
+        (
+            select i.fund_id, i.fund_name, i.vintage_year, i.company_id, i.investment_date,
+                   i.ownership_type, c.company_name, c.legal_name, c.industry, c.subindustry,
+                   c.hq_city, c.hq_country, c.website, c.founded_year, c.employees
+            from investments i
+            join companies c on i.company_id = c.company_id
+            except
+            select fund_id, fund_name, vintage_year, company_id, investment_date,
+                   ownership_type, company_name, legal_name, industry, subindustry,
+                   hq_city, hq_country, website, founded_year, employees
+            from {{ this }}
+        )
+        union all
+        (
+            select fund_id, fund_name, vintage_year, company_id, investment_date,
+                   ownership_type, company_name, legal_name, industry, subindustry,
+                   hq_city, hq_country, website, founded_year, employees
+            from {{ this }}
+            except
+            select i.fund_id, i.fund_name, i.vintage_year, i.company_id, i.investment_date,
+                   i.ownership_type, c.company_name, c.legal_name, c.industry, c.subindustry,
+                   c.hq_city, c.hq_country, c.website, c.founded_year, c.employees
+            from investments i
+            join companies c on i.company_id = c.company_id
+        )
+    ) changed_holdings
+),
+
+{% endif %}
+
 latest_financials as (
     select 
         f.*,
         row_number() over (partition by f.company_id order by f.date desc) as rn
     from {{ ref('stg_financials_enhanced') }} f
+    {% if is_incremental() %}
+    where f.company_id in (select company_id from affected)
+    {% endif %}
 ),
 
 fund_portfolio as (
@@ -53,10 +102,14 @@ fund_portfolio as (
         f.net_leverage_ratio,
         f.cash_conversion_pct,
         f.revenue_yoy_growth_pct,
-        f.ebitda_yoy_growth_pct
+        f.ebitda_yoy_growth_pct,
+        f.dbt_updated_at
     from investments i
     join companies c on i.company_id = c.company_id
     left join latest_financials f on i.company_id = f.company_id and f.rn = 1
+    {% if is_incremental() %}
+    where i.company_id in (select company_id from affected)
+    {% endif %}
 )
 
 select * from fund_portfolio
@@ -0,0 +1,33 @@
+{{
+    config(
+        materialized='table',
+        schema='reporting',
+        post_hook="{{ dashboard_index(['fund_id', 'date'], cluster=true) }}"
+    )
+}}
+
+-- One row per fund and month: portfolio totals, weighted margins, LTM sums,
+-- the spread of net leverage across companies and risk flag counts
+
+with performance as (
+    select * from {{ ref('mart_company_performance') }}
+),
+
+fund_months as (
+    select
+        fund_id,
+        fund_name,
+        vintage_year,
+        date,
+        year,
+        month,
+        year_month,
+        {{ fund_rollup_columns() }}
+    from performance
+    group by fund_id, fund_name, vintage_year, date, year, month, year_month
+)
+
+select
+    *,
+    date = max(date) over (partition by fund_id) as is_latest_period
+from fund_months
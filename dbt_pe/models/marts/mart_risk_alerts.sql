@@ -0,0 +1,104 @@
+{{
+    config(
+        materialized='table',
+        schema='reporting',
+        post_hook=[
+            "{{ dashboard_index(['company_id', 'date'], cluster=true) }}",
+            "{{ dashboard_index(['company_id', 'source'], where='is_current') }}",
+        ]
+    )
+}}
+
+-- One row per breached risk rule, company and month, across the financial,
+-- KPI and budget flags. is_current marks breaches in the company's latest
+-- month of that source, the ones the alerts page lists; the partial index
+-- holds only those rows.
+
+with financials as (
+    select * from {{ ref('stg_financials_enhanced') }}
+),
+
+kpis as (
+    select * from {{ ref('stg_kpis_analysis') }}
+),
+
+budget_variance as (
+    select * from {{ ref('mart_budget_variance') }}
+),
+
+companies as (
+    select company_id, company_name, industry from {{ source('raw_data', 'dim_company') }}
+),
+
+financial_breaches as (
+    {{ risk_rule_breaches('financials', 'financials', ['company_id', 'date']) }}
+),
+
+kpi_breaches as (
+    {{ risk_rule_breaches('kpis', 'kpi', ['company_id', 'kpi_name', 'date']) }}
+),
+
+budget_breaches as (
+    {{ risk_rule_breaches('budget_variance', 'budget', ['company_id', 'date']) }}
+),
+
+breaches as (
+    select
+        company_id, date, 'financials' as source, null::text as kpi_name,
+        rule_id, flag, metric, metric_value, operator, threshold, severity
+    from financial_breaches
+
+    union all
+
+    select
+        company_id, date, 'kpi', kpi_name,
+        rule_id, flag, metric, metric_value, operator, threshold, severity
+    from kpi_breaches
+
+    union all
+
+    select
+        company_id, date, 'budget', null,
+        rule_id, flag, metric, metric_value, operator, threshold, severity
+    from budget_breaches
+),
+
+latest_months as (
+    select company_id, 'financials' as source, max(date) as latest_date
+    from financials
+    group by company_id
+
+    union all
+
+    select company_id, 'kpi', max(date)
+    from kpis
+    group by company_id
+
+    union all
+
+    select company_id, 'budget', max(date)
+    from budget_variance
+    group by company_id
+)
+
+select
+    b.company_id,
+    c.company_name,
+    c.industry,
+    b.date,
+    b.source,
+    b.kpi_name,
+    b.rule_id,
+    b.flag,
+    b.metric,
+    b.metric_value,
+    b.operator,
+    b.threshold,
+    b.severity,
+    b.date = l.latest_date as is_current
+from breaches b
+join companies c
+    on c.company_id = b.company_id
+join latest_months l
+    on l.company_id = b.company_id
+    and l.source = b.source
@@ -13,40 +13,121 @@ companies as (
     select * from {{ source('raw_data', 'dim_company') }}
 ),
 
-dates as (
-    select * from {{ source('raw_data', 'dim_date') }}
-    where year in (2023, 2024)
+profiles as (
+    select * from {{ ref('budget_phasing_profiles') }}
+),
+
+-- Materialized on its own so pairing it with every budget year reads 12
+-- rows per year rather than filtering every profile again
+default_profile as materialized (
+    select month, weight from profiles where scope = 'default'
+),
+
+budget_years as (
+    select b.company_id, b.fiscal_year, c.industry
+    from budget b
+    join companies c on b.company_id = c.company_id
+),
+
+{% if var('budget_phasing_from_actuals', false) %}
+-- Prior-year revenue, for years with all 12 months reported and positive
+actual_months as (
+    select
+        f.company_id,
+        d.year,
+        d.month,
+        f.revenue,
+        count(*) over (partition by f.company_id, d.year) as months_reported,
+        bool_and(coalesce(f.revenue > 0, false)) over (partition by f.company_id, d.year) as all_positive
+    from {{ source('raw_data', 'fact_financials_monthly') }} f
+    join {{ source('raw_data', 'dim_date') }} d on f.date_id = d.date_id
+    where (f.company_id, d.year + 1) in (select company_id, fiscal_year from budget_years)
+),
+
+actual_profiles as (
+    select company_id, year + 1 as fiscal_year, month, revenue as weight
+    from actual_months
+    where months_reported = 12 and all_positive
+),
+{% endif %}
+
+-- Candidate monthly weights per budget year, by precedence: the company's
+-- seeded profile, its industry's, the prior year's actual revenue, then the
+-- default. Each budget row meets at most four 12-month profiles, so the
+-- work is linear in companies x budget years.
+candidate_weights as (
+    select y.company_id, y.fiscal_year, p.month, p.weight, 1 as priority, 'company' as phasing_profile
+    from budget_years y
+    join profiles p on p.scope = 'company' and p.scope_id = y.company_id
+
+    union all
+
+    select y.company_id, y.fiscal_year, p.month, p.weight, 2, 'industry'
+    from budget_years y
+    join profiles p on p.scope = 'industry' and p.scope_id = y.industry
+
+    {% if var('budget_phasing_from_actuals', false) %}
+    union all
+
+    select company_id, fiscal_year, month, weight, 3, 'actuals'
+    from actual_profiles
+    {% endif %}
+
+    union all
+
+    select y.company_id, y.fiscal_year, p.month, p.weight, 4, 'default'
+    from budget_years y
+    cross join default_profile p
+),
+
+phasing as (
+    select
+        company_id,
+        fiscal_year,
+        month,
+        weight,
+        phasing_profile,
+        sum(weight) over (partition by company_id, fiscal_year) as total_weight
+    from (
+        select
+            *,
+            min(priority) over (partition by company_id, fiscal_year) as chosen_priority
+        from candidate_weights
+    ) ranked
+    where priority = chosen_priority
 ),
 
 budget_monthly as (
     select
         b.company_id,
         c.company_name,
-        d.date,
-        d.year,
-        d.month,
-        d.year_month,
+        make_date(b.fiscal_year, p.month, 1) as date,
+        b.fiscal_year as year,
+        p.month,
+        to_char(make_date(b.fiscal_year, p.month, 1), 'YYYY-MM') as year_month,
         b.fiscal_year,
         b.currency,
-        round((b.revenue_budget / 12)::numeric, 2) as revenue_budget_monthly,
-        round((b.cogs_budget / 12)::numeric, 2) as cogs_budget_monthly,
-        round((b.gross_profit_budget / 12)::numeric, 2) as gross_profit_budget_monthly,
-        round((b.ebitda_budget / 12)::numeric, 2) as ebitda_budget_monthly,
-        round((b.depreciation_budget / 12)::numeric, 2) as depreciation_budget_monthly,
-        round((b.amortization_budget / 12)::numeric, 2) as amortization_budget_monthly,
-        round((b.ebita_budget / 12)::numeric, 2) as ebita_budget_monthly,
-        round((b.ebit_budget / 12)::numeric, 2) as ebit_budget_monthly,
-        round((b.net_income_budget / 12)::numeric, 2) as net_income_budget_monthly,
-        round((b.cash_from_ops_budget / 12)::numeric, 2) as cash_from_ops_budget_monthly,
-        round((b.capex_budget / 12)::numeric, 2) as capex_budget_monthly,
-        round((b.working_capital_budget / 12)::numeric, 2) as working_capital_budget_monthly,
-        round((b.net_debt_budget / 12)::numeric, 2) as net_debt_budget_monthly,
+        round((b.revenue_budget * p.weight / p.total_weight)::numeric, 2) as revenue_budget_monthly,
+        round((b.cogs_budget * p.weight / p.total_weight)::numeric, 2) as cogs_budget_monthly,
+        round((b.gross_profit_budget * p.weight / p.total_weight)::numeric, 2) as gross_profit_budget_monthly,
+        round((b.ebitda_budget * p.weight / p.total_weight)::numeric, 2) as ebitda_budget_monthly,
+        round((b.depreciation_budget * p.weight / p.total_weight)::numeric, 2) as depreciation_budget_monthly,
+        round((b.amortization_budget * p.weight / p.total_weight)::numeric, 2) as amortization_budget_monthly,
+        round((b.ebita_budget * p.weight / p.total_weight)::numeric, 2) as ebita_budget_monthly,
+        round((b.ebit_budget * p.weight / p.total_weight)::numeric, 2) as ebit_budget_monthly,
+        round((b.net_income_budget * p.weight / p.total_weight)::numeric, 2) as net_income_budget_monthly,
+        round((b.cash_from_ops_budget * p.weight / p.total_weight)::numeric, 2) as cash_from_ops_budget_monthly,
+        round((b.capex_budget * p.weight / p.total_weight)::numeric, 2) as capex_budget_monthly,
+        round((b.working_capital_budget * p.weight / p.total_weight)::numeric, 2) as working_capital_budget_monthly,
+        round((b.net_debt_budget * p.weight / p.total_weight)::numeric, 2) as net_debt_budget_monthly,
         b.revenue_budget as revenue_budget_annual,
-        b.ebitda_budget as ebitda_budget_annual
+        b.ebitda_budget as ebitda_budget_annual,
+        p.phasing_profile
     from budget b
     join companies c on b.company_id = c.company_id
-    cross join dates d
-    where d.year = b.fiscal_year
+    join phasing p
+        on p.company_id = b.company_id
+        and p.fiscal_year = b.fiscal_year
 ),
 
 with_ytd_budget as (
@@ -1,10 +1,27 @@
 {{
     config(
-        materialized='table',
-        schema='dbt_stg'
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['company_id', 'date'],
+        schema='dbt_stg',
+        post_hook="{{ dashboard_index(['company_id', 'date']) }}"
     )
 }}
 
+{#
+    Incremental runs only recompute companies whose source rows differ from
+    what is stored, from the first changed month onwards. Window inputs reach
+    back 12 rows (lags, LTM) and to January (YTD) before that month.
+    Deleted source rows are not detected: use --full-refresh after removing
+    facts or companies.
+#}
+{%- set base_columns = [
+    'company_name', 'industry', 'employees', 'year', 'month', 'quarter', 'year_month',
+    'revenue', 'cogs', 'gross_profit', 'ebitda', 'depreciation', 'amortization', 'ebita',
+    'ebit', 'net_income', 'cash_from_ops', 'capex', 'ebitda_margin', 'working_capital',
+    'net_debt', 'currency'
+] %}
+
 with financials as (
     select * from {{ source('raw_data', 'fact_financials_monthly') }}
 ),
@@ -48,101 +65,143 @@ base_data as (
     join dates d on f.date_id = d.date_id
 ),
 
-with_lag as (
+{% if is_incremental() %}
+
+changed_rows as (
     select
-        *,
-        -- Previous month values for MoM calculations
-        lag(revenue, 1) over (partition by company_id order by date) as revenue_prev_month,
-        lag(ebitda, 1) over (partition by company_id order by date) as ebitda_prev_month,
-        lag(ebitda_margin, 1) over (partition by company_id order by date) as margin_prev_month,
-        
-        -- Same month last year for YoY calculations
-        lag(revenue, 12) over (partition by company_id order by date) as revenue_prev_year,
-        lag(ebitda, 12) over (partition by company_id order by date) as ebitda_prev_year
-    from base_data
+        coalesce(s.company_id, t.company_id) as company_id,
+        coalesce(s.date, t.date) as date
+    from base_data s
+    full outer join {{ this }} t
+        on s.company_id = t.company_id
+        and s.date = t.date
+    where (s.{{ base_columns | join(', s.') }})
+        is distinct from (t.{{ base_columns | join(', t.') }})
 ),
 
-with_rolling as (
+changed_from as (
+    select company_id, min(date) as changed_from
+    from changed_rows
+    group by company_id
+
+    union all
+
+    -- Stored flags that the current risk rules no longer produce: a rule
+    -- change recomputes only the companies whose flags it changes
+    select t.company_id, min(t.date)
+    from {{ this }} t
+    left join ({{ risk_flags(this, 'financials', ['company_id', 'date']) }}) f
+        on f.company_id = t.company_id
+        and f.date = t.date
+    where (t.revenue_risk_flag, t.margin_risk_flag, t.leverage_risk_flag, t.liquidity_risk_flag)
+        is distinct from (
+            coalesce(f.revenue_risk_flag, false), coalesce(f.margin_risk_flag, false),
+            coalesce(f.leverage_risk_flag, false), coalesce(f.liquidity_risk_flag, false)
+        )
+    group by t.company_id
+
+    union all
+
+    -- YTD columns are only filled for the latest year, so a new latest year
+    -- changes every company from the start of the previous one
+    select b.company_id, make_date(least(old.max_year, new.max_year), 1, 1)
+    from (select max(year) as max_year from {{ this }}) old
+    cross join (select max(year) as max_year from base_data) new
+    cross join (select distinct company_id from base_data) b
+    where old.max_year is distinct from new.max_year
+),
+
+affected as (
     select
-        *,
-        -- LTM (Last Twelve Months) metrics
-        sum(revenue) over (
-            partition by company_id 
-            order by date 
-            rows between 11 preceding and current row
-        ) as ltm_revenue,
-        
-        sum(ebitda) over (
-            partition by company_id 
-            order by date 
-            rows between 11 preceding and current row
-        ) as ltm_ebitda,
-        
-        sum(cash_from_ops) over (
-            partition by company_id 
-            order by date 
-            rows between 11 preceding and current row
-        ) as ltm_cash_from_ops,
-        
-        sum(capex) over (
-            partition by company_id 
-            order by date 
-            rows between 11 preceding and current row
-        ) as ltm_capex,
-        
-        -- Count months for LTM validation
-        count(*) over (
-            partition by company_id 
-            order by date 
-            rows between 11 preceding and current row
-        ) as months_count
-    from with_lag
+        c.company_id,
+        min(c.changed_from) as changed_from
+    from changed_from c
+    group by c.company_id
 ),
 
-with_ytd as (
+window_start as (
     select
-        *,
-        -- YTD (Year to Date) metrics for current fiscal year
-        case 
-            when year = (select max(year) from base_data) then
-                sum(revenue) over (
-                    partition by company_id, year 
-                    order by date 
-                    rows between unbounded preceding and current row
-                )
-            else null
-        end as ytd_revenue,
+        a.company_id,
+        a.changed_from,
+        least(
+            date_trunc('year', a.changed_from)::date,
+            coalesce(
+                (
+                    select b.date
+                    from base_data b
+                    where b.company_id = a.company_id
+                      and b.date < a.changed_from
+                    order by b.date desc
+                    offset 11 limit 1
+                ),
+                date '0001-01-01'
+            )
+        ) as window_start
+    from affected a
+),
+
+window_input as (
+    select b.*
+    from base_data b
+    join window_start w
+        on b.company_id = w.company_id
+        and b.date >= w.window_start
+),
+
+{% else %}
+
+window_input as (
+    select * from base_data
+),
+
+{% endif %}
+
+latest_year as (
+    -- YTD columns are only filled for the latest year in the source
+    select max(year) as max_year from base_data
+),
+
+windowed as (
+    select
+        w.*,
+        -- Previous month values for MoM calculations
+        lag(revenue, 1) over company_months as revenue_prev_month,
+        lag(ebitda, 1) over company_months as ebitda_prev_month,
+        lag(ebitda_margin, 1) over company_months as margin_prev_month,
         
-        case 
-            when year = (select max(year) from base_data) then
-                sum(ebitda) over (
-                    partition by company_id, year 
-                    order by date 
-                    rows between unbounded preceding and current row
-                )
-            else null
-        end as ytd_ebitda,
+        -- Same month last year for YoY calculations
+        lag(revenue, 12) over company_months as revenue_prev_year,
+        lag(ebitda, 12) over company_months as ebitda_prev_year,
         
-        case 
-            when year = (select max(year) from base_data) then
-                sum(cash_from_ops) over (
-                    partition by company_id, year 
-                    order by date 
-                    rows between unbounded preceding and current row
-                )
-            else null
-        end as ytd_cash_from_ops,
+        -- LTM (Last Twelve Months) metrics
+        sum(revenue) over company_months as ltm_revenue,
+        sum(ebitda) over company_months as ltm_ebitda,
+        sum(cash_from_ops) over company_months as ltm_cash_from_ops,
+        sum(capex) over company_months as ltm_capex,
         
-        case 
-            when year = (select max(year) from base_data) then
-                sum(capex) over (
-                    partition by company_id, year 
-                    order by date 
-                    rows between unbounded preceding and current row
-                )
-            else null
-        end as ytd_capex
-    from with_rolling
+        -- Count months for LTM validation
+        count(*) over company_months as months_count,
+        
+        -- YTD (Year to Date) metrics for current fiscal year
+        case when w.year = l.max_year then sum(revenue) over company_year else null end as ytd_revenue,
+        case when w.year = l.max_year then sum(ebitda) over company_year else null end as ytd_ebitda,
+        case when w.year = l.max_year then sum(cash_from_ops) over company_year else null end as ytd_cash_from_ops,
+        case when w.year = l.max_year then sum(capex) over company_year else null end as ytd_capex
+    from window_input w
+    cross join latest_year l
+    -- Both windows sort by (company_id, year, date), so the rows are sorted
+    -- once. LAG ignores the frame; the 12-row frame is for the LTM sums
+    window
+        company_months as (
+            partition by company_id
+            order by year, date
+            rows between 11 preceding and current row
+        ),
+        company_year as (
+            partition by company_id, year
+            order by date
+            rows between unbounded preceding and current row
+        )
 ),
 
 calculations as (
@@ -259,33 +318,33 @@ calculations as (
             else null
         end as opex_pct_of_revenue
         
-    from with_ytd
+    from windowed
+),
+
+-- Rules for the risk flags come from seeds/risk_rules.csv
+risk_flags as (
+    {{ risk_flags('calculations', 'financials', ['company_id', 'date']) }}
 ),
 
 final as (
     select
-        *,
-        -- Risk flags (must be in separate CTE to reference calculated columns)
-        case 
-            when revenue_mom_growth_pct < -10 then true
-            else false
-        end as revenue_risk_flag,
-        
-        case
-            when margin_change_bps < -200 then true
-            else false
-        end as margin_risk_flag,
+        c.*,
+        coalesce(f.revenue_risk_flag, false) as revenue_risk_flag,
+        coalesce(f.margin_risk_flag, false) as margin_risk_flag,
+        coalesce(f.leverage_risk_flag, false) as leverage_risk_flag,
+        coalesce(f.liquidity_risk_flag, false) as liquidity_risk_flag,
         
-        case
-            when net_leverage_ratio > 5.0 then true
-            else false
-        end as leverage_risk_flag,
-        
-        case
-            when cash_conversion_pct < 70 then true
-            else false
-        end as liquidity_risk_flag
-    from calculations
+        '{{ run_started_at }}'::timestamp as dbt_updated_at
+    from calculations c
+    left join risk_flags f
+        on f.company_id = c.company_id
+        and f.date = c.date
 )
 
-select * from final
+select final.*
+from final
+{% if is_incremental() %}
+join window_start w
+    on final.company_id = w.company_id
+    and final.date >= w.changed_from
+{% endif %}
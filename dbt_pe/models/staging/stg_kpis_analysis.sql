@@ -1,7 +1,8 @@
 {{
     config(
         materialized='table',
-        schema='dbt_stg'
+        schema='dbt_stg',
+        post_hook="{{ dashboard_index(['company_id', 'date'], cluster=true) }}"
     )
 }}
 
@@ -85,17 +86,20 @@ calculations as (
     from with_lag
 ),
 
+-- Rules for each KPI come from seeds/risk_rules.csv
+risk_flags as (
+    {{ risk_flags('calculations', 'kpi', ['company_id', 'kpi_name', 'date']) }}
+),
+
 with_trends as (
     select
-        *,
-        case
-            when kpi_name = 'Churn Rate (%)' and kpi_value > 2.5 then true
-            when kpi_name = 'Churn Rate (%)' and mom_change_pct > 20 then true
-            when kpi_name = 'ARPU (€ / month)' and mom_change_pct < -5 then true
-            when kpi_name = 'Homes Passed (000s)' and mom_change_pct < 0 then true
-            else false
-        end as risk_flag
-    from calculations
+        c.*,
+        coalesce(f.risk_flag, false) as risk_flag
+    from calculations c
+    left join risk_flags f
+        on f.company_id = c.company_id
+        and f.kpi_name = c.kpi_name
+        and f.date = c.date
 )
 
 select * from with_trends
@@ -0,0 +1,26 @@
+{#
+    Phasing profiles without exactly one row per month, with a negative
+    weight or with weights summing to zero, and a missing default profile.
+    Any of these would drop budget months or divide by zero.
+#}
+
+with profiles as (
+    select * from {{ ref('budget_phasing_profiles') }}
+),
+
+problems as (
+    select scope, scope_id
+    from profiles
+    group by scope, scope_id
+    having count(*) != 12
+        or count(distinct month) != 12
+        or min(weight) < 0
+        or sum(weight) <= 0
+
+    union all
+
+    select 'default', null
+    where not exists (select 1 from profiles where scope = 'default')
+)
+
+select * from problems
@@ -0,0 +1,48 @@
+{#
+    The budget_shortfall rule on values either side of its threshold. A YTD
+    revenue variance 0.04 points below -15% breaches it although it displays
+    as -15.0%; one 0.04 points above does not. Returns the cases where the
+    rule's result differs from the expected one.
+#}
+{%- set metrics = risk_rule_subjects()['budget']['metrics'] %}
+
+with rule as (
+    select threshold from {{ ref('risk_rules') }} where rule_id = 'budget_shortfall'
+),
+
+cases as (
+    select
+        'case_' || v.n as company_id,
+        date '2024-01-01' as date,
+        {%- for metric in metrics if metric != 'ytd_variance_revenue_pct_unrounded' %}
+        null::numeric as {{ metric }},
+        {%- endfor %}
+        r.threshold + v.delta as ytd_variance_revenue_pct_unrounded,
+        v.expected
+    from rule r
+    cross join (values
+        (1, -0.04, true),
+        (2, -0.0001, true),
+        (3, 0.0, false),
+        (4, 0.04, false)
+    ) v(n, delta, expected)
+
+    union all
+
+    select 'case_null', date '2024-01-01',
+        {%- for metric in metrics %}
+        null::numeric,
+        {%- endfor %}
+        false
+),
+
+breaches as (
+    {{ risk_rule_breaches('cases', 'budget', ['company_id', 'date']) }}
+)
+
+select c.company_id, c.ytd_variance_revenue_pct_unrounded, c.expected
+from cases c
+where c.expected != exists (
+    select 1 from breaches b
+    where b.company_id = c.company_id and b.rule_id = 'budget_shortfall'
+)
@@ -0,0 +1,31 @@
+{#
+    Flags set in the staging and budget variance tables with no alert in
+    mart_risk_alerts, and alerts with no flag set. Each set flag must have
+    at least one alert row, and each alert must belong to a set flag.
+#}
+{%- set financial_flags = risk_rule_subjects()['financials']['flags'] %}
+
+with flags as (
+    {%- for flag in financial_flags %}
+    select company_id, date, 'financials' as source, null::text as kpi_name, '{{ flag }}' as flag
+    from {{ ref('stg_financials_enhanced') }}
+    where {{ flag }}
+    union all
+    {%- endfor %}
+    select company_id, date, 'kpi', kpi_name, 'risk_flag'
+    from {{ ref('stg_kpis_analysis') }}
+    where risk_flag
+    union all
+    select company_id, date, 'budget', null, 'budget_risk_flag'
+    from {{ ref('mart_budget_variance') }}
+    where budget_risk_flag
+),
+
+alerts as (
+    select distinct company_id, date, source, kpi_name, flag
+    from {{ ref('mart_risk_alerts') }}
+)
+
+(select 'missing alert' as problem, * from flags except select 'missing alert', * from alerts)
+union all
+(select 'alert without flag', * from alerts except select 'alert without flag', * from flags)
@@ -0,0 +1,35 @@
+{#
+    Rules whose metric or flag is not a column of their subject (see
+    risk_rule_subjects), or whose kpi_name does not fit the subject. Such a
+    rule would silently never fire.
+#}
+{%- set subjects = risk_rule_subjects() %}
+
+with allowed as (
+    {%- for subject, columns in subjects.items() %}
+    {%- for metric in columns['metrics'] %}
+    select '{{ subject }}' as subject, 'metric' as kind, '{{ metric }}' as name union all
+    {%- endfor %}
+    {%- for flag in columns['flags'] %}
+    select '{{ subject }}', 'flag', '{{ flag }}'{{ ' union all' if not loop.last }}
+    {%- endfor %}
+    {{ 'union all' if not loop.last }}
+    {%- endfor %}
+),
+
+rules as (
+    select * from {{ ref('risk_rules') }}
+)
+
+select r.*
+from rules r
+where not exists (
+        select 1 from allowed a
+        where a.subject = r.subject and a.kind = 'metric' and a.name = r.metric
+    )
+    or not exists (
+        select 1 from allowed a
+        where a.subject = r.subject and a.kind = 'flag' and a.name = r.flag
+    )
+    or (r.subject = 'kpi' and r.kpi_name is null)
+    or (r.subject != 'kpi' and r.kpi_name is not null)
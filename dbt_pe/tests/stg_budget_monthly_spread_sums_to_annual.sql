@@ -0,0 +1,24 @@
+{#
+    Budget years whose phased months do not add back to the annual budget,
+    allowing for each month's rounding to cents, or that do not have 12
+    months.
+#}
+
+with monthly as (
+    select
+        company_id,
+        fiscal_year,
+        count(*) as months,
+        sum(revenue_budget_monthly) as revenue_budget_phased,
+        sum(ebitda_budget_monthly) as ebitda_budget_phased,
+        max(revenue_budget_annual) as revenue_budget_annual,
+        max(ebitda_budget_annual) as ebitda_budget_annual
+    from {{ ref('stg_budget_monthly_spread') }}
+    group by company_id, fiscal_year
+)
+
+select *
+from monthly
+where months != 12
+    or abs(revenue_budget_phased - revenue_budget_annual) > 0.005 * months
+    or abs(ebitda_budget_phased - ebitda_budget_annual) > 0.005 * months
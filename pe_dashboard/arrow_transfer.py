@@ -0,0 +1,71 @@
+import io
+import re
+from typing import Dict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+# Arrow type per Postgres type OID. numeric becomes float64, as in the
+# DB-API path (coerce_float); unlisted types are read as strings
+PG_ARROW_TYPES = {
+    16: pa.bool_(),                      # bool
+    20: pa.int64(),                      # int8
+    21: pa.int16(),                      # int2
+    23: pa.int32(),                      # int4
+    700: pa.float32(),                   # float4
+    701: pa.float64(),                   # float8
+    1700: pa.float64(),                  # numeric
+    1082: pa.date32(),                   # date
+    1114: pa.timestamp('us'),            # timestamp
+    1184: pa.timestamp('us', tz='UTC'),  # timestamptz
+}
+
+# COPY ... CSV writes NULL as an empty unquoted field and '' as "", and
+# booleans as t/f
+CSV_CONVERT_OPTIONS = dict(
+    null_values=[''],
+    strings_can_be_null=True,
+    quoted_strings_can_be_null=False,
+    true_values=['t'],
+    false_values=['f'],
+)
+
+def inline_params(cursor, sql: str, params: tuple) -> str:
+    """Replace $1, $2, ... with quoted literals; COPY takes no bind parameters"""
+    return re.sub(
+        r'\$(\d+)',
+        lambda match: cursor.mogrify('%s', (params[int(match.group(1)) - 1],)).decode(),
+        sql
+    )
+
+def column_types(cursor, sql: str) -> Dict[str, pa.DataType]:
+    """{column: Arrow type} of a query's result, from its row description"""
+    cursor.execute(f"SELECT * FROM ({sql}) AS result LIMIT 0")
+    return {
+        column.name: PG_ARROW_TYPES.get(column.type_code, pa.string())
+        for column in cursor.description
+    }
+
+def read_arrow(cursor, sql: str, params: tuple = ()) -> pd.DataFrame:
+    """Run a query through COPY ... TO STDOUT and parse it with pyarrow.
+
+    The rows arrive as CSV text and are parsed in C++ straight into typed
+    Arrow columns, so no Python object is created per value. Returns an
+    Arrow-backed DataFrame (pd.ArrowDtype columns).
+    """
+    if params:
+        sql = inline_params(cursor, sql, params)
+    types = column_types(cursor, sql)
+    if cursor.connection.get_parameter_status('TimeZone') != 'UTC':
+        # Only affects how timestamptz values are written; tz is set per transaction
+        cursor.execute("SET LOCAL TIME ZONE 'UTC'")
+
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", buffer)
+    buffer.seek(0)
+    table = pv.read_csv(
+        buffer,
+        convert_options=pv.ConvertOptions(column_types=types, **CSV_CONVERT_OPTIONS)
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,253 @@
+"""
+Plotly figures for the Company Deep Dive, and a cache of their serialized JSON
+"""
+
+import json
+import os
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from result_cache import MemoryBackend, cache_key
+
+# Serialized figures kept per process, least recently used evicted first
+FIGURE_CACHE_MAX_MB = float(os.getenv('FIGURE_CACHE_MAX_MB', '64'))
+
+# Series with at least this many points are drawn with WebGL (Scattergl);
+# the same cut-off plotly express uses for render_mode='auto'
+WEBGL_MIN_POINTS = 1000
+
+def scatter(x, y, **kwargs):
+    """Scatter trace, switching to Scattergl for long series"""
+    trace = go.Scattergl if len(x) >= WEBGL_MIN_POINTS else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+def quarterly_labels(dates, values, template):
+    """Point labels for quarter-end months (Mar, Jun, Sep, Dec) only"""
+    show = pd.to_datetime(dates).dt.month.isin([3, 6, 9, 12]).to_numpy() & values.notna().to_numpy()
+    labels = np.full(len(values), '', dtype=object)
+    labels[show] = values[show].map(template.format).to_numpy()
+    return labels
+
+def trends_figure(financials_df):
+    """Revenue, EBITDA, gross profit and OpEx with their growth/margin lines"""
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Revenue & YoY Growth', 'EBITDA & Margin %',
+                       'Gross Profit & Margin %', 'OpEx & % of Revenue'),
+        specs=[[{"secondary_y": True}, {"secondary_y": True}],
+               [{"secondary_y": True}, {"secondary_y": True}]],
+        vertical_spacing=0.15,
+        horizontal_spacing=0.1
+    )
+
+    # Chart 1: Revenue + YoY Growth
+    fig.add_trace(
+        go.Bar(x=financials_df['date'], y=financials_df['revenue'],
+              name='Revenue', marker=dict(color='#5DADE2', opacity=0.7),
+              hovertemplate='Revenue: €%{y:.2f}M<extra></extra>'),
+        row=1, col=1, secondary_y=False
+    )
+    text_labels_1 = quarterly_labels(financials_df['date'], financials_df['revenue_yoy_growth_pct'], "{:.1f}%")
+    fig.add_trace(
+        scatter(x=financials_df['date'], y=financials_df['revenue_yoy_growth_pct'],
+               name='YoY Growth %', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_1,
+               textposition='top center', textfont=dict(size=9),
+               hovertemplate='YoY Growth: %{y:.1f}%<extra></extra>'),
+        row=1, col=1, secondary_y=True
+    )
+
+    # Chart 2: EBITDA + Margin
+    fig.add_trace(
+        go.Bar(x=financials_df['date'], y=financials_df['ebitda'],
+              name='EBITDA', marker=dict(color='#5DADE2', opacity=0.7),
+              hovertemplate='EBITDA: €%{y:.2f}M<extra></extra>'),
+        row=1, col=2, secondary_y=False
+    )
+    text_labels_2 = quarterly_labels(financials_df['date'], financials_df['ebitda_margin'], "{:.1f}%")
+    fig.add_trace(
+        scatter(x=financials_df['date'], y=financials_df['ebitda_margin'],
+               name='Margin %', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_2,
+               textposition='top center', textfont=dict(size=9),
+               hovertemplate='EBITDA Margin: %{y:.1f}%<extra></extra>'),
+        row=1, col=2, secondary_y=True
+    )
+
+    # Chart 3: Gross Profit + Margin
+    fig.add_trace(
+        go.Bar(x=financials_df['date'], y=financials_df['gross_profit'],
+              name='Gross Profit', marker=dict(color='#5DADE2', opacity=0.7),
+              hovertemplate='Gross Profit: €%{y:.2f}M<extra></extra>'),
+        row=2, col=1, secondary_y=False
+    )
+    text_labels_3 = quarterly_labels(financials_df['date'], financials_df['gross_margin_pct'], "{:.1f}%")
+    fig.add_trace(
+        scatter(x=financials_df['date'], y=financials_df['gross_margin_pct'],
+               name='GM %', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_3,
+               textposition='top center', textfont=dict(size=9),
+               hovertemplate='Gross Margin: %{y:.1f}%<extra></extra>'),
+        row=2, col=1, secondary_y=True
+    )
+
+    # Chart 4: OpEx + % of Revenue
+    fig.add_trace(
+        go.Bar(x=financials_df['date'], y=financials_df['operating_expenses'],
+              name='OpEx', marker=dict(color='#5DADE2', opacity=0.7),
+              hovertemplate='OpEx: €%{y:.2f}M<extra></extra>'),
+        row=2, col=2, secondary_y=False
+    )
+    text_labels_4 = quarterly_labels(financials_df['date'], financials_df['opex_pct_of_revenue'], "{:.1f}%")
+    fig.add_trace(
+        scatter(x=financials_df['date'], y=financials_df['opex_pct_of_revenue'],
+               name='OpEx %', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_4,
+               textposition='top center', textfont=dict(size=9),
+               hovertemplate='% of Revenue: %{y:.1f}%<extra></extra>'),
+        row=2, col=2, secondary_y=True
+    )
+
+    # Update axes
+    fig.update_xaxes(showgrid=False, type='date', tickformat='%b %y')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(211, 211, 211, 0.2)')
+
+    # Set y-axis titles
+    fig.update_yaxes(title_text="€M", row=1, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="%", row=1, col=1, secondary_y=True)
+    fig.update_yaxes(title_text="€M", row=1, col=2, secondary_y=False)
+    fig.update_yaxes(title_text="%", row=1, col=2, secondary_y=True)
+    fig.update_yaxes(title_text="€M", row=2, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="%", row=2, col=1, secondary_y=True)
+    fig.update_yaxes(title_text="€M", row=2, col=2, secondary_y=False)
+    fig.update_yaxes(title_text="%", row=2, col=2, secondary_y=True)
+
+    fig.update_layout(
+        height=700,
+        showlegend=False,
+        hovermode='x unified'
+    )
+
+    return fig
+
+def budget_figure(budget_df):
+    """Monthly revenue and EBITDA, actual vs budget, for one fiscal year"""
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Monthly Revenue: Actual vs Budget', 'Monthly EBITDA: Actual vs Budget'),
+        horizontal_spacing=0.15
+    )
+
+    # Revenue Chart - Actual line with quarterly labels
+    text_labels_rev = quarterly_labels(budget_df['year_month'], budget_df['actual_revenue'], "€{:.1f}M")
+    fig.add_trace(
+        scatter(x=budget_df['year_month'], y=budget_df['actual_revenue'],
+               name='Actual', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_rev,
+               textposition='top center', textfont=dict(size=9),
+               hovertemplate='Actual Revenue: €%{y:.2f}M<extra></extra>'),
+        row=1, col=1
+    )
+    fig.add_trace(
+        scatter(x=budget_df['year_month'], y=budget_df['budget_revenue'],
+               name='Budget', line=dict(color='#FF6B6B', width=2),
+               mode='lines+markers',
+               opacity=0.7,
+               hovertemplate='Budget Revenue: €%{y:.2f}M<extra></extra>'),
+        row=1, col=1
+    )
+
+    # EBITDA Chart - Actual line with quarterly labels
+    text_labels_ebitda = quarterly_labels(budget_df['year_month'], budget_df['actual_ebitda'], "€{:.1f}M")
+    fig.add_trace(
+        scatter(x=budget_df['year_month'], y=budget_df['actual_ebitda'],
+               name='Actual', line=dict(color='#67EBF5', width=2),
+               mode='lines+markers+text',
+               text=text_labels_ebitda,
+               textposition='top center', textfont=dict(size=9),
+               showlegend=False,
+               hovertemplate='Actual EBITDA: €%{y:.2f}M<extra></extra>'),
+        row=1, col=2
+    )
+    fig.add_trace(
+        scatter(x=budget_df['year_month'], y=budget_df['budget_ebitda'],
+               name='Budget', line=dict(color='#FF6B6B', width=2),
+               mode='lines+markers',
+               opacity=0.7,
+               showlegend=False,
+               hovertemplate='Budget EBITDA: €%{y:.2f}M<extra></extra>'),
+        row=1, col=2
+    )
+
+    fig.update_xaxes(showgrid=False, type='date', tickformat='%b %y')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(211, 211, 211, 0.2)')
+
+    fig.update_layout(
+        height=400,
+        showlegend=True,
+        hovermode='x unified'
+    )
+
+    return fig
+
+def kpi_figure(kpi_data):
+    """Mini line chart of one KPI"""
+    fig = go.Figure()
+    fig.add_trace(scatter(
+        x=kpi_data['date'],
+        y=kpi_data['kpi_value'],
+        mode='lines+markers',
+        line=dict(width=2),
+        marker=dict(size=4)
+    ))
+
+    fig.update_layout(
+        height=200,
+        margin=dict(l=0, r=0, t=20, b=0),
+        showlegend=False,
+        xaxis=dict(showgrid=False, type='date', tickformat='%b %y'),
+        yaxis=dict(showgrid=True, gridcolor='rgba(211, 211, 211, 0.2)')
+    )
+
+    return fig
+
+class FigureCache:
+    """Figure JSON per (company_id, chart_id, data_version) in a bounded LRU.
+
+    A hit skips building the figure and re-validating its properties: the
+    cached JSON is loaded straight into a go.Figure with validation off,
+    which st.plotly_chart then serializes as usual.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.backend = MemoryBackend(max_bytes)
+
+    def get(self, company_id: str, chart_id: Hashable, data_version: Optional[str],
+            build: Callable[[], go.Figure]) -> go.Figure:
+        key = cache_key(company_id, chart_id, data_version)
+        spec = self.backend.get(key)
+        if spec is None:
+            fig = build()
+            self.backend.set(key, pio.to_json(fig, validate=False).encode())
+            return fig
+        return go.Figure(json.loads(spec), _validate=False)
+
+@st.cache_resource
+def get_figure_cache() -> FigureCache:
+    return FigureCache(int(FIGURE_CACHE_MAX_MB * 1024 * 1024))
+
+def cached_figure(company_id: str, chart_id: Hashable, data_version: Optional[str],
+                  build: Callable[[], go.Figure]) -> go.Figure:
+    """A chart's figure, rebuilt only when the data version changes"""
+    return get_figure_cache().get(company_id, chart_id, data_version, build)
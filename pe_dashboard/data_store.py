@@ -0,0 +1,191 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import result_cache
+from arrow_transfer import read_arrow
+from db_connection import ARROW_TRANSFER, get_data_version, get_db_engine, get_result_cache
+
+@dataclass(frozen=True)
+class Dataset:
+    """A table loaded whole (or the rows matching where), ordered by its key so
+    each key's rows are contiguous"""
+    table: str
+    key: str
+    order_by: str
+    where: Optional[str] = None
+
+DATASETS = {
+    'financials': Dataset('reporting.mart_company_performance', 'company_id', 'date'),
+    'budget_variance': Dataset('reporting.mart_budget_variance', 'company_id', 'date'),
+    'kpis': Dataset('dbt_stg.stg_kpis_analysis', 'company_id', 'date'),
+    'comments': Dataset('reporting.mart_comments', 'company_id', 'comment_date DESC'),
+    'fund_portfolio': Dataset('reporting.mart_fund_overview', 'fund_id', 'company_name'),
+    'fund_latest': Dataset('reporting.mart_fund_latest', 'fund_id', 'fund_id'),
+    # Current alerts only, read through the mart's partial index
+    'risk_alerts': Dataset('reporting.mart_risk_alerts', 'company_id', 'source', where='is_current'),
+}
+
+def _key_offsets(keys: pd.Series) -> Dict[str, Tuple[int, int]]:
+    """{key: (start, stop)} row ranges of a column sorted by key"""
+    values = keys.to_numpy()
+    if len(values) == 0:
+        return {}
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    stops = np.r_[starts[1:], len(values)]
+    return {values[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+class PortfolioStore:
+    """Every dashboard dataset held in memory, sliced per company or fund"""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], version: Optional[str]):
+        self.frames = frames
+        self.version = version
+        self.offsets = {
+            name: _key_offsets(frames[name][dataset.key])
+            for name, dataset in DATASETS.items()
+        }
+
+    @classmethod
+    def load(cls, engine, version: Optional[str]) -> 'PortfolioStore':
+        """Read all datasets in one repeatable-read snapshot.
+
+        version is read before the snapshot starts, so the data is at least
+        that new; a run finishing meanwhile only causes one extra reload.
+        """
+        shared = get_result_cache()
+        with engine.connect().execution_options(isolation_level='REPEATABLE READ') as conn:
+            frames = {}
+            for name, dataset in DATASETS.items():
+                def read(dataset=dataset):
+                    where = f" WHERE {dataset.where}" if dataset.where else ""
+                    sql = f"SELECT * FROM {dataset.table}{where} ORDER BY {dataset.key}, {dataset.order_by}"
+                    if ARROW_TRANSFER:
+                        cursor = conn.connection.dbapi_connection.cursor()
+                        try:
+                            return read_arrow(cursor, sql)
+                        finally:
+                            cursor.close()
+                    return pd.read_sql_query(sql, conn)
+                if shared is None:
+                    frames[name] = read()
+                else:
+                    # Replicas starting on the same version share one database read
+                    key = result_cache.cache_key('dataset', name, version)
+                    frames[name] = shared.get_or_compute(key, read)
+        return cls(frames, version)
+
+    def rows(self, dataset: str, key: str) -> pd.DataFrame:
+        """Rows of one company/fund: a positional slice of the shared frame, not a copy"""
+        frame = self.frames[dataset]
+        start, stop = self.offsets[dataset].get(key, (0, 0))
+        rows = frame.iloc[start:stop]
+        # Replacing the index of the slice itself leaves its data shared
+        rows.index = pd.RangeIndex(len(rows))
+        return rows
+
+class _StoreHolder:
+    """The current store; replaced as a whole when the data version changes"""
+
+    def __init__(self):
+        self.store = None
+        self.lock = threading.Lock()
+
+    def get(self, engine) -> PortfolioStore:
+        version = get_data_version()
+        if self.store is not None and self.store.version == version:
+            return self.store
+
+        # One session refreshes; the others keep serving the current store
+        if not self.lock.acquire(blocking=self.store is None):
+            return self.store
+        try:
+            if self.store is None or self.store.version != version:
+                self.store = PortfolioStore.load(engine, version)
+            return self.store
+        finally:
+            self.lock.release()
+
+@st.cache_resource
+def _get_holder():
+    return _StoreHolder()
+
+def get_store() -> Optional[PortfolioStore]:
+    """The shared in-memory store, reloaded after each finished ETL or dbt run"""
+    engine = get_db_engine()
+    if engine is None:
+        return None
+
+    try:
+        return _get_holder().get(engine)
+    except Exception as e:
+        st.error(f"Loading portfolio data failed: {e}")
+        return None
+
+def data_version() -> Optional[str]:
+    """Data version of the store the pages are reading from"""
+    store = get_store()
+    return None if store is None else store.version
+
+def _dataset_rows(dataset: str, key: str) -> Optional[pd.DataFrame]:
+    store = get_store()
+    return None if store is None else store.rows(dataset, key)
+
+def get_fund_list():
+    """Get list of all funds"""
+    store = get_store()
+    if store is None:
+        return None
+    funds = store.frames['fund_portfolio'][['fund_id', 'fund_name', 'vintage_year']]
+    return funds.drop_duplicates().sort_values('fund_name', ignore_index=True)
+
+def get_company_list(fund_id: Optional[str] = None):
+    """Get list of companies, optionally filtered by fund"""
+    store = get_store()
+    if store is None:
+        return None
+    if fund_id:
+        companies = store.rows('fund_portfolio', fund_id)[['company_id', 'company_name']]
+    else:
+        companies = store.frames['financials'][['company_id', 'company_name']]
+    return companies.drop_duplicates().sort_values('company_name', ignore_index=True)
+
+def get_fund_portfolio(fund_id: str):
+    """Get all portfolio companies for a fund"""
+    return _dataset_rows('fund_portfolio', fund_id)
+
+def get_fund_latest(fund_id: str):
+    """Get fund-level aggregates over each company's latest reported month"""
+    return _dataset_rows('fund_latest', fund_id)
+
+def get_current_risk_alerts(fund_id: Optional[str] = None):
+    """Get the risk rules each company breaches in its latest month, optionally
+    for one fund's companies"""
+    store = get_store()
+    if store is None:
+        return None
+    alerts = store.frames['risk_alerts']
+    if fund_id:
+        companies = store.rows('fund_portfolio', fund_id)['company_id']
+        alerts = alerts[alerts['company_id'].isin(companies)]
+    return alerts.reset_index(drop=True)
+
+def get_company_financials(company_id: str):
+    """Get financial metrics for a company"""
+    return _dataset_rows('financials', company_id)
+
+def get_company_budget_variance(company_id: str):
+    """Get budget variance analysis for a company"""
+    return _dataset_rows('budget_variance', company_id)
+
+def get_company_kpis(company_id: str):
+    """Get KPI data for a company"""
+    return _dataset_rows('kpis', company_id)
+
+def get_company_comments(company_id: str):
+    """Get comments for a company"""
+    return _dataset_rows('comments', company_id)
@@ -1,115 +1,139 @@
-import pandas as pd
 import streamlit as st
 from typing import Optional
+import logging
 import os
+import select
+import threading
+import time
 from dotenv import load_dotenv
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from sqlalchemy import create_engine
 
+import result_cache
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
+# Connection pool sizing: the data store loads its snapshot on a pooled
+# connection, so pool_size + max_overflow bounds concurrent queries
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+
+# Transfer store datasets with COPY ... TO STDOUT into Arrow-backed DataFrames
+# (arrow_transfer.py) instead of through pd.read_sql_query
+ARROW_TRANSFER = os.getenv('DB_ARROW_TRANSFER', 'false').lower() in ('1', 'true', 'yes')
+
+# The ETL and dbt NOTIFY this channel after each finished run. The version is
+# also re-read every DATA_VERSION_POLL_SECONDS in case a notification is missed
+VERSION_CHANNEL = 'data_version'
+VERSION_POLL_SECONDS = float(os.getenv('DATA_VERSION_POLL_SECONDS', '60'))
+VERSION_LOGS = {
+    'dbt': ('reporting.dbt_run_log', 'invocation_id'),
+    'etl': ('raw_data.etl_run_log', 'run_id'),
+}
+
+def get_connection_string():
+    """Database URL from the environment"""
+    return (
+        f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:"
+        f"{os.getenv('POSTGRES_PASSWORD', 'postgres')}@"
+        f"{os.getenv('POSTGRES_HOST', 'localhost')}:"
+        f"{os.getenv('POSTGRES_PORT', '5432')}/"
+        f"{os.getenv('POSTGRES_DB', 'portfolio_monitoring')}"
+    )
+
 @st.cache_resource
 def get_db_engine():
     """Create and cache SQLAlchemy engine"""
     try:
-        connection_string = (
-            f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:"
-            f"{os.getenv('POSTGRES_PASSWORD', 'postgres')}@"
-            f"{os.getenv('POSTGRES_HOST', 'localhost')}:"
-            f"{os.getenv('POSTGRES_PORT', '5432')}/"
-            f"{os.getenv('POSTGRES_DB', 'portfolio_monitoring')}"
+        engine = create_engine(
+            get_connection_string(),
+            pool_pre_ping=True,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE
         )
-        engine = create_engine(connection_string, pool_pre_ping=True)
         return engine
     except Exception as e:
         st.error(f"Database connection failed: {e}")
         return None
 
-@st.cache_data(ttl=300)
-def query_data(query: str) -> Optional[pd.DataFrame]:
-    """Execute query and return DataFrame"""
-    engine = get_db_engine()
-    if engine is None:
-        return None
-    
-    try:
-        df = pd.read_sql_query(query, engine)
-        return df
-    except Exception as e:
-        st.error(f"Query failed: {e}")
-        return None
+def read_data_version(cursor) -> str:
+    """Latest logged dbt and ETL run ids, e.g. 'dbt:<invocation_id>|etl:<run_id>'"""
+    parts = []
+    for source, (table, id_column) in VERSION_LOGS.items():
+        cursor.execute("SELECT to_regclass(%s)", (table,))
+        run_id = None
+        if cursor.fetchone()[0] is not None:
+            cursor.execute(f"SELECT {id_column} FROM {table} ORDER BY finished_at DESC LIMIT 1")
+            row = cursor.fetchone()
+            run_id = row[0] if row else None
+        parts.append(f"{source}:{run_id or ''}")
+    return '|'.join(parts)
 
-def get_fund_list():
-    """Get list of all funds"""
-    query = """
-        SELECT DISTINCT fund_id, fund_name, vintage_year
-        FROM reporting.mart_fund_overview
-        ORDER BY fund_name
-    """
-    return query_data(query)
-
-def get_company_list(fund_id: Optional[str] = None):
-    """Get list of companies, optionally filtered by fund"""
-    if fund_id:
-        query = f"""
-            SELECT DISTINCT company_id, company_name
-            FROM reporting.mart_fund_overview
-            WHERE fund_id = '{fund_id}'
-            ORDER BY company_name
-        """
-    else:
-        query = """
-            SELECT DISTINCT company_id, company_name
-            FROM reporting.mart_company_performance
-            ORDER BY company_name
-        """
-    return query_data(query)
-
-def get_fund_portfolio(fund_id: str):
-    """Get all portfolio companies for a fund"""
-    query = f"""
-        SELECT *
-        FROM reporting.mart_fund_overview
-        WHERE fund_id = '{fund_id}'
-        ORDER BY company_name
-    """
-    return query_data(query)
-
-def get_company_financials(company_id: str):
-    """Get financial metrics for a company"""
-    query = f"""
-        SELECT *
-        FROM reporting.mart_company_performance
-        WHERE company_id = '{company_id}'
-        ORDER BY date
-    """
-    return query_data(query)
-
-def get_company_budget_variance(company_id: str):
-    """Get budget variance analysis for a company"""
-    query = f"""
-        SELECT *
-        FROM reporting.mart_budget_variance
-        WHERE company_id = '{company_id}'
-        ORDER BY date
-    """
-    return query_data(query)
-
-def get_company_kpis(company_id: str):
-    """Get KPI data for a company"""
-    query = f"""
-        SELECT *
-        FROM dbt_stg.stg_kpis_analysis
-        WHERE company_id = '{company_id}'
-        ORDER BY date
-    """
-    return query_data(query)
-
-def get_company_comments(company_id: str):
-    """Get comments for a company"""
-    query = f"""
-        SELECT *
-        FROM reporting.mart_comments
-        WHERE company_id = '{company_id}'
-        ORDER BY comment_date DESC
+class DataVersionWatcher:
+    """Tracks the data version on a dedicated connection that LISTENs for runs.
+
+    A background thread re-reads the version whenever a notification arrives
+    (or every VERSION_POLL_SECONDS without one) and reconnects if the
+    connection drops, so reading the current version never touches the database.
     """
-    return query_data(query)
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.version = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='data-version-watcher', daemon=True)
+        self.thread.start()
+
+    def current(self, timeout: float = 5.0) -> Optional[str]:
+        """Current version; waits up to timeout for the first read"""
+        self.ready.wait(timeout)
+        return self.version
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                logger.warning("Data version watcher lost its connection, reconnecting: %s", e)
+            except Exception:
+                # Anything else would end the thread and freeze the version
+                logger.exception("Data version watcher failed, restarting")
+            # Keep serving the last known version until reconnected
+            self.ready.set()
+            time.sleep(min(5.0, VERSION_POLL_SECONDS))
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor = conn.cursor()
+            # LISTEN before reading, so a run finishing in between is not missed
+            cursor.execute(f"LISTEN {VERSION_CHANNEL}")
+            while True:
+                self.version = read_data_version(cursor)
+                self.ready.set()
+                if select.select([conn], [], [], VERSION_POLL_SECONDS) != ([], [], []):
+                    conn.poll()
+                    conn.notifies.clear()
+        finally:
+            conn.close()
+
+@st.cache_resource
+def get_version_watcher():
+    return DataVersionWatcher(get_connection_string())
+
+def get_data_version() -> Optional[str]:
+    """Version of the data in the database; changes after every ETL or dbt run"""
+    return get_version_watcher().current()
+
+@st.cache_resource
+def get_result_cache():
+    """Cache shared between dashboard replicas (None unless DASHBOARD_CACHE_DIR is set)"""
+    return result_cache.from_env()
@@ -20,6 +20,12 @@ page_company_deepdive = st.Page(
     icon=":material/analytics:",
 )
 
-pg = st.navigation(pages=[page_fund_overview, page_company_deepdive])
+page_risk_alerts = st.Page(
+    "views/risk_alerts.py",
+    title="Risk Alerts",
+    icon=":material/warning:",
+)
+
+pg = st.navigation(pages=[page_fund_overview, page_company_deepdive, page_risk_alerts])
 
 pg.run()
@@ -0,0 +1,183 @@
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# In-process version of dbt_pe/models/staging/stg_financials_enhanced.sql:
+# the same derived columns, computed with NumPy from base_data-shaped rows
+# (one row per company and month, company columns already joined on). Nulls
+# are NaN; rounding is half away from zero, as Postgres rounds numerics.
+
+BASE_MEASURES = [
+    'revenue', 'cogs', 'gross_profit', 'ebitda', 'depreciation', 'amortization', 'ebita',
+    'ebit', 'net_income', 'cash_from_ops', 'capex', 'ebitda_margin', 'working_capital', 'net_debt'
+]
+
+LTM_MONTHS = 12
+
+# The risk rules the model evaluates (macros/risk_rules.sql)
+RISK_RULES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'dbt_pe', 'seeds', 'risk_rules.csv'
+)
+RISK_FLAGS = ['revenue_risk_flag', 'margin_risk_flag', 'leverage_risk_flag', 'liquidity_risk_flag']
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '=': np.equal,
+}
+
+# Derived columns in the model's order
+METRIC_COLUMNS = [
+    'revenue_mom_growth_pct', 'ebitda_mom_growth_pct', 'revenue_yoy_growth_pct',
+    'ebitda_yoy_growth_pct', 'margin_change_bps',
+    'ltm_revenue', 'ltm_ebitda', 'ltm_cash_from_ops', 'ltm_capex',
+    'ytd_revenue', 'ytd_ebitda', 'ytd_cash_from_ops', 'ytd_capex',
+    'cash_conversion_pct', 'net_leverage_ratio', 'capex_intensity_pct', 'revenue_per_employee',
+    'gross_margin_pct', 'operating_expenses', 'opex_pct_of_revenue',
+] + RISK_FLAGS
+
+def load_risk_rules(path: str = RISK_RULES_PATH) -> pd.DataFrame:
+    """The financial rules of the risk_rules seed"""
+    rules = pd.read_csv(path)
+    return rules[rules['subject'] == 'financials'].reset_index(drop=True)
+
+def round_half_away(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Postgres round(numeric, d); the small offset absorbs float error at exact ties"""
+    scale = 10.0 ** decimals
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5 + 1e-7) / scale
+
+def _positions(starts: np.ndarray) -> np.ndarray:
+    """Row number within each group, given a mask of the rows that start one"""
+    index = np.arange(len(starts))
+    return index - np.maximum.accumulate(np.where(starts, index, 0))
+
+def _lag(values: np.ndarray, periods: int, positions: np.ndarray) -> np.ndarray:
+    """lag(values, periods) within groups; positions from _positions"""
+    if periods == 0:
+        return values
+    lagged = np.full(len(values), np.nan)
+    lagged[periods:] = values[:-periods]
+    lagged[positions < periods] = np.nan
+    return lagged
+
+def _trailing_sum(values: np.ndarray, rows: int, positions: np.ndarray) -> np.ndarray:
+    """sum(values) over the current and up to rows - 1 preceding rows of the group.
+
+    Null when every input is null, as SQL sum() is. Adding shifted copies
+    avoids the cancellation error of differencing one running total over
+    every row.
+    """
+    total = np.zeros(len(values))
+    present = np.zeros(len(values), dtype=bool)
+    for periods in range(rows):
+        lagged = _lag(values, periods, positions)
+        found = ~np.isnan(lagged)
+        total += np.where(found, lagged, 0.0)
+        present |= found
+    return np.where(present, total, np.nan)
+
+def _ratio(numerator, denominator, scale, decimals, where) -> np.ndarray:
+    """round(numerator / denominator * scale, decimals) where the condition holds"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(where, round_half_away(numerator / denominator * scale, decimals), np.nan)
+
+def compute_metric_arrays(
+    company_ids: np.ndarray,
+    years: np.ndarray,
+    employees: np.ndarray,
+    measures: Dict[str, np.ndarray],
+    rules: pd.DataFrame,
+) -> Dict[str, np.ndarray]:
+    """Derived metric columns for rows sorted by company and date.
+
+    measures holds a float array per BASE_MEASURES column, NaN for nulls;
+    rules are financial risk rules as from load_risk_rules.
+    """
+    new_company = np.r_[True, company_ids[1:] != company_ids[:-1]]
+    positions = _positions(new_company)
+    revenue = measures['revenue']
+    ebitda = measures['ebitda']
+    margin = measures['ebitda_margin']
+    gross_profit = measures['gross_profit']
+    cash_from_ops = measures['cash_from_ops']
+    capex = measures['capex']
+    net_debt = measures['net_debt']
+
+    revenue_prev_month = _lag(revenue, 1, positions)
+    ebitda_prev_month = _lag(ebitda, 1, positions)
+    margin_prev_month = _lag(margin, 1, positions)
+    revenue_prev_year = _lag(revenue, 12, positions)
+    ebitda_prev_year = _lag(ebitda, 12, positions)
+
+    # LTM: 12-row windows; only kept once a company has 12 months of rows
+    full_window = positions >= LTM_MONTHS - 1
+    ltm = {
+        name: np.where(full_window, _trailing_sum(measures[name], LTM_MONTHS, positions), np.nan)
+        for name in ('revenue', 'ebitda', 'cash_from_ops', 'capex')
+    }
+
+    # YTD: running sums per company and year, for the latest year only
+    year_positions = _positions(new_company | np.r_[True, years[1:] != years[:-1]])
+    year_rows = int(year_positions.max()) + 1 if len(years) else 0
+    latest_year = years == years.max() if len(years) else np.zeros(0, dtype=bool)
+    ytd = {
+        name: np.where(latest_year, _trailing_sum(measures[name], year_rows, year_positions), np.nan)
+        for name in ('revenue', 'ebitda', 'cash_from_ops', 'capex')
+    }
+
+    with np.errstate(invalid='ignore'):
+        metrics = {
+            'revenue_mom_growth_pct': _ratio(revenue - revenue_prev_month, revenue_prev_month, 100, 2, revenue_prev_month > 0),
+            'ebitda_mom_growth_pct': _ratio(ebitda - ebitda_prev_month, ebitda_prev_month, 100, 2, ebitda_prev_month > 0),
+            'revenue_yoy_growth_pct': _ratio(revenue - revenue_prev_year, revenue_prev_year, 100, 2, revenue_prev_year > 0),
+            'ebitda_yoy_growth_pct': _ratio(ebitda - ebitda_prev_year, ebitda_prev_year, 100, 2, ebitda_prev_year > 0),
+            'margin_change_bps': round_half_away((margin - margin_prev_month) * 100, 0),
+            'ltm_revenue': ltm['revenue'],
+            'ltm_ebitda': ltm['ebitda'],
+            'ltm_cash_from_ops': ltm['cash_from_ops'],
+            'ltm_capex': ltm['capex'],
+            'ytd_revenue': ytd['revenue'],
+            'ytd_ebitda': ytd['ebitda'],
+            'ytd_cash_from_ops': ytd['cash_from_ops'],
+            'ytd_capex': ytd['capex'],
+            'cash_conversion_pct': _ratio(cash_from_ops, ebitda, 100, 1, ebitda > 0),
+            'net_leverage_ratio': _ratio(net_debt, ltm['ebitda'], 1, 2, ltm['ebitda'] > 0),
+            'capex_intensity_pct': _ratio(capex, revenue, 100, 1, revenue > 0),
+            'revenue_per_employee': _ratio(revenue, employees, 1, 2, employees > 0),
+            'gross_margin_pct': _ratio(gross_profit, revenue, 100, 2, revenue > 0),
+            'operating_expenses': gross_profit - ebitda,
+            'opex_pct_of_revenue': _ratio(gross_profit - ebitda, revenue, 100, 2, revenue > 0),
+        }
+
+        # A flag is set when any of its rules is breached; NaN breaches nothing
+        values = {**measures, **metrics}
+        for flag in RISK_FLAGS:
+            metrics[flag] = np.zeros(len(company_ids), dtype=bool)
+        for rule in rules.itertuples(index=False):
+            metrics[rule.flag] |= OPERATORS[rule.operator](values[rule.metric], rule.threshold)
+    return metrics
+
+def compute_metrics(financials: pd.DataFrame, rules: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """stg_financials_enhanced's columns for base_data-shaped rows.
+
+    financials needs company_id, date, year, employees and BASE_MEASURES.
+    Returns its rows sorted by company and date, with METRIC_COLUMNS added
+    (replacing any already there). rules defaults to the risk_rules seed.
+    """
+    if rules is None:
+        rules = load_risk_rules()
+
+    base = financials.drop(columns=METRIC_COLUMNS, errors='ignore')
+    base = base.sort_values(['company_id', 'date'], kind='stable', ignore_index=True)
+
+    metrics = compute_metric_arrays(
+        base['company_id'].to_numpy(),
+        base['year'].to_numpy(dtype='int64'),
+        base['employees'].to_numpy(dtype='float64', na_value=np.nan),
+        {name: base[name].to_numpy(dtype='float64', na_value=np.nan) for name in BASE_MEASURES},
+        rules,
+    )
+    return pd.concat([base, pd.DataFrame(metrics)], axis=1)
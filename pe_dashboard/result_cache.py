@@ -0,0 +1,209 @@
+import fcntl
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Shared result cache for several dashboard replicas: set DASHBOARD_CACHE_DIR
+# to a directory on a volume every replica mounts
+CACHE_DIR = os.getenv('DASHBOARD_CACHE_DIR')
+CACHE_MAX_MB = float(os.getenv('DASHBOARD_CACHE_MAX_MB', '512'))
+# How long a replica waits for another one computing the same key
+LOCK_TIMEOUT = float(os.getenv('DASHBOARD_CACHE_LOCK_TIMEOUT', '60'))
+
+class CacheBackend(ABC):
+    """Byte store behind ResultCache.
+
+    Backends evict least recently used entries once they hold more than
+    max_bytes. A Redis-like store maps onto this directly: GET/SET for
+    get/set (with maxmemory-policy allkeys-lru for eviction) and a
+    SET key NX PX lease for lock.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored value, or None on a miss"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value, evicting old entries if over the size bound"""
+
+    def lock(self, key: str):
+        """Context manager held while computing key, across processes.
+
+        The default only relies on ResultCache's in-process single-flight.
+        """
+        return nullcontext()
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU store; the local stand-in for a shared backend"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.mutex = threading.Lock()
+
+    def get(self, key):
+        with self.mutex:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.mutex:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+class ParquetDirBackend(CacheBackend):
+    """One Parquet file per entry in a directory shared by all replicas.
+
+    Files are written to a temporary name and renamed into place, so readers
+    never see a partial file. Reads bump the file's mtime, and eviction
+    removes the oldest files first. Per-key lock files (flock) make a
+    replica wait while another computes the same key.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key, suffix='.parquet'):
+        return os.path.join(self.path, key + suffix)
+
+    def get(self, key):
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        tmp_path = self._file(key, f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, self._file(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.parquet'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries)[:-1]:
+            if total <= self.max_bytes:
+                break
+            # Removing a lock file someone holds can at worst cause one
+            # duplicate computation of an entry that was just evicted anyway
+            try:
+                os.remove(path)
+                os.remove(path[:-len('.parquet')] + '.lock')
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    @contextmanager
+    def lock(self, key):
+        with open(self._file(key, '.lock'), 'a') as f:
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    # Give up waiting and compute it ourselves
+                    if time.monotonic() > deadline:
+                        yield
+                        return
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def cache_key(*parts) -> str:
+    """Stable key for a tuple of JSON-serializable parts"""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+def _encode(frame: pd.DataFrame) -> bytes:
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), sink)
+    return sink.getvalue()
+
+def _decode(value: bytes) -> pd.DataFrame:
+    table = pq.read_table(pa.BufferReader(value))
+    # Arrow-backed frames (DB_ARROW_TRANSFER) come back Arrow-backed
+    columns = (table.schema.pandas_metadata or {}).get('columns', [])
+    if columns and all(column['numpy_type'].endswith('[pyarrow]') for column in columns):
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas()
+
+class ResultCache:
+    """DataFrame results in a CacheBackend, computed at most once per key.
+
+    Concurrent misses for the same key in this process wait on one
+    in-flight computation; across processes the backend's lock does the same.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.inflight = {}
+        self.mutex = threading.Lock()
+
+    def _get(self, key) -> Optional[pd.DataFrame]:
+        value = self.backend.get(key)
+        return None if value is None else _decode(value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        frame = self._get(key)
+        if frame is not None:
+            return frame
+
+        with self.mutex:
+            key_lock = self.inflight.setdefault(key, threading.Lock())
+        try:
+            with key_lock, self.backend.lock(key):
+                # Whoever held the lock before us may have stored it
+                value = self.backend.get(key)
+                if value is None:
+                    frame = compute()
+                    self.backend.set(key, _encode(frame))
+                    return frame
+        finally:
+            with self.mutex:
+                if self.inflight.get(key) is key_lock and not key_lock.locked():
+                    del self.inflight[key]
+        # Decode outside the locks so waiters do not queue behind each other
+        return _decode(value)
+
+def from_env() -> Optional[ResultCache]:
+    """Shared cache on DASHBOARD_CACHE_DIR, or None when it is not set"""
+    if not CACHE_DIR:
+        return None
+    return ResultCache(ParquetDirBackend(CACHE_DIR, int(CACHE_MAX_MB * 1024 * 1024)))
@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import sys
 sys.path.append('..')
-from db_connection import (
+from charts import budget_figure, cached_figure, kpi_figure, trends_figure
+from data_store import (
+    data_version,
     get_company_list, 
     get_company_financials,
     get_company_budget_variance,
@@ -13,398 +12,167 @@ from db_connection import (
     get_company_comments
 )
 
-st.title("📈 Company Deep Dive")
+COMMENTS_PER_PAGE = 20
 
-# Set dark mode permanently
-st._config.set_option('theme.base', 'dark')
+# (label, column, decimals) per table row; None is a blank separator row
+FINANCIAL_TABLE_ROWS = [
+    ('Revenue (€M)', 'revenue', 2),
+    ('Revenue MoM Growth %', 'revenue_mom_growth_pct', 1),
+    ('Revenue YoY Growth %', 'revenue_yoy_growth_pct', 1),
+    None,
+    ('Gross Profit (€M)', 'gross_profit', 2),
+    ('Gross Margin %', 'gross_margin_pct', 1),
+    None,
+    ('EBITDA (€M)', 'ebitda', 2),
+    ('EBITDA Margin %', 'ebitda_margin', 1),
+    ('EBITDA MoM Growth %', 'ebitda_mom_growth_pct', 1),
+    ('EBITDA YoY Growth %', 'ebitda_yoy_growth_pct', 1),
+    None,
+    ('Cash Conversion %', 'cash_conversion_pct', 1),
+    ('Net Leverage Ratio', 'net_leverage_ratio', 2),
+]
 
-with st.sidebar:
-    st.header("Filters")
-    
-    companies_df = get_company_list()
-    
-    if companies_df is not None and not companies_df.empty:
-        company_options = {row['company_name']: row['company_id'] 
-                          for _, row in companies_df.iterrows()}
-        
-        selected_company_name = st.selectbox(
-            "Select Company",
-            options=list(company_options.keys()),
-            index=0
-        )
-        
-        selected_company_id = company_options[selected_company_name]
-    else:
-        st.error("No companies available")
-        st.stop()
+VARIANCE_TABLE_ROWS = [
+    ('Actual Revenue (€M)', 'actual_revenue', 2),
+    ('Budget Revenue (€M)', 'budget_revenue', 2),
+    ('Revenue Variance %', 'variance_revenue_pct', 1),
+    None,
+    ('Actual EBITDA (€M)', 'actual_ebitda', 2),
+    ('Budget EBITDA (€M)', 'budget_ebitda', 2),
+    ('EBITDA Variance %', 'variance_ebitda_pct', 1),
+]
 
-if selected_company_id == 'C001':
-    
-    financials_df = get_company_financials(selected_company_id)
-    
-    if financials_df is None or financials_df.empty:
-        st.error("No financial data available for this company")
-        st.stop()
-    
-    latest_data = financials_df.iloc[-1]
-    
-    st.subheader(f"{selected_company_name}")
-    st.caption(f"Industry: {latest_data['industry']} | Employees: {int(latest_data['employees']) if pd.notna(latest_data['employees']) else 'N/A'}")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            "Latest Revenue",
-            f"€{latest_data['revenue']:.1f}M",
-            delta=f"{latest_data['revenue_mom_growth_pct']:.1f}% MoM" if pd.notna(latest_data['revenue_mom_growth_pct']) else None
-        )
-    
-    with col2:
-        st.metric(
-            "Latest EBITDA",
-            f"€{latest_data['ebitda']:.1f}M",
-            delta=f"{latest_data['ebitda_mom_growth_pct']:.1f}% MoM" if pd.notna(latest_data['ebitda_mom_growth_pct']) else None
-        )
-    
-    with col3:
-        st.metric(
-            "EBITDA Margin",
-            f"{latest_data['ebitda_margin']:.1f}%",
-            delta=f"{latest_data['margin_change_bps']:.0f} bps" if pd.notna(latest_data['margin_change_bps']) else None
-        )
-    
-    with col4:
-        leverage_value = latest_data['net_leverage_ratio']
-        if pd.notna(leverage_value):
-            leverage_color = "🟢" if leverage_value < 3.0 else "🟡" if leverage_value < 5.0 else "🔴"
-            st.metric(
-                "Net Leverage",
-                f"{leverage_value:.2f}x",
-                delta=leverage_color
-            )
-        else:
-            st.metric("Net Leverage", "N/A")
-    
-    st.divider()
-    
-    with st.expander("📊 Financial Metrics Table", expanded=False):
-        # Select last 12 months and pivot
-        recent_data = financials_df.tail(12).copy()
-        
-        # Create grouped metrics with blank rows
-        metrics_data = {
-            'Metric': [
-                'Revenue (€M)',
-                'Revenue MoM Growth %',
-                'Revenue YoY Growth %',
-                '',
-                'Gross Profit (€M)',
-                'Gross Margin %',
-                '',
-                'EBITDA (€M)',
-                'EBITDA Margin %',
-                'EBITDA MoM Growth %',
-                'EBITDA YoY Growth %',
-                '',
-                'Cash Conversion %',
-                'Net Leverage Ratio'
-            ]
-        }
-        
-        # Add each month as a column
-        for _, row in recent_data.iterrows():
-            month = row['year_month']
-            metrics_data[month] = [
-                f"{row['revenue']:.2f}" if pd.notna(row['revenue']) else '-',
-                f"{row['revenue_mom_growth_pct']:.1f}" if pd.notna(row['revenue_mom_growth_pct']) else '-',
-                f"{row['revenue_yoy_growth_pct']:.1f}" if pd.notna(row['revenue_yoy_growth_pct']) else '-',
-                '',  # Blank row
-                f"{row['gross_profit']:.2f}" if pd.notna(row['gross_profit']) else '-',
-                f"{row['gross_margin_pct']:.1f}" if pd.notna(row['gross_margin_pct']) else '-',
-                '',  # Blank row
-                f"{row['ebitda']:.2f}" if pd.notna(row['ebitda']) else '-',
-                f"{row['ebitda_margin']:.1f}" if pd.notna(row['ebitda_margin']) else '-',
-                f"{row['ebitda_mom_growth_pct']:.1f}" if pd.notna(row['ebitda_mom_growth_pct']) else '-',
-                f"{row['ebitda_yoy_growth_pct']:.1f}" if pd.notna(row['ebitda_yoy_growth_pct']) else '-',
-                '',  # Blank row
-                f"{row['cash_conversion_pct']:.1f}" if pd.notna(row['cash_conversion_pct']) else '-',
-                f"{row['net_leverage_ratio']:.2f}" if pd.notna(row['net_leverage_ratio']) else '-'
-            ]
-        
-        pivot_df = pd.DataFrame(metrics_data)
-        
-        st.dataframe(
-            pivot_df,
-            width='stretch',
-            hide_index=True
-        )
-    
-    st.subheader("📈 Monthly Trends")
-    
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Revenue & YoY Growth', 'EBITDA & Margin %', 
-                       'Gross Profit & Margin %', 'OpEx & % of Revenue'),
-        specs=[[{"secondary_y": True}, {"secondary_y": True}],
-               [{"secondary_y": True}, {"secondary_y": True}]],
-        vertical_spacing=0.15,
-        horizontal_spacing=0.1
-    )
-    
-    # Chart 1: Revenue + YoY Growth
-    fig.add_trace(
-        go.Bar(x=financials_df['date'], y=financials_df['revenue'],
-              name='Revenue', marker=dict(color='#5DADE2', opacity=0.7),
-              hovertemplate='Revenue: €%{y:.2f}M<extra></extra>'),
-        row=1, col=1, secondary_y=False
-    )
-    # Only show labels for quarterly months (Mar, Jun, Sep, Dec)
-    text_labels_1 = [f"{val:.1f}%" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                     for date, val in zip(financials_df['date'], financials_df['revenue_yoy_growth_pct'])]
-    fig.add_trace(
-        go.Scatter(x=financials_df['date'], y=financials_df['revenue_yoy_growth_pct'],
-                  name='YoY Growth %', line=dict(color='#67EBF5', width=2),
-                  mode='lines+markers+text',
-                  text=text_labels_1,
-                  textposition='top center', textfont=dict(size=9),
-                  hovertemplate='YoY Growth: %{y:.1f}%<extra></extra>'),
-        row=1, col=1, secondary_y=True
-    )
-    
-    # Chart 2: EBITDA + Margin
-    fig.add_trace(
-        go.Bar(x=financials_df['date'], y=financials_df['ebitda'],
-              name='EBITDA', marker=dict(color='#5DADE2', opacity=0.7),
-              hovertemplate='EBITDA: €%{y:.2f}M<extra></extra>'),
-        row=1, col=2, secondary_y=False
-    )
-    text_labels_2 = [f"{val:.1f}%" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                     for date, val in zip(financials_df['date'], financials_df['ebitda_margin'])]
-    fig.add_trace(
-        go.Scatter(x=financials_df['date'], y=financials_df['ebitda_margin'],
-                  name='Margin %', line=dict(color='#67EBF5', width=2),
-                  mode='lines+markers+text',
-                  text=text_labels_2,
-                  textposition='top center', textfont=dict(size=9),
-                  hovertemplate='EBITDA Margin: %{y:.1f}%<extra></extra>'),
-        row=1, col=2, secondary_y=True
-    )
-    
-    # Chart 3: Gross Profit + Margin
-    fig.add_trace(
-        go.Bar(x=financials_df['date'], y=financials_df['gross_profit'],
-              name='Gross Profit', marker=dict(color='#5DADE2', opacity=0.7),
-              hovertemplate='Gross Profit: €%{y:.2f}M<extra></extra>'),
-        row=2, col=1, secondary_y=False
-    )
-    text_labels_3 = [f"{val:.1f}%" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                     for date, val in zip(financials_df['date'], financials_df['gross_margin_pct'])]
-    fig.add_trace(
-        go.Scatter(x=financials_df['date'], y=financials_df['gross_margin_pct'],
-                  name='GM %', line=dict(color='#67EBF5', width=2),
-                  mode='lines+markers+text',
-                  text=text_labels_3,
-                  textposition='top center', textfont=dict(size=9),
-                  hovertemplate='Gross Margin: %{y:.1f}%<extra></extra>'),
-        row=2, col=1, secondary_y=True
+def metrics_table(df, rows):
+    """Months as columns, one metric per row, formatted per row by a Styler"""
+    metrics = [row for row in rows if row is not None]
+    table = df.set_index('year_month')[[column for _, column, _ in metrics]].T.astype('float64')
+    table.index = [label for label, _, _ in metrics]
+    table = table.reindex(['' if row is None else row[0] for row in rows])
+    table = table.rename_axis(index='Metric', columns=None).reset_index()
+    
+    months = table.columns[1:]
+    styler = table.style
+    for decimals in {row[2] for row in metrics}:
+        positions = [i for i, row in enumerate(rows) if row is not None and row[2] == decimals]
+        styler = styler.format(f"{{:.{decimals}f}}", subset=pd.IndexSlice[positions, months], na_rep='-')
+    blanks = [i for i, row in enumerate(rows) if row is None]
+    return styler.format(lambda _: '', subset=pd.IndexSlice[blanks, months])
+
+def company_financials(company_id):
+    """Monthly financials with one row per month.
+
+    mart_company_performance has a row per fund for companies held by
+    several funds; the financial columns are the same in each.
+    """
+    financials_df = get_company_financials(company_id)
+    if financials_df is None:
+        return None
+    return financials_df.drop_duplicates('date', keep='last', ignore_index=True)
+
+@st.fragment
+def render_trends(company_id):
+    """Revenue, EBITDA, gross profit and OpEx charts over the full history"""
+    fig = cached_figure(
+        company_id, 'trends', data_version(),
+        lambda: trends_figure(company_financials(company_id))
     )
     
-    # Chart 4: OpEx + % of Revenue
-    fig.add_trace(
-        go.Bar(x=financials_df['date'], y=financials_df['operating_expenses'],
-              name='OpEx', marker=dict(color='#5DADE2', opacity=0.7),
-              hovertemplate='OpEx: €%{y:.2f}M<extra></extra>'),
-        row=2, col=2, secondary_y=False
-    )
-    text_labels_4 = [f"{val:.1f}%" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                     for date, val in zip(financials_df['date'], financials_df['opex_pct_of_revenue'])]
-    fig.add_trace(
-        go.Scatter(x=financials_df['date'], y=financials_df['opex_pct_of_revenue'],
-                  name='OpEx %', line=dict(color='#67EBF5', width=2),
-                  mode='lines+markers+text',
-                  text=text_labels_4,
-                  textposition='top center', textfont=dict(size=9),
-                  hovertemplate='% of Revenue: %{y:.1f}%<extra></extra>'),
-        row=2, col=2, secondary_y=True
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def render_financial_table(company_id):
+    """Monthly metrics for the last N months, months as columns"""
+    financials_df = company_financials(company_id)
+    
+    months = st.radio(
+        "Months",
+        options=[12, 24, 36],
+        horizontal=True,
+        key=f"table_months_{company_id}"
     )
     
-    # Update axes
-    fig.update_xaxes(showgrid=False, type='date', tickformat='%b %y')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(211, 211, 211, 0.2)')
-    
-    # Set y-axis titles
-    fig.update_yaxes(title_text="€M", row=1, col=1, secondary_y=False)
-    fig.update_yaxes(title_text="%", row=1, col=1, secondary_y=True)
-    fig.update_yaxes(title_text="€M", row=1, col=2, secondary_y=False)
-    fig.update_yaxes(title_text="%", row=1, col=2, secondary_y=True)
-    fig.update_yaxes(title_text="€M", row=2, col=1, secondary_y=False)
-    fig.update_yaxes(title_text="%", row=2, col=1, secondary_y=True)
-    fig.update_yaxes(title_text="€M", row=2, col=2, secondary_y=False)
-    fig.update_yaxes(title_text="%", row=2, col=2, secondary_y=True)
-    
-    fig.update_layout(
-        height=700,
-        showlegend=False,
-        hovermode='x unified'
+    st.dataframe(
+        metrics_table(financials_df.tail(months), FINANCIAL_TABLE_ROWS),
+        width='stretch',
+        hide_index=True
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    st.divider()
-    
-    st.subheader("📊 Budget vs Actual Analysis")
-    
-    budget_df = get_company_budget_variance(selected_company_id)
+
+@st.fragment
+def render_budget(company_id):
+    """Actual vs budget for one fiscal year"""
+    budget_df = get_company_budget_variance(company_id)
     
     if budget_df is not None and not budget_df.empty:
-        budget_df_2024 = budget_df[budget_df['year'] == 2024].copy()
+        years = sorted(budget_df['year'].unique(), reverse=True)
+        budget_year = st.selectbox(
+            "Budget Year",
+            options=years,
+            key=f"budget_year_{company_id}"
+        )
+        budget_year_df = budget_df[budget_df['year'] == budget_year]
         
-        if not budget_df_2024.empty:
-            latest_ytd = budget_df_2024.iloc[-1]
+        if not budget_year_df.empty:
+            latest_ytd = budget_year_df.iloc[-1]
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 st.metric(
                     "YTD Revenue",
-                    f"€{latest_ytd['ytd_actual_revenue']:.1f}M",
-                    delta=f"{latest_ytd['ytd_variance_revenue_pct']:.1f}% vs Budget"
+                    f"€{latest_ytd['ytd_actual_revenue']:.1f}M" if pd.notna(latest_ytd['ytd_actual_revenue']) else "N/A",
+                    delta=f"{latest_ytd['ytd_variance_revenue_pct']:.1f}% vs Budget" if pd.notna(latest_ytd['ytd_variance_revenue_pct']) else None
                 )
             
             with col2:
                 st.metric(
                     "YTD EBITDA",
-                    f"€{latest_ytd['ytd_actual_ebitda']:.1f}M",
-                    delta=f"{latest_ytd['ytd_variance_ebitda_pct']:.1f}% vs Budget"
+                    f"€{latest_ytd['ytd_actual_ebitda']:.1f}M" if pd.notna(latest_ytd['ytd_actual_ebitda']) else "N/A",
+                    delta=f"{latest_ytd['ytd_variance_ebitda_pct']:.1f}% vs Budget" if pd.notna(latest_ytd['ytd_variance_ebitda_pct']) else None
                 )
             
             with col3:
                 st.metric(
                     "YTD Budget Rev",
-                    f"€{latest_ytd['ytd_budget_revenue']:.1f}M"
+                    f"€{latest_ytd['ytd_budget_revenue']:.1f}M" if pd.notna(latest_ytd['ytd_budget_revenue']) else "N/A"
                 )
             
             with col4:
                 st.metric(
                     "YTD Budget EBITDA",
-                    f"€{latest_ytd['ytd_budget_ebitda']:.1f}M"
+                    f"€{latest_ytd['ytd_budget_ebitda']:.1f}M" if pd.notna(latest_ytd['ytd_budget_ebitda']) else "N/A"
                 )
             
-            fig_budget = make_subplots(
-                rows=1, cols=2,
-                subplot_titles=('Monthly Revenue: Actual vs Budget', 'Monthly EBITDA: Actual vs Budget'),
-                horizontal_spacing=0.15
-            )
-            
-            # Revenue Chart - Actual line with quarterly labels
-            text_labels_rev = [f"€{val:.1f}M" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                               for date, val in zip(budget_df_2024['year_month'], budget_df_2024['actual_revenue'])]
-            fig_budget.add_trace(
-                go.Scatter(x=budget_df_2024['year_month'], y=budget_df_2024['actual_revenue'],
-                          name='Actual', line=dict(color='#67EBF5', width=2),
-                          mode='lines+markers+text',
-                          text=text_labels_rev,
-                          textposition='top center', textfont=dict(size=9),
-                          hovertemplate='Actual Revenue: €%{y:.2f}M<extra></extra>'),
-                row=1, col=1
-            )
-            fig_budget.add_trace(
-                go.Scatter(x=budget_df_2024['year_month'], y=budget_df_2024['budget_revenue'],
-                          name='Budget', line=dict(color='#FF6B6B', width=2),
-                          mode='lines+markers',
-                          opacity=0.7,
-                          hovertemplate='Budget Revenue: €%{y:.2f}M<extra></extra>'),
-                row=1, col=1
-            )
-            
-            # EBITDA Chart - Actual line with quarterly labels
-            text_labels_ebitda = [f"€{val:.1f}M" if pd.notna(val) and pd.to_datetime(date).month in [3, 6, 9, 12] else "" 
-                                  for date, val in zip(budget_df_2024['year_month'], budget_df_2024['actual_ebitda'])]
-            fig_budget.add_trace(
-                go.Scatter(x=budget_df_2024['year_month'], y=budget_df_2024['actual_ebitda'],
-                          name='Actual', line=dict(color='#67EBF5', width=2),
-                          mode='lines+markers+text',
-                          text=text_labels_ebitda,
-                          textposition='top center', textfont=dict(size=9),
-                          showlegend=False,
-                          hovertemplate='Actual EBITDA: €%{y:.2f}M<extra></extra>'),
-                row=1, col=2
-            )
-            fig_budget.add_trace(
-                go.Scatter(x=budget_df_2024['year_month'], y=budget_df_2024['budget_ebitda'],
-                          name='Budget', line=dict(color='#FF6B6B', width=2),
-                          mode='lines+markers',
-                          opacity=0.7,
-                          showlegend=False,
-                          hovertemplate='Budget EBITDA: €%{y:.2f}M<extra></extra>'),
-                row=1, col=2
-            )
-            
-            fig_budget.update_xaxes(showgrid=False, type='date', tickformat='%b %y')
-            fig_budget.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(211, 211, 211, 0.2)')
-            
-            fig_budget.update_layout(
-                height=400,
-                showlegend=True,
-                hovermode='x unified'
+            fig_budget = cached_figure(
+                company_id, ('budget', int(budget_year)), data_version(),
+                lambda: budget_figure(budget_year_df)
             )
             
             st.plotly_chart(fig_budget, use_container_width=True)
             
             with st.expander("📋 Detailed Variance Table"):
-                # Create pivoted variance table with months as columns
-                variance_data = {
-                    'Metric': [
-                        'Actual Revenue (€M)',
-                        'Budget Revenue (€M)',
-                        'Revenue Variance %',
-                        '',
-                        'Actual EBITDA (€M)',
-                        'Budget EBITDA (€M)',
-                        'EBITDA Variance %'
-                    ]
-                }
-                
-                # Add each month as a column
-                for _, row in budget_df_2024.iterrows():
-                    month = row['year_month']
-                    variance_data[month] = [
-                        f"{row['actual_revenue']:.2f}" if pd.notna(row['actual_revenue']) else '-',
-                        f"{row['budget_revenue']:.2f}" if pd.notna(row['budget_revenue']) else '-',
-                        f"{row['variance_revenue_pct']:.1f}" if pd.notna(row['variance_revenue_pct']) else '-',
-                        '',  # Blank row
-                        f"{row['actual_ebitda']:.2f}" if pd.notna(row['actual_ebitda']) else '-',
-                        f"{row['budget_ebitda']:.2f}" if pd.notna(row['budget_ebitda']) else '-',
-                        f"{row['variance_ebitda_pct']:.1f}" if pd.notna(row['variance_ebitda_pct']) else '-'
-                    ]
-                
-                variance_pivot_df = pd.DataFrame(variance_data)
-                
                 st.dataframe(
-                    variance_pivot_df,
+                    metrics_table(budget_year_df, VARIANCE_TABLE_ROWS),
                     width='stretch',
                     hide_index=True
                 )
     else:
         st.info("No budget data available")
-    
-    st.divider()
-    
-    st.subheader("🎯 Key Performance Indicators")
-    
-    kpis_df = get_company_kpis(selected_company_id)
+
+@st.fragment
+def render_kpis(company_id):
+    """Latest value and trend of each KPI the company reports"""
+    kpis_df = get_company_kpis(company_id)
     
     if kpis_df is not None and not kpis_df.empty:
-        kpi_names = ['Homes Passed (000s)', 'ARPU (€ / month)', 'Churn Rate (%)']
+        kpi_names = sorted(kpis_df['kpi_name'].unique())
         
-        col1, col2, col3 = st.columns(3)
+        columns = st.columns(3)
         
-        for col, kpi_name in zip([col1, col2, col3], kpi_names):
-            kpi_data = kpis_df[kpis_df['kpi_name'] == kpi_name].copy()
+        for i, kpi_name in enumerate(kpi_names):
+            kpi_data = kpis_df[kpis_df['kpi_name'] == kpi_name]
             
             if not kpi_data.empty:
-                with col:
+                with columns[i % 3]:
                     with st.container(border=True):
                         latest_kpi = kpi_data.iloc[-1]
                         prev_kpi = kpi_data.iloc[-2] if len(kpi_data) > 1 else None
@@ -419,21 +187,9 @@ if selected_company_id == 'C001':
                             delta=delta_val
                         )
                         
-                        fig_kpi = go.Figure()
-                        fig_kpi.add_trace(go.Scatter(
-                            x=kpi_data['date'],
-                            y=kpi_data['kpi_value'],
-                            mode='lines+markers',
-                            line=dict(width=2),
-                            marker=dict(size=4)
-                        ))
-                        
-                        fig_kpi.update_layout(
-                            height=200,
-                            margin=dict(l=0, r=0, t=20, b=0),
-                            showlegend=False,
-                            xaxis=dict(showgrid=False, type='date', tickformat='%b %y'),
-                            yaxis=dict(showgrid=True, gridcolor='rgba(211, 211, 211, 0.2)')
+                        fig_kpi = cached_figure(
+                            company_id, ('kpi', kpi_name), data_version(),
+                            lambda: kpi_figure(kpi_data)
                         )
                         
                         st.plotly_chart(fig_kpi, use_container_width=True)
@@ -442,29 +198,130 @@ if selected_company_id == 'C001':
                             st.warning("⚠️ Risk threshold exceeded")
     else:
         st.info("No KPI data available")
-    
-    st.divider()
-    
-    st.subheader("💬 Comments")
-    
-    comments_df = get_company_comments(selected_company_id)
+
+@st.fragment
+def render_comments(company_id):
+    """Comments, newest first, one page at a time"""
+    comments_df = get_company_comments(company_id)
     
     if comments_df is not None and not comments_df.empty:
-        for _, comment in comments_df.iterrows():
+        # Render one page of comments at a time; comments are newest first
+        page_count = -(-len(comments_df) // COMMENTS_PER_PAGE)
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                f"Page (of {page_count})",
+                min_value=1,
+                max_value=page_count,
+                value=1,
+                key=f"comments_page_{company_id}"
+            )
+        start = (page - 1) * COMMENTS_PER_PAGE
+        page_df = comments_df.iloc[start:start + COMMENTS_PER_PAGE]
+        st.caption(f"Showing {start + 1}–{start + len(page_df)} of {len(comments_df)} comments")
+        
+        for comment in page_df.itertuples(index=False):
             with st.container(border=True):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
-                    st.markdown(f"**{comment['author']}** - {comment['role']}")
+                    st.markdown(f"**{comment.author}** - {comment.role}")
                 
                 with col2:
-                    st.caption(f"{comment['comment_date']}")
+                    st.caption(f"{comment.comment_date}")
                 
-                st.write(comment['comment_text'])
+                st.write(comment.comment_text)
     else:
         st.info("No comments available")
 
-else:
-    st.info(f"📊 Full analytics currently available for **NordicFiber AB**. Please select that company from the dropdown to view detailed performance metrics, KPIs, and budget analysis.")
-    st.write("")
-    st.write(f"Selected company: **{selected_company_name}** (ID: {selected_company_id})")
+# Only the selected section is loaded and rendered; each is a fragment, so
+# its own widgets rerun just that section
+SECTIONS = {
+    "Monthly Trends": render_trends,
+    "Financial Metrics Table": render_financial_table,
+    "Budget vs Actual": render_budget,
+    "KPIs": render_kpis,
+    "Comments": render_comments,
+}
+
+st.title("📈 Company Deep Dive")
+
+# Set dark mode permanently
+st._config.set_option('theme.base', 'dark')
+
+with st.sidebar:
+    st.header("Filters")
+    
+    companies_df = get_company_list()
+    
+    if companies_df is not None and not companies_df.empty:
+        company_options = dict(zip(companies_df['company_name'], companies_df['company_id']))
+        
+        selected_company_name = st.selectbox(
+            "Select Company",
+            options=list(company_options.keys()),
+            index=0
+        )
+        
+        selected_company_id = company_options[selected_company_name]
+    else:
+        st.error("No companies available")
+        st.stop()
+
+financials_df = company_financials(selected_company_id)
+
+if financials_df is None or financials_df.empty:
+    st.error("No financial data available for this company")
+    st.stop()
+
+latest_data = financials_df.iloc[-1]
+
+st.subheader(f"{selected_company_name}")
+st.caption(f"Industry: {latest_data['industry']} | Employees: {int(latest_data['employees']) if pd.notna(latest_data['employees']) else 'N/A'}")
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric(
+        "Latest Revenue",
+        f"€{latest_data['revenue']:.1f}M",
+        delta=f"{latest_data['revenue_mom_growth_pct']:.1f}% MoM" if pd.notna(latest_data['revenue_mom_growth_pct']) else None
+    )
+
+with col2:
+    st.metric(
+        "Latest EBITDA",
+        f"€{latest_data['ebitda']:.1f}M",
+        delta=f"{latest_data['ebitda_mom_growth_pct']:.1f}% MoM" if pd.notna(latest_data['ebitda_mom_growth_pct']) else None
+    )
+
+with col3:
+    st.metric(
+        "EBITDA Margin",
+        f"{latest_data['ebitda_margin']:.1f}%",
+        delta=f"{latest_data['margin_change_bps']:.0f} bps" if pd.notna(latest_data['margin_change_bps']) else None
+    )
+
+with col4:
+    leverage_value = latest_data['net_leverage_ratio']
+    if pd.notna(leverage_value):
+        leverage_color = "🟢" if leverage_value < 3.0 else "🟡" if leverage_value < 5.0 else "🔴"
+        st.metric(
+            "Net Leverage",
+            f"{leverage_value:.2f}x",
+            delta=leverage_color
+        )
+    else:
+        st.metric("Net Leverage", "N/A")
+
+st.divider()
+
+section = st.radio(
+    "Section",
+    options=list(SECTIONS),
+    horizontal=True,
+    key="deepdive_section",
+    label_visibility="collapsed"
+)
+
+SECTIONS[section](selected_company_id)
@@ -4,7 +4,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import sys
 sys.path.append('..')
-from db_connection import get_fund_list, get_fund_portfolio
+from data_store import get_fund_list, get_fund_portfolio, get_fund_latest
 
 st.title("📊 Fund Overview")
 
@@ -137,24 +137,54 @@ if portfolio_df is not None and not portfolio_df.empty:
     
     st.subheader("Fund-Level Summary")
     
-    total_companies = len(portfolio_df)
-    total_revenue = portfolio_df['latest_revenue'].sum()
-    total_ebitda = portfolio_df['latest_ebitda'].sum()
-    avg_margin = portfolio_df['ebitda_margin'].mean()
+    latest_df = get_fund_latest(selected_fund_id)
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Total Companies", total_companies)
-    
-    with col2:
-        st.metric("Total Revenue", f"€{total_revenue:.1f}M")
-    
-    with col3:
-        st.metric("Total EBITDA", f"€{total_ebitda:.1f}M")
-    
-    with col4:
-        st.metric("Avg EBITDA Margin", f"{avg_margin:.1f}%")
+    if latest_df is not None and not latest_df.empty:
+        latest = latest_df.iloc[0]
+        
+        # Totals cover each company's latest reported month
+        first_month = pd.Timestamp(latest['first_date']).strftime('%Y-%m')
+        last_month = pd.Timestamp(latest['last_date']).strftime('%Y-%m')
+        if first_month == last_month:
+            st.caption(f"As of {last_month}")
+        else:
+            st.caption(f"Each company's latest reported month, {first_month} to {last_month}")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Total Companies", int(latest['company_count']))
+        
+        with col2:
+            st.metric("Total Revenue", 
+                     f"€{latest['total_revenue']:.1f}M" if pd.notna(latest['total_revenue']) else "N/A")
+        
+        with col3:
+            st.metric("Total EBITDA", 
+                     f"€{latest['total_ebitda']:.1f}M" if pd.notna(latest['total_ebitda']) else "N/A")
+        
+        with col4:
+            st.metric("Avg EBITDA Margin", 
+                     f"{latest['avg_ebitda_margin']:.1f}%" if pd.notna(latest['avg_ebitda_margin']) else "N/A")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("LTM Revenue", 
+                     f"€{latest['total_ltm_revenue']:.1f}M" if pd.notna(latest['total_ltm_revenue']) else "N/A")
+        
+        with col2:
+            st.metric("LTM EBITDA Margin", 
+                     f"{latest['ltm_ebitda_margin']:.1f}%" if pd.notna(latest['ltm_ebitda_margin']) else "N/A")
+        
+        with col3:
+            st.metric("Median Net Leverage", 
+                     f"{latest['median_net_leverage']:.2f}x" if pd.notna(latest['median_net_leverage']) else "N/A")
+        
+        with col4:
+            st.metric("Companies Flagged", f"{int(latest['flagged_company_count'])} / {int(latest['company_count'])}")
+    else:
+        st.info("No fund summary available")
     
 else:
     st.warning("No portfolio data available for this fund")
@@ -0,0 +1,110 @@
+import streamlit as st
+import pandas as pd
+import sys
+sys.path.append('..')
+from data_store import get_fund_list, get_current_risk_alerts
+
+SEVERITY_ORDER = ['high', 'medium', 'low']
+
+SOURCE_LABELS = {
+    'financials': 'Financials',
+    'kpi': 'KPI',
+    'budget': 'Budget',
+}
+
+st.title("🚨 Risk Alerts")
+
+# Set dark mode permanently
+st._config.set_option('theme.base', 'dark')
+
+with st.sidebar:
+    st.header("Filters")
+
+    funds_df = get_fund_list()
+
+    fund_options = {"All funds": None}
+    if funds_df is not None:
+        fund_options.update({f"{row['fund_name']} ({row['vintage_year']})": row['fund_id']
+                             for _, row in funds_df.iterrows()})
+
+    selected_fund_label = st.selectbox(
+        "Select Fund",
+        options=list(fund_options.keys()),
+        index=0
+    )
+
+    selected_severities = st.multiselect(
+        "Severity",
+        options=SEVERITY_ORDER,
+        default=SEVERITY_ORDER
+    )
+
+alerts_df = get_current_risk_alerts(fund_options[selected_fund_label])
+
+if alerts_df is None:
+    st.error("No risk alert data available")
+    st.stop()
+
+alerts_df = alerts_df[alerts_df['severity'].isin(selected_severities)]
+
+st.caption("Risk rules breached in each company's latest reported month")
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.metric("Companies Flagged", alerts_df['company_id'].nunique())
+
+with col2:
+    st.metric("Active Alerts", len(alerts_df))
+
+with col3:
+    st.metric("High Severity", int((alerts_df['severity'] == 'high').sum()))
+
+st.divider()
+
+if alerts_df.empty:
+    st.success("✅ No active risk alerts")
+    st.stop()
+
+display_df = alerts_df.assign(
+    severity=pd.Categorical(alerts_df['severity'], categories=SEVERITY_ORDER, ordered=True),
+    source=alerts_df['source'].map(SOURCE_LABELS),
+    condition=alerts_df['operator'] + ' ' + alerts_df['threshold'].astype('float64').map('{:g}'.format),
+    metric_value=alerts_df['metric_value'].astype('float64'),
+).sort_values(['severity', 'company_name', 'source', 'rule_id'])
+
+display_df = display_df[[
+    'severity',
+    'company_name',
+    'industry',
+    'date',
+    'source',
+    'kpi_name',
+    'rule_id',
+    'metric',
+    'metric_value',
+    'condition',
+]]
+
+display_df.columns = [
+    'Severity',
+    'Company',
+    'Industry',
+    'Month',
+    'Source',
+    'KPI',
+    'Rule',
+    'Metric',
+    'Value',
+    'Threshold',
+]
+
+st.dataframe(
+    display_df,
+    width='stretch',
+    hide_index=True,
+    column_config={
+        "Month": st.column_config.DateColumn(format="YYYY-MM"),
+        "Value": st.column_config.NumberColumn(format="%.2f"),
+    }
+)
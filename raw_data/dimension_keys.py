@@ -0,0 +1,108 @@
+"""
+PE Portfolio Monitoring - Dimension Key Resolver
+Set-based natural key -> surrogate key resolution with an in-process cache
+"""
+
+import threading
+
+import pandas as pd
+
+# Dimension table -> (natural key column, surrogate key column)
+DIMENSIONS = {
+    'dim_kpi': ('kpi_name', 'kpi_id'),
+    'dim_company': ('company_id', 'company_id'),
+    'dim_fund': ('fund_id', 'fund_id'),
+}
+
+class DimensionKeyCache:
+    """Natural key -> surrogate key maps shared by all loaders in the process.
+
+    Misses are resolved for a whole batch of names in one round trip: a
+    lookup join, or with create=True an INSERT ... ON CONFLICT DO NOTHING
+    RETURNING combined with a lookup of the keys that already existed.
+    """
+
+    def __init__(self):
+        self._keys = {dimension: {} for dimension in DIMENSIONS}
+        self._lock = threading.Lock()
+
+    def prime(self, dimension, natural_keys):
+        """Record keys known to exist (for dimensions keyed by their natural key)"""
+        natural_column, surrogate_column = DIMENSIONS[dimension]
+        assert natural_column == surrogate_column, f"{dimension} has a generated surrogate key"
+        with self._lock:
+            self._keys[dimension].update((key, key) for key in natural_keys if pd.notna(key))
+
+    def clear(self):
+        """Forget all cached keys"""
+        with self._lock:
+            for keys in self._keys.values():
+                keys.clear()
+
+    def resolve(self, cursor, dimension, natural_keys, create=False):
+        """Return {natural_key: surrogate_key} for the given natural keys.
+
+        Keys that are not in the dimension (and not created) are omitted.
+        """
+        # Keep first-seen order so new surrogate keys follow the source order
+        wanted = [key for key in dict.fromkeys(natural_keys) if pd.notna(key)]
+        with self._lock:
+            cached = self._keys[dimension]
+            missing = [key for key in wanted if key not in cached]
+
+        if missing:
+            found = self._fetch(cursor, dimension, missing, create)
+            # Names inserted by a concurrent, uncommitted transaction are
+            # invisible to the first statement; a second statement sees them
+            # once that transaction has committed
+            still_missing = [key for key in missing if key not in found]
+            if create and still_missing:
+                found.update(self._fetch(cursor, dimension, still_missing, create=False))
+            with self._lock:
+                cached.update(found)
+
+        with self._lock:
+            return {key: cached[key] for key in wanted if key in cached}
+
+    def _fetch(self, cursor, dimension, natural_keys, create):
+        """Resolve a batch of uncached keys in a single statement"""
+        natural_column, surrogate_column = DIMENSIONS[dimension]
+        lookup = f"""
+            SELECT d.{natural_column}, d.{surrogate_column}
+            FROM raw_data.{dimension} d
+            JOIN input i ON d.{natural_column} = i.natural_key
+        """
+
+        if create:
+            query = f"""
+                WITH input AS (
+                    SELECT * FROM unnest(%s::text[]) WITH ORDINALITY AS t (natural_key, position)
+                ),
+                inserted AS (
+                    INSERT INTO raw_data.{dimension} ({natural_column})
+                    SELECT natural_key FROM input
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM raw_data.{dimension} d
+                        WHERE d.{natural_column} = input.natural_key
+                    )
+                    ORDER BY position
+                    ON CONFLICT ({natural_column}) DO NOTHING
+                    RETURNING {natural_column}, {surrogate_column}
+                )
+                SELECT {natural_column}, {surrogate_column} FROM inserted
+                UNION ALL
+                {lookup}
+            """
+        else:
+            query = f"""
+                WITH input AS (
+                    SELECT * FROM unnest(%s::text[]) AS t (natural_key)
+                )
+                {lookup}
+            """
+
+        cursor.execute(query, (list(natural_keys),))
+        return dict(cursor.fetchall())
+
+# Shared by every loader in the ETL process
+dimension_keys = DimensionKeyCache()
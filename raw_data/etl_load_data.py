@@ -3,13 +3,25 @@ PE Portfolio Monitoring - ETL Script
 Loads data from Excel into PostgreSQL star schema
 """
 
+import numpy as np
 import pandas as pd
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from datetime import datetime, timedelta
+import argparse
+import io
 import os
 from dotenv import load_dotenv
 import sys
+import time
+
+from dimension_keys import dimension_keys
+from etl_runs import record_run
+from etl_scheduler import LoadStep, print_timings, run_steps
+from etl_state import ensure_state_table, save_state, select_delta
+from sheet_exports import DEFAULT_CHUNK_SIZE, find_exports, iter_chunks
+from workbook_reader import DEFAULT_CACHE_DIR, ENGINES, read_workbook
 
 # Load environment variables
 load_dotenv()
@@ -34,6 +46,14 @@ def get_db_connection():
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
+def get_connection_pool(size):
+    """Thread-safe pool with one connection per concurrent load step"""
+    try:
+        return ThreadedConnectionPool(1, size, **DB_CONFIG)
+    except Exception as e:
+        print(f"Error connecting to database: {e}")
+        sys.exit(1)
+
 def generate_date_dimension(start_year=2023, end_year=2024):
     """Generate date dimension for monthly periods"""
     dates = []
@@ -76,109 +96,358 @@ def generate_date_dimension(start_year=2023, end_year=2024):
     
     return pd.DataFrame(dates)
 
-def year_month_to_date_id(year_month_str):
-    """Convert YYYY-MM string to date_id (YYYYMMDD format)"""
-    if pd.isna(year_month_str):
-        return None
-    try:
-        date = datetime.strptime(str(year_month_str), '%Y-%m')
-        return int(date.strftime('%Y%m%d'))
-    except:
-        return None
+# ============================================
+# COLUMN MAPS
+# ============================================
+# Each target table is described by an ordered list of
+# (target_column, source_column, cast) entries. The order matches the
+# column list of the corresponding INSERT statement.
+
+COMPANY_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('company_name', 'CompanyName', 'raw'),
+    ('legal_name', 'LegalName', 'raw'),
+    ('industry', 'Industry', 'raw'),
+    ('subindustry', 'Subindustry', 'raw'),
+    ('hq_city', 'HQ_City', 'raw'),
+    ('hq_country', 'HQ_Country', 'raw'),
+    ('website', 'Website', 'raw'),
+    ('founded_year', 'FoundedYear', 'int'),
+    ('employees', 'Employees', 'int'),
+]
+
+FUND_COLUMNS = [
+    ('fund_id', 'FundID', 'raw'),
+    ('fund_name', 'FundName', 'raw'),
+    ('vintage_year', 'VintageYear', 'int'),
+]
+
+DATE_COLUMNS = [
+    ('date_id', 'date_id', 'raw'),
+    ('date', 'date', 'raw'),
+    ('year', 'year', 'raw'),
+    ('month', 'month', 'raw'),
+    ('quarter', 'quarter', 'raw'),
+    ('year_month', 'year_month', 'raw'),
+    ('month_name', 'month_name', 'raw'),
+    ('day_of_week', 'day_of_week', 'raw'),
+    ('is_month_end', 'is_month_end', 'raw'),
+    ('is_quarter_end', 'is_quarter_end', 'raw'),
+    ('is_year_end', 'is_year_end', 'raw'),
+]
+
+INVESTMENT_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('fund_id', 'FundID', 'raw'),
+    ('investment_date', 'InvestmentDate', 'date'),
+    ('ownership_type', 'OwnershipType', 'raw'),
+]
+
+FINANCIALS_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('date_id', 'YearMonth', 'year_month'),
+    ('revenue', 'Revenue', 'float'),
+    ('cogs', 'COGS', 'float'),
+    ('gross_profit', 'GrossProfit', 'float'),
+    ('ebitda', 'EBITDA', 'float'),
+    ('depreciation', 'Depreciation', 'float'),
+    ('amortization', 'Amortization', 'float'),
+    ('ebita', 'EBITA', 'float'),
+    ('ebit', 'EBIT', 'float'),
+    ('net_income', 'NetIncome', 'float'),
+    ('cash_from_ops', 'CashFromOps', 'float'),
+    ('capex', 'Capex', 'float'),
+    ('ebitda_margin_pct', 'EBITDA_Margin_%', 'float'),
+    ('working_capital', 'WorkingCapital', 'float'),
+    ('net_debt', 'NetDebt', 'float'),
+    ('currency', 'Currency', 'raw'),
+]
+
+KPI_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('date_id', 'YearMonth', 'year_month'),
+    ('kpi_id', 'kpi_id', 'int'),
+    ('kpi_value', 'KPI_Value', 'float'),
+]
+
+BUDGET_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('fiscal_year', 'FiscalYear', 'int'),
+    ('currency', 'Currency', 'raw'),
+    ('revenue_budget', 'Revenue_Budget', 'float'),
+    ('cogs_budget', 'COGS_Budget', 'float'),
+    ('gross_profit_budget', 'GrossProfit_Budget', 'float'),
+    ('ebitda_budget', 'EBITDA_Budget', 'float'),
+    ('depreciation_budget', 'Depreciation_Budget', 'float'),
+    ('amortization_budget', 'Amortization_Budget', 'float'),
+    ('ebita_budget', 'EBITA_Budget', 'float'),
+    ('ebit_budget', 'EBIT_Budget', 'float'),
+    ('net_income_budget', 'NetIncome_Budget', 'float'),
+    ('cash_from_ops_budget', 'CashFromOps_Budget', 'float'),
+    ('capex_budget', 'Capex_Budget', 'float'),
+    ('working_capital_budget', 'WorkingCapital_Budget', 'float'),
+    ('net_debt_budget', 'NetDebt_Budget', 'float'),
+]
+
+COMMENT_COLUMNS = [
+    ('company_id', 'CompanyID', 'raw'),
+    ('date_id', 'CommentDate', 'month_start'),
+    ('author', 'Author', 'raw'),
+    ('role', 'Role', 'raw'),
+    ('comment_text', 'Comment', 'raw'),
+]
+
+# ============================================
+# VECTORIZED ROW PREPARATION
+# ============================================
+
+def _to_python_objects(values, mask):
+    """Convert a NumPy array to Python scalars, with None where mask is False"""
+    objects = values.astype(object)
+    objects[~mask] = None
+    return objects
+
+def _cast_raw(series):
+    """Pass values through unchanged, NaN -> NULL"""
+    return _to_python_objects(series.to_numpy(dtype=object), series.notna().to_numpy())
+
+def _cast_float(series):
+    """Cast a column to float, NaN -> NULL"""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+    return _to_python_objects(values, ~np.isnan(values))
+
+def _cast_int(series):
+    """Cast a column to int (truncating like int()), NaN -> NULL"""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+    mask = ~np.isnan(values)
+    return _to_python_objects(np.where(mask, values, 0).astype('int64'), mask)
+
+def _cast_date(series):
+    """Parse a column to datetime.date, unparseable -> NULL"""
+    dates = pd.to_datetime(series, errors='coerce', format='mixed')
+    return _to_python_objects(dates.dt.date.to_numpy(dtype=object), dates.notna().to_numpy())
+
+def _date_ids(dates):
+    """date_id (YYYYMMDD of the first day of month) for a datetime Series"""
+    values = (dates.dt.year * 10000 + dates.dt.month * 100 + 1).to_numpy(dtype='float64')
+    mask = dates.notna().to_numpy()
+    return _to_python_objects(np.where(mask, values, 0).astype('int64'), mask)
+
+def _cast_year_month(series):
+    """Convert YYYY-MM strings to date_id, invalid -> NULL"""
+    dates = pd.to_datetime(series.astype(str), format='%Y-%m', errors='coerce')
+    return _date_ids(dates)
+
+def _cast_month_start(series):
+    """Convert dates to the date_id of their first day of month, invalid -> NULL"""
+    return _date_ids(pd.to_datetime(series, errors='coerce', format='mixed'))
+
+COLUMN_CASTS = {
+    'raw': _cast_raw,
+    'float': _cast_float,
+    'int': _cast_int,
+    'date': _cast_date,
+    'year_month': _cast_year_month,
+    'month_start': _cast_month_start,
+}
+
+def prepare_frame(df, columns, required=()):
+    """Cast source columns to target columns in one pass per column.
+
+    Returns an object-dtype DataFrame holding Python scalars (None for NULL),
+    with rows dropped where any of the `required` target columns is NULL.
+    Missing optional source columns become all-NULL columns.
+    """
+    prepared = {}
+    for target, source, cast in columns:
+        if source in df.columns:
+            prepared[target] = COLUMN_CASTS[cast](df[source])
+        else:
+            prepared[target] = np.full(len(df), None, dtype=object)
+
+    frame = pd.DataFrame(prepared, columns=[target for target, _, _ in columns])
+
+    if required:
+        keep = np.ones(len(frame), dtype=bool)
+        for target in required:
+            keep &= frame[target].notna().to_numpy()
+        frame = frame[keep]
+
+    return frame
+
+def prepare_rows(df, columns, required=()):
+    """Prepare a list of insert-ready tuples"""
+    frame = prepare_frame(df, columns, required)
+    return list(frame.itertuples(index=False, name=None))
+
+# ============================================
+# WRITE PATHS
+# ============================================
+
+BULK_MODES = ('values', 'copy')
+
+LOAD_MODES = ('full', 'incremental')
+
+def copy_csv(frame):
+    """CSV text of a prepared frame for COPY ... FROM STDIN (FORMAT csv).
+
+    NULL is an unquoted empty field, COPY's CSV default, and every other
+    value is quoted, so no text value (not even '' or '\\N') reads as NULL.
+    """
+    if frame.empty:
+        return ''
+    lines = None
+    for column in frame.columns:
+        values = frame[column]
+        quoted = '"' + values.astype(str).str.replace('"', '""', regex=False) + '"'
+        field = quoted.where(values.notna(), '')
+        lines = field if lines is None else lines + ',' + field
+    return '\n'.join(lines) + '\n'
+
+def _conflict_clause(columns, conflict_columns, on_conflict='nothing'):
+    """ON CONFLICT clause for the target's natural key (if any).
+
+    With on_conflict='update' existing rows are overwritten, but only when a
+    value actually differs, so unchanged rows produce no new row versions.
+    """
+    if not conflict_columns:
+        return ""
+    
+    keys = ', '.join(conflict_columns)
+    update_columns = [column for column in columns if column not in conflict_columns]
+    if on_conflict == 'nothing' or not update_columns:
+        return f"ON CONFLICT ({keys}) DO NOTHING"
+    
+    assignments = ', '.join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    current = ', '.join(f"target.{column}" for column in update_columns)
+    incoming = ', '.join(f"EXCLUDED.{column}" for column in update_columns)
+    return f"""ON CONFLICT ({keys}) DO UPDATE SET {assignments}
+        WHERE ({current}) IS DISTINCT FROM ({incoming})"""
+
+def copy_frame(cursor, table, frame, conflict_columns=None, on_conflict='nothing'):
+    """Stream a prepared frame through COPY into a temp staging table,
+    then merge it into raw_data.<table> with the same ON CONFLICT semantics"""
+    columns = ', '.join(frame.columns)
+    staging_table = f"staging_{table}"
+    
+    cursor.execute(f"""
+        CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+        SELECT {columns} FROM raw_data.{table} WITH NO DATA
+    """)
+    
+    buffer = io.StringIO(copy_csv(frame))
+    cursor.copy_expert(f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    
+    cursor.execute(f"""
+        INSERT INTO raw_data.{table} AS target ({columns})
+        SELECT {columns} FROM {staging_table}
+        {_conflict_clause(frame.columns, conflict_columns, on_conflict)}
+    """)
+
+def insert_frame(cursor, table, frame, conflict_columns=None, bulk_mode='values',
+                 on_conflict='nothing'):
+    """Write a prepared frame into raw_data.<table> using the selected bulk mode"""
+    if frame.empty:
+        return
+    
+    # A row may only be updated once per statement
+    if conflict_columns and on_conflict == 'update':
+        frame = frame.drop_duplicates(subset=list(conflict_columns), keep='last')
+    
+    if bulk_mode == 'copy':
+        copy_frame(cursor, table, frame, conflict_columns, on_conflict)
+        return
+    
+    insert_query = f"""
+        INSERT INTO raw_data.{table} AS target ({', '.join(frame.columns)})
+        VALUES %s
+        {_conflict_clause(frame.columns, conflict_columns, on_conflict)}
+    """
+    execute_values(cursor, insert_query, list(frame.itertuples(index=False, name=None)))
+
+def drop_unknown_keys(cursor, frame, column, dimension):
+    """Drop rows whose key is not in the dimension (resolved from the shared key cache)"""
+    known = dimension_keys.resolve(cursor, dimension, frame[column].unique())
+    is_known = frame[column].isin(list(known))
+    if not is_known.all():
+        print(f"Skipped {int((~is_known).sum())} rows with unknown {column}")
+    return frame[is_known.to_numpy()]
+
+def write_fact_frame(conn, table, frame, conflict_columns, sheet_name, period_column,
+                     bulk_mode='values', incremental=False):
+    """Write a prepared fact frame; in incremental mode only new or changed rows
+    are upserted and the sheet's watermarks are advanced in the same transaction"""
+    cursor = conn.cursor()
+    
+    frame = drop_unknown_keys(cursor, frame, 'company_id', 'dim_company')
+    
+    if incremental:
+        frame, new_state, rewritten_companies = select_delta(cursor, sheet_name, frame, period_column)
+        # Facts without a natural key are replaced for every company written in full
+        if not conflict_columns and rewritten_companies:
+            cursor.execute(
+                f"DELETE FROM raw_data.{table} WHERE company_id = ANY(%s)",
+                (rewritten_companies,)
+            )
+    
+    insert_frame(cursor, table, frame, conflict_columns, bulk_mode,
+                 on_conflict='update' if incremental else 'nothing')
+    
+    if incremental:
+        save_state(cursor, sheet_name, new_state)
+    conn.commit()
+    return len(frame)
+
+# ============================================
+# LOADERS
+# ============================================
 
-def load_dimension_companies(conn, df_companies):
+def load_dimension_companies(conn, df_companies, on_conflict='nothing'):
     """Load company dimension"""
     print("Loading dim_company...")
     
     cursor = conn.cursor()
     
     # Prepare data
-    companies_data = []
-    for _, row in df_companies.iterrows():
-        companies_data.append((
-            row['CompanyID'],
-            row['CompanyName'],
-            row.get('LegalName'),
-            row.get('Industry'),
-            row.get('Subindustry'),
-            row.get('HQ_City'),
-            row.get('HQ_Country'),
-            row.get('Website'),
-            int(row['FoundedYear']) if pd.notna(row.get('FoundedYear')) else None,
-            int(row['Employees']) if pd.notna(row.get('Employees')) else None
-        ))
+    companies = prepare_frame(df_companies, COMPANY_COLUMNS)
     
     # Insert data
-    insert_query = """
-        INSERT INTO raw_data.dim_company (company_id, company_name, legal_name, industry, 
-                                 subindustry, hq_city, hq_country, website, 
-                                 founded_year, employees)
-        VALUES %s
-        ON CONFLICT (company_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, companies_data)
+    insert_frame(cursor, 'dim_company', companies, conflict_columns=('company_id',),
+                 on_conflict=on_conflict)
     conn.commit()
-    print(f"Loaded {len(companies_data)} companies")
+    dimension_keys.prime('dim_company', companies['company_id'])
+    print(f"Loaded {len(companies)} companies")
 
-def load_dimension_funds(conn, df_funds):
+def load_dimension_funds(conn, df_funds, on_conflict='nothing'):
     """Load fund dimension"""
     print("Loading dim_fund...")
     
     cursor = conn.cursor()
     
     # Prepare data
-    funds_data = []
-    for _, row in df_funds.iterrows():
-        funds_data.append((
-            row['FundID'],
-            row['FundName'],
-            int(row['VintageYear']) if pd.notna(row.get('VintageYear')) else None
-        ))
+    funds = prepare_frame(df_funds, FUND_COLUMNS)
     
     # Insert data
-    insert_query = """
-        INSERT INTO raw_data.dim_fund (fund_id, fund_name, vintage_year)
-        VALUES %s
-        ON CONFLICT (fund_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, funds_data)
+    insert_frame(cursor, 'dim_fund', funds, conflict_columns=('fund_id',),
+                 on_conflict=on_conflict)
     conn.commit()
-    print(f"Loaded {len(funds_data)} funds")
+    dimension_keys.prime('dim_fund', funds['fund_id'])
+    print(f"Loaded {len(funds)} funds")
 
-def load_dimension_date(conn, df_date):
+def load_dimension_date(conn, df_date, on_conflict='nothing'):
     """Load date dimension"""
     print("Loading dim_date...")
     
     cursor = conn.cursor()
     
     # Prepare data
-    date_data = []
-    for _, row in df_date.iterrows():
-        date_data.append((
-            row['date_id'],
-            row['date'],
-            row['year'],
-            row['month'],
-            row['quarter'],
-            row['year_month'],
-            row['month_name'],
-            row['day_of_week'],
-            row['is_month_end'],
-            row['is_quarter_end'],
-            row['is_year_end']
-        ))
+    dates = prepare_frame(df_date, DATE_COLUMNS)
     
     # Insert data
-    insert_query = """
-        INSERT INTO raw_data.dim_date (date_id, date, year, month, quarter, year_month,
-                              month_name, day_of_week, is_month_end, 
-                              is_quarter_end, is_year_end)
-        VALUES %s
-        ON CONFLICT (date_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, date_data)
+    insert_frame(cursor, 'dim_date', dates, conflict_columns=('date_id',),
+                 on_conflict=on_conflict)
     conn.commit()
-    print(f"Loaded {len(date_data)} date records")
+    print(f"Loaded {len(dates)} date records")
 
 def load_dimension_kpis(conn, df_kpis):
     """Load KPI dimension from unique KPI names"""
@@ -186,235 +455,239 @@ def load_dimension_kpis(conn, df_kpis):
     
     cursor = conn.cursor()
     
-    # Get unique KPI names
-    unique_kpis = df_kpis['KPI_Name'].dropna().unique()
-    
-    # Insert data
-    for kpi_name in unique_kpis:
-        cursor.execute("""
-            INSERT INTO raw_data.dim_kpi (kpi_name)
-            VALUES (%s)
-            ON CONFLICT (kpi_name) DO NOTHING
-        """, (kpi_name,))
+    # Get unique KPI names (in source order, across all chunks)
+    unique_kpis = list(dict.fromkeys(
+        name
+        for chunk in iter_chunks(df_kpis, columns=['KPI_Name'])
+        for name in chunk['KPI_Name'].dropna()
+    ))
     
+    # Insert new names and cache every kpi_id in one round trip
+    dimension_keys.resolve(cursor, 'dim_kpi', unique_kpis, create=True)
     conn.commit()
     print(f"Loaded {len(unique_kpis)} unique KPIs")
 
-def load_dimension_investments(conn, df_investments):
+def load_dimension_investments(conn, df_investments, on_conflict='nothing'):
     """Load investment dimension (company-fund relationships)"""
     print("Loading dim_investment...")
     
     cursor = conn.cursor()
     
-    # Prepare data
-    investments_data = []
-    for _, row in df_investments.iterrows():
-        # Convert investment date to actual date (not date_id)
-        try:
-            inv_date = pd.to_datetime(row['InvestmentDate']).date()
-        except:
-            inv_date = None
-        
-        investments_data.append((
-            row['CompanyID'],
-            row['FundID'],
-            inv_date,
-            row.get('OwnershipType')
-        ))
+    # Prepare data (investment date kept as an actual date, not a date_id)
+    investments = prepare_frame(df_investments, INVESTMENT_COLUMNS)
+    investments = drop_unknown_keys(cursor, investments, 'company_id', 'dim_company')
+    investments = drop_unknown_keys(cursor, investments, 'fund_id', 'dim_fund')
     
     # Insert data
-    insert_query = """
-        INSERT INTO raw_data.dim_investment (company_id, fund_id, investment_date, ownership_type)
-        VALUES %s
-        ON CONFLICT (company_id, fund_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, investments_data)
+    insert_frame(cursor, 'dim_investment', investments, conflict_columns=('company_id', 'fund_id'),
+                 on_conflict=on_conflict)
     conn.commit()
-    print(f"Loaded {len(investments_data)} investments")
+    print(f"Loaded {len(investments)} investments")
 
-def load_fact_financials(conn, df_financials):
+def load_fact_financials(conn, df_financials, bulk_mode='values', incremental=False):
     """Load financial facts"""
     print("Loading fact_financials_monthly...")
     
-    cursor = conn.cursor()
-    
-    # Prepare data
-    financials_data = []
-    for _, row in df_financials.iterrows():
-        date_id = year_month_to_date_id(row.get('YearMonth'))
-        if date_id is None:
-            continue
+    loaded = 0
+    for chunk in iter_chunks(df_financials):
+        # Prepare data (all source amounts are EUR)
+        financials = prepare_frame(
+            chunk.assign(Currency='EUR'), FINANCIALS_COLUMNS, required=('date_id',)
+        )
         
-        financials_data.append((
-            row['CompanyID'],
-            date_id,
-            float(row['Revenue']) if pd.notna(row.get('Revenue')) else None,
-            float(row['COGS']) if pd.notna(row.get('COGS')) else None,
-            float(row['GrossProfit']) if pd.notna(row.get('GrossProfit')) else None,
-            float(row['EBITDA']) if pd.notna(row.get('EBITDA')) else None,
-            float(row['Depreciation']) if pd.notna(row.get('Depreciation')) else None,
-            float(row['Amortization']) if pd.notna(row.get('Amortization')) else None,
-            float(row['EBITA']) if pd.notna(row.get('EBITA')) else None,
-            float(row['EBIT']) if pd.notna(row.get('EBIT')) else None,
-            float(row['NetIncome']) if pd.notna(row.get('NetIncome')) else None,
-            float(row['CashFromOps']) if pd.notna(row.get('CashFromOps')) else None,
-            float(row['Capex']) if pd.notna(row.get('Capex')) else None,
-            float(row['EBITDA_Margin_%']) if pd.notna(row.get('EBITDA_Margin_%')) else None,
-            float(row['WorkingCapital']) if pd.notna(row.get('WorkingCapital')) else None,
-            float(row['NetDebt']) if pd.notna(row.get('NetDebt')) else None,
-            'EUR'
-        ))
-    
-    # Insert data
-    insert_query = """
-        INSERT INTO raw_data.fact_financials_monthly 
-        (company_id, date_id, revenue, cogs, gross_profit, ebitda, depreciation,
-         amortization, ebita, ebit, net_income, cash_from_ops, capex, 
-         ebitda_margin_pct, working_capital, net_debt, currency)
-        VALUES %s
-        ON CONFLICT (company_id, date_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, financials_data)
-    conn.commit()
-    print(f"Loaded {len(financials_data)} financial records")
+        # Insert data
+        loaded += write_fact_frame(conn, 'fact_financials_monthly', financials,
+                                   conflict_columns=('company_id', 'date_id'),
+                                   sheet_name='Financials_Monthly', period_column='date_id',
+                                   bulk_mode=bulk_mode, incremental=incremental)
+    print(f"Loaded {loaded} financial records")
 
-def load_fact_kpis(conn, df_kpis):
+def load_fact_kpis(conn, df_kpis, bulk_mode='values', incremental=False):
     """Load KPI facts"""
     print("Loading fact_kpis_monthly...")
     
     cursor = conn.cursor()
     
-    # First, get KPI ID mapping
-    cursor.execute("SELECT kpi_id, kpi_name FROM raw_data.dim_kpi")
-    kpi_mapping = {row[1]: row[0] for row in cursor.fetchall()}
-    
-    # Prepare data
-    kpis_data = []
-    for _, row in df_kpis.iterrows():
-        date_id = year_month_to_date_id(row.get('YearMonth'))
-        kpi_name = row.get('KPI_Name')
+    loaded = 0
+    for chunk in iter_chunks(df_kpis):
+        # First, get KPI ID mapping (served from the key cache after load_dimension_kpis)
+        kpi_mapping = dimension_keys.resolve(cursor, 'dim_kpi', chunk['KPI_Name'].unique())
         
-        if date_id is None or kpi_name is None or kpi_name not in kpi_mapping:
-            continue
+        # Prepare data (rows with an unknown KPI name or period are skipped)
+        kpis = prepare_frame(
+            chunk.assign(kpi_id=chunk['KPI_Name'].map(kpi_mapping)),
+            KPI_COLUMNS,
+            required=('date_id', 'kpi_id')
+        )
         
-        kpis_data.append((
-            row['CompanyID'],
-            date_id,
-            kpi_mapping[kpi_name],
-            float(row['KPI_Value']) if pd.notna(row.get('KPI_Value')) else None
-        ))
-    
-    # Insert data
-    insert_query = """
-        INSERT INTO raw_data.fact_kpis_monthly (company_id, date_id, kpi_id, kpi_value)
-        VALUES %s
-        ON CONFLICT (company_id, date_id, kpi_id) DO NOTHING
-    """
-    execute_values(cursor, insert_query, kpis_data)
-    conn.commit()
-    print(f"Loaded {len(kpis_data)} KPI records")
+        # Insert data
+        loaded += write_fact_frame(conn, 'fact_kpis_monthly', kpis,
+                                   conflict_columns=('company_id', 'date_id', 'kpi_id'),
+                                   sheet_name='KPIs_Monthly', period_column='date_id',
+                                   bulk_mode=bulk_mode, incremental=incremental)
+    print(f"Loaded {loaded} KPI records")
 
-def load_fact_budget(conn, df_budget):
+def load_fact_budget(conn, df_budget, bulk_mode='values', incremental=False):
     """Load budget facts"""
     print("Loading fact_budget...")
     
-    cursor = conn.cursor()
-    
-    # Prepare data
-    budget_data = []
-    for _, row in df_budget.iterrows():
-        budget_data.append((
-            row['CompanyID'],
-            int(row['FiscalYear']) if pd.notna(row.get('FiscalYear')) else None,
-            row.get('Currency'),
-            float(row['Revenue_Budget']) if pd.notna(row.get('Revenue_Budget')) else None,
-            float(row['COGS_Budget']) if pd.notna(row.get('COGS_Budget')) else None,
-            float(row['GrossProfit_Budget']) if pd.notna(row.get('GrossProfit_Budget')) else None,
-            float(row['EBITDA_Budget']) if pd.notna(row.get('EBITDA_Budget')) else None,
-            float(row['Depreciation_Budget']) if pd.notna(row.get('Depreciation_Budget')) else None,
-            float(row['Amortization_Budget']) if pd.notna(row.get('Amortization_Budget')) else None,
-            float(row['EBITA_Budget']) if pd.notna(row.get('EBITA_Budget')) else None,
-            float(row['EBIT_Budget']) if pd.notna(row.get('EBIT_Budget')) else None,
-            float(row['NetIncome_Budget']) if pd.notna(row.get('NetIncome_Budget')) else None,
-            float(row['CashFromOps_Budget']) if pd.notna(row.get('CashFromOps_Budget')) else None,
-            float(row['Capex_Budget']) if pd.notna(row.get('Capex_Budget')) else None,
-            float(row['WorkingCapital_Budget']) if pd.notna(row.get('WorkingCapital_Budget')) else None,
-            float(row['NetDebt_Budget']) if pd.notna(row.get('NetDebt_Budget')) else None
-        ))
-    
-    # Insert data
-    insert_query = """
-        INSERT INTO raw_data.fact_budget 
-        (company_id, fiscal_year, currency, revenue_budget, cogs_budget,
-         gross_profit_budget, ebitda_budget, depreciation_budget, 
-         amortization_budget, ebita_budget, ebit_budget, net_income_budget,
-         cash_from_ops_budget, capex_budget, working_capital_budget, net_debt_budget)
-        VALUES %s
-        ON CONFLICT (company_id, fiscal_year) DO NOTHING
-    """
-    execute_values(cursor, insert_query, budget_data)
-    conn.commit()
-    print(f"Loaded {len(budget_data)} budget records")
+    loaded = 0
+    for chunk in iter_chunks(df_budget):
+        # Prepare data
+        budget = prepare_frame(chunk, BUDGET_COLUMNS, required=('fiscal_year',))
+        
+        # Insert data
+        loaded += write_fact_frame(conn, 'fact_budget', budget,
+                                   conflict_columns=('company_id', 'fiscal_year'),
+                                   sheet_name='Annual_Budget', period_column='fiscal_year',
+                                   bulk_mode=bulk_mode, incremental=incremental)
+    print(f"Loaded {loaded} budget records")
 
-def load_fact_comments(conn, df_comments):
+def load_fact_comments(conn, df_comments, bulk_mode='values', incremental=False):
     """Load comment facts"""
     print("Loading fact_comments...")
     
-    cursor = conn.cursor()
-    
-    # Prepare data
-    comments_data = []
-    for _, row in df_comments.iterrows():
-        try:
-            comment_date = pd.to_datetime(row['CommentDate'])
-            # Use first day of month
-            date_id = int(datetime(comment_date.year, comment_date.month, 1).strftime('%Y%m%d'))
-        except:
-            continue
+    loaded = 0
+    for chunk in iter_chunks(df_comments):
+        # Prepare data (comments are attached to the first day of their month)
+        comments = prepare_frame(chunk, COMMENT_COLUMNS, required=('date_id',))
         
-        comments_data.append((
-            row['CompanyID'],
-            date_id,
-            row['Author'],
-            row.get('Role'),
-            row.get('Comment')
-        ))
+        # Insert data (comments have no natural key)
+        loaded += write_fact_frame(conn, 'fact_comments', comments, conflict_columns=None,
+                                   sheet_name='Comments', period_column='date_id',
+                                   bulk_mode=bulk_mode, incremental=incremental)
+    print(f"Loaded {loaded} comments")
+
+def build_load_steps(dfs, df_date, bulk_mode='values', incremental=False):
+    """Load steps with their dimension dependencies: facts only wait for the
+    dimensions they reference, so independent steps can run concurrently.
     
-    # Insert data
-    insert_query = """
-        INSERT INTO raw_data.fact_comments (company_id, date_id, author, role, comment_text)
-        VALUES %s
+    Fact sheets may be DataFrames or SheetExports; the latter are streamed
+    chunk by chunk with a commit per chunk.
     """
-    execute_values(cursor, insert_query, comments_data)
-    conn.commit()
-    print(f"Loaded {len(comments_data)} comments")
+    on_conflict = 'update' if incremental else 'nothing'
+    return [
+        LoadStep('dim_company', lambda conn: load_dimension_companies(conn, dfs['Companies'], on_conflict)),
+        LoadStep('dim_fund', lambda conn: load_dimension_funds(conn, dfs['Funds'], on_conflict)),
+        LoadStep('dim_date', lambda conn: load_dimension_date(conn, df_date)),
+        LoadStep('dim_kpi', lambda conn: load_dimension_kpis(conn, dfs['KPIs_Monthly'])),
+        LoadStep('dim_investment',
+                 lambda conn: load_dimension_investments(conn, dfs['Investments'], on_conflict),
+                 depends_on=('dim_company', 'dim_fund')),
+        LoadStep('fact_financials_monthly',
+                 lambda conn: load_fact_financials(conn, dfs['Financials_Monthly'], bulk_mode, incremental),
+                 depends_on=('dim_company', 'dim_date')),
+        LoadStep('fact_kpis_monthly',
+                 lambda conn: load_fact_kpis(conn, dfs['KPIs_Monthly'], bulk_mode, incremental),
+                 depends_on=('dim_company', 'dim_date', 'dim_kpi')),
+        LoadStep('fact_budget',
+                 lambda conn: load_fact_budget(conn, dfs['Annual_Budget'], bulk_mode, incremental),
+                 depends_on=('dim_company',)),
+        LoadStep('fact_comments',
+                 lambda conn: load_fact_comments(conn, dfs['Comments'], bulk_mode, incremental),
+                 depends_on=('dim_company', 'dim_date')),
+    ]
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Load the portfolio workbook into PostgreSQL")
+    parser.add_argument(
+        '--bulk-mode',
+        choices=BULK_MODES,
+        default='values',
+        help="How fact rows are written: multi-row INSERT (values) or COPY via a staging table (copy)"
+    )
+    parser.add_argument(
+        '--mode',
+        choices=LOAD_MODES,
+        default='full',
+        help="full: insert every row, keeping existing ones; "
+             "incremental: upsert only rows that are new or changed since the last incremental run"
+    )
+    parser.add_argument(
+        '--excel-engine',
+        choices=ENGINES,
+        default='calamine',
+        help="Engine used to parse the workbook"
+    )
+    parser.add_argument(
+        '--read-workers',
+        type=int,
+        default=None,
+        help="Processes used to parse sheets in parallel (default: one per CPU, at most one per sheet)"
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help="Directory for the per-sheet Parquet cache, keyed by workbook hash"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Always parse the workbook, bypassing the Parquet cache"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Load steps run concurrently, each on its own database connection"
+    )
+    parser.add_argument(
+        '--source-dir',
+        default=None,
+        help="Stream fact sheets from CSV/Parquet exports in this directory "
+             "(<Sheet>.parquet or <Sheet>.csv) instead of reading the workbook"
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows read, prepared and committed per batch when streaming from --source-dir"
+    )
+    args = parser.parse_args()
+    if args.source_dir and args.mode == 'incremental':
+        # Change detection hashes each company's full history, which needs the whole sheet
+        parser.error("--source-dir streams sheets in chunks and only supports --mode full")
+    return args
 
 def main():
     """Main ETL process"""
+    args = parse_args()
+    
     print("=" * 60)
     print("PE Portfolio Monitoring - ETL Process")
     print("=" * 60)
     
-    # Load Excel data
-    print("\n1. Reading Excel file...")
-    try:
-        dfs = pd.read_excel(EXCEL_FILE, sheet_name=None)
-        df_companies = dfs['Companies']
-        df_funds = dfs['Funds']
-        df_investments = dfs['Investments']
-        df_financials = dfs['Financials_Monthly']
-        df_kpis = dfs['KPIs_Monthly']
-        df_budget = dfs['Annual_Budget']
-        df_comments = dfs['Comments']
-        print("Excel file loaded successfully")
-    except Exception as e:
-        print(f"Error reading Excel file: {e}")
-        sys.exit(1)
+    # Load Excel data (or open the sheet exports for streaming)
+    if args.source_dir:
+        print(f"\n1. Opening sheet exports in {args.source_dir}...")
+        try:
+            dfs = find_exports(args.source_dir, chunk_size=args.chunk_size)
+            # Dimension sheets are small and read whole; fact sheets stay on disk
+            for sheet_name in ('Companies', 'Funds', 'Investments'):
+                dfs[sheet_name] = dfs[sheet_name].read()
+            print(f"Streaming fact sheets in chunks of {args.chunk_size} rows")
+        except Exception as e:
+            print(f"Error reading sheet exports: {e}")
+            sys.exit(1)
+    else:
+        print("\n1. Reading Excel file...")
+        try:
+            dfs = read_workbook(
+                EXCEL_FILE,
+                engine=args.excel_engine,
+                workers=args.read_workers,
+                cache_dir=None if args.no_cache else args.cache_dir
+            )
+            print("Excel file loaded successfully")
+        except Exception as e:
+            print(f"Error reading Excel file: {e}")
+            sys.exit(1)
     
     # Connect to database
     print("\n2. Connecting to PostgreSQL...")
-    conn = get_db_connection()
-    print("Connected to database")
+    pool = get_connection_pool(args.workers)
+    print(f"Connected to database (pool of up to {args.workers} connections)")
     
     try:
         # Generate date dimension
@@ -422,20 +695,31 @@ def main():
         df_date = generate_date_dimension(2023, 2025)
         print(f"Generated {len(df_date)} date records")
         
-        # Load dimensions
-        print("\n4. Loading dimension tables...")
-        load_dimension_companies(conn, df_companies)
-        load_dimension_funds(conn, df_funds)
-        load_dimension_date(conn, df_date)
-        load_dimension_kpis(conn, df_kpis)
-        load_dimension_investments(conn, df_investments)
+        incremental = args.mode == 'incremental'
+        if incremental:
+            conn = pool.getconn()
+            ensure_state_table(conn)
+            pool.putconn(conn)
+        
+        # Load dimensions, then facts, as a dependency graph
+        print(f"\n4. Loading tables with {args.workers} worker(s)...")
+        print(f"Load mode: {args.mode}, bulk mode: {args.bulk_mode}")
+        started_at = datetime.now()
+        start = time.perf_counter()
+        timings = run_steps(
+            build_load_steps(dfs, df_date, args.bulk_mode, incremental),
+            pool,
+            workers=args.workers
+        )
+        print_timings(timings, time.perf_counter() - start)
         
-        # Load facts
-        print("\n5. Loading fact tables...")
-        load_fact_financials(conn, df_financials)
-        load_fact_kpis(conn, df_kpis)
-        load_fact_budget(conn, df_budget)
-        load_fact_comments(conn, df_comments)
+        # Bump the data version so dashboard caches refresh
+        conn = pool.getconn()
+        try:
+            run_id = record_run(conn, args.mode, started_at)
+        finally:
+            pool.putconn(conn)
+        print(f"Recorded ETL run {run_id}")
         
         print("\n" + "=" * 60)
         print("ETL Process Completed Successfully!")
@@ -443,11 +727,10 @@ def main():
         
     except Exception as e:
         print(f"\nError during ETL process: {e}")
-        conn.rollback()
         raise
     finally:
-        conn.close()
-        print("\nDatabase connection closed.")
+        pool.closeall()
+        print("\nDatabase connections closed.")
 
 if __name__ == "__main__":
     main()
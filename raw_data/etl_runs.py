@@ -0,0 +1,32 @@
+"""
+PE Portfolio Monitoring - ETL Run Log
+Records each finished ETL run and notifies listeners that the data changed
+"""
+
+import uuid
+
+# Channel shared with the dbt on-run-end hook; the dashboard LISTENs on it
+NOTIFY_CHANNEL = 'data_version'
+
+RUN_LOG_DDL = """
+    CREATE TABLE IF NOT EXISTS raw_data.etl_run_log (
+        run_id VARCHAR(64) PRIMARY KEY,
+        mode VARCHAR(20) NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        finished_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+def record_run(conn, mode, started_at):
+    """Log a finished run and NOTIFY in the same transaction; returns the run id"""
+    run_id = uuid.uuid4().hex
+    cursor = conn.cursor()
+    cursor.execute(RUN_LOG_DDL)
+    cursor.execute("""
+        INSERT INTO raw_data.etl_run_log (run_id, mode, started_at)
+        VALUES (%s, %s, %s)
+    """, (run_id, mode, started_at))
+    # Delivered on commit, so listeners never see a run that rolled back
+    cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, f"etl:{run_id}"))
+    conn.commit()
+    return run_id
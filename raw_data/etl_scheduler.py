@@ -0,0 +1,94 @@
+"""
+PE Portfolio Monitoring - ETL Scheduler
+Runs load steps as a dependency graph on a thread pool, each step on its
+own pooled database connection
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+@dataclass
+class LoadStep:
+    """A unit of load work: func(conn) runs once all depends_on steps succeeded"""
+    name: str
+    func: object
+    depends_on: tuple = field(default_factory=tuple)
+
+def _validate(steps):
+    """Reject unknown dependencies and cycles before anything runs"""
+    names = {step.name for step in steps}
+    for step in steps:
+        unknown = set(step.depends_on) - names
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown steps: {sorted(unknown)}")
+
+    remaining = {step.name: set(step.depends_on) for step in steps}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between steps: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+def _run_step(step, pool):
+    """Run one step on a pooled connection and return its duration"""
+    conn = pool.getconn()
+    start = time.perf_counter()
+    try:
+        step.func(conn)
+        return time.perf_counter() - start
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+def run_steps(steps, pool, workers=1):
+    """Execute steps in dependency order with up to `workers` running concurrently.
+
+    Returns {step name: seconds}. If a step fails, no further steps are
+    started, running steps are allowed to finish and the error is re-raised.
+    """
+    _validate(steps)
+
+    pending = {step.name: step for step in steps}
+    done = set()
+    timings = {}
+    running = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='etl') as executor:
+        while pending or running:
+            if error is None:
+                ready = [step for step in pending.values() if done.issuperset(step.depends_on)]
+                for step in ready:
+                    del pending[step.name]
+                    running[executor.submit(_run_step, step, pool)] = step.name
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    timings[name] = future.result()
+                    done.add(name)
+                    print(f"[{name}] done in {timings[name]:.2f}s")
+                except Exception as e:
+                    print(f"[{name}] failed: {e}")
+                    error = error or e
+
+    if error is not None:
+        raise error
+    return timings
+
+def print_timings(timings, wall_time):
+    """Per-step timing summary"""
+    print("\nStep timings:")
+    for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"  {name:<28}{seconds:>8.2f}s")
+    print(f"  {'total (wall clock)':<28}{wall_time:>8.2f}s")
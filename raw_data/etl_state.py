@@ -0,0 +1,120 @@
+"""
+PE Portfolio Monitoring - Incremental ETL State
+Per-sheet, per-company watermarks used to load only new or changed rows
+"""
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+STATE_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS raw_data.etl_state (
+        sheet_name VARCHAR(50) NOT NULL,
+        company_id VARCHAR(50) NOT NULL,
+        last_period INTEGER NOT NULL,
+        content_hash VARCHAR(16) NOT NULL,
+        changed_from_period INTEGER,
+        updated_at TIMESTAMP NOT NULL DEFAULT now(),
+        PRIMARY KEY (sheet_name, company_id)
+    )
+"""
+
+def ensure_state_table(conn):
+    """Create the ETL state table on databases initialised before it existed"""
+    cursor = conn.cursor()
+    cursor.execute(STATE_TABLE_DDL)
+    conn.commit()
+
+def read_state(cursor, sheet_name):
+    """Watermark and content hash per company for one sheet"""
+    cursor.execute("""
+        SELECT company_id, last_period, content_hash
+        FROM raw_data.etl_state
+        WHERE sheet_name = %s
+    """, (sheet_name,))
+    return pd.DataFrame(
+        cursor.fetchall(), columns=['company_id', 'last_period', 'content_hash']
+    ).set_index('company_id')
+
+def _hash_hex(values):
+    """Format uint64 hashes as fixed-width hex strings"""
+    return np.array([f"{value:016x}" for value in values.tolist()], dtype=object)
+
+def select_delta(cursor, sheet_name, frame, period_column):
+    """Split a prepared frame into the rows that need to be written.
+
+    For each company the rows up to the stored watermark are hashed and
+    compared with the stored content hash:
+      - no stored state:   every row is new
+      - history unchanged: only rows after the watermark are written
+      - history changed:   every row of the company is written (corrections)
+
+    Returns (delta_frame, state_frame, rewritten_companies) where state_frame
+    holds the new watermark rows for companies that had a delta, and
+    rewritten_companies lists companies whose rows are all being written.
+    """
+    state = read_state(cursor, sheet_name)
+
+    companies = frame['company_id']
+    periods = frame[period_column].astype('int64')
+    row_hashes = pd.util.hash_pandas_object(frame, index=False)
+
+    # Rows at or before the stored watermark form the company's loaded history
+    watermark = companies.map(state['last_period']).astype('float64')
+    is_history = (periods <= watermark).to_numpy()
+    history_hashes = row_hashes.where(is_history, np.uint64(0)).astype('uint64')
+
+    # Order-independent per-company hashes (uint64 sums wrap around)
+    summary = pd.DataFrame({
+        'full_hash': row_hashes.groupby(companies.to_numpy()).sum(),
+        'history_hash': history_hashes.groupby(companies.to_numpy()).sum(),
+        'last_period': periods.groupby(companies.to_numpy()).max(),
+    })
+    summary['full_hash'] = _hash_hex(summary['full_hash'])
+    summary['history_hash'] = _hash_hex(summary['history_hash'])
+    summary = summary.join(state.rename(columns={
+        'last_period': 'stored_period', 'content_hash': 'stored_hash'
+    }))
+
+    is_new = summary['stored_hash'].isna()
+    is_unchanged = (summary['full_hash'] == summary['stored_hash']) & \
+                   (summary['last_period'] == summary['stored_period'])
+    is_changed = ~is_new & (summary['history_hash'] != summary['stored_hash'])
+
+    rewritten_companies = summary.index[is_new | is_changed].tolist()
+    rewrite_all = companies.isin(rewritten_companies).to_numpy()
+    appended = ~is_history & companies.isin(summary.index[~is_unchanged]).to_numpy()
+    delta = frame[rewrite_all | appended]
+
+    is_appended = ~is_new & ~is_changed & ~is_unchanged
+    print(f"Incremental: {int(is_new.sum())} new, {int(is_appended.sum())} appended, "
+          f"{int(is_changed.sum())} changed, {int(is_unchanged.sum())} unchanged companies; "
+          f"{len(delta)} of {len(frame)} rows to write")
+
+    delta_periods = delta[period_column].astype('int64')
+    new_state = summary.loc[~is_unchanged, ['last_period', 'full_hash']].join(
+        delta_periods.groupby(delta['company_id'].to_numpy()).min().rename('changed_from_period')
+    )
+    new_state = new_state[new_state['changed_from_period'].notna()]
+
+    return delta, new_state, rewritten_companies
+
+def save_state(cursor, sheet_name, new_state):
+    """Upsert watermarks for the companies written in this run"""
+    if new_state.empty:
+        return
+
+    state_data = [
+        (sheet_name, company_id, int(row.last_period), row.full_hash, int(row.changed_from_period))
+        for company_id, row in zip(new_state.index, new_state.itertuples(index=False))
+    ]
+    execute_values(cursor, """
+        INSERT INTO raw_data.etl_state
+        (sheet_name, company_id, last_period, content_hash, changed_from_period, updated_at)
+        VALUES %s
+        ON CONFLICT (sheet_name, company_id) DO UPDATE SET
+            last_period = EXCLUDED.last_period,
+            content_hash = EXCLUDED.content_hash,
+            changed_from_period = EXCLUDED.changed_from_period,
+            updated_at = EXCLUDED.updated_at
+    """, state_data, template="(%s, %s, %s, %s, %s, now())")
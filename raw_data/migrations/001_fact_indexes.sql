@@ -0,0 +1,31 @@
+-- PE Portfolio Monitoring Database - Migration 001
+-- Secondary indexes on the fact tables for existing databases
+-- (schema.sql creates the same indexes on fresh installs)
+--
+-- The UNIQUE constraints already provide btree indexes on
+-- fact_financials_monthly (company_id, date_id),
+-- fact_kpis_monthly (company_id, date_id, kpi_id) and
+-- fact_budget (company_id, fiscal_year), so those are not duplicated here.
+
+-- Joins to dim_date and period filters
+CREATE INDEX IF NOT EXISTS idx_fact_financials_monthly_date_id
+    ON raw_data.fact_financials_monthly (date_id);
+
+CREATE INDEX IF NOT EXISTS idx_fact_kpis_monthly_date_id
+    ON raw_data.fact_kpis_monthly (date_id);
+
+CREATE INDEX IF NOT EXISTS idx_fact_comments_date_id
+    ON raw_data.fact_comments (date_id);
+
+-- Per-KPI series lookups, answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_fact_kpis_monthly_kpi_company_date
+    ON raw_data.fact_kpis_monthly (kpi_id, company_id, date_id)
+    INCLUDE (kpi_value);
+
+-- Comments have no natural key, so no constraint index covers company filters
+CREATE INDEX IF NOT EXISTS idx_fact_comments_company_date
+    ON raw_data.fact_comments (company_id, date_id);
+
+ANALYZE raw_data.fact_financials_monthly;
+ANALYZE raw_data.fact_kpis_monthly;
+ANALYZE raw_data.fact_comments;
@@ -0,0 +1,158 @@
+-- PE Portfolio Monitoring Database - Migration 002 (optional)
+-- Range-partitions the monthly fact tables by year of date_id
+--
+-- Each table is rebuilt as a partitioned table with one partition per year
+-- found in dim_date or in the data, plus a DEFAULT partition for anything
+-- else. Columns, defaults, sequences, constraints, indexes and the table
+-- comment are carried over; the primary key gains date_id because unique
+-- constraints on a partitioned table must include the partition key.
+-- Tables that are already partitioned are left unchanged.
+--
+-- When dim_date is extended to a new year, add its partitions with e.g.
+--   SELECT raw_data.create_year_partition('fact_financials_monthly', 2026);
+
+-- ============================================
+-- PARTITION MAINTENANCE
+-- ============================================
+
+CREATE OR REPLACE FUNCTION raw_data.create_year_partition(p_table TEXT, p_year INTEGER)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_partition TEXT := format('%s_y%s', p_table, p_year);
+    v_default TEXT := format('%s_default', p_table);
+    v_from INTEGER := p_year * 10000 + 101;
+    v_to INTEGER := (p_year + 1) * 10000 + 101;
+BEGIN
+    IF to_regclass(format('raw_data.%I', v_partition)) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE raw_data.%I (LIKE raw_data.%I INCLUDING DEFAULTS)',
+        v_partition, p_table
+    );
+
+    -- Rows of this year that landed in the default partition move to the new one
+    IF to_regclass(format('raw_data.%I', v_default)) IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (
+                 DELETE FROM raw_data.%I WHERE date_id >= %s AND date_id < %s RETURNING *
+             )
+             INSERT INTO raw_data.%I SELECT * FROM moved',
+            v_default, v_from, v_to, v_partition
+        );
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE raw_data.%I ATTACH PARTITION raw_data.%I FOR VALUES FROM (%s) TO (%s)',
+        p_table, v_partition, v_from, v_to
+    );
+END;
+$$;
+
+-- ============================================
+-- CONVERSION
+-- ============================================
+
+CREATE OR REPLACE FUNCTION raw_data.partition_fact_table_by_year(p_table TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_old TEXT := p_table || '_unpartitioned';
+    v_comment TEXT;
+    v_pk_name TEXT;
+    v_pk_columns TEXT;
+    v_sequences TEXT[];
+    v_sequence_owners TEXT[];
+    v_constraints TEXT[];
+    v_indexes TEXT[];
+    v_year INTEGER;
+    v_statement TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = format('raw_data.%I', p_table)::regclass) = 'p' THEN
+        RAISE NOTICE '% is already partitioned', p_table;
+        RETURN;
+    END IF;
+
+    -- Capture everything that has to be recreated on the new table
+    SELECT obj_description(format('raw_data.%I', p_table)::regclass, 'pg_class') INTO v_comment;
+
+    SELECT c.conname, string_agg(quote_ident(a.attname), ', ' ORDER BY k.ord)
+    INTO v_pk_name, v_pk_columns
+    FROM pg_constraint c
+    CROSS JOIN unnest(c.conkey) WITH ORDINALITY AS k (attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.conrelid = format('raw_data.%I', p_table)::regclass AND c.contype = 'p'
+    GROUP BY c.conname;
+
+    SELECT array_agg(format('ALTER TABLE raw_data.%I ADD CONSTRAINT %I %s',
+                            p_table, conname, pg_get_constraintdef(oid)) ORDER BY contype DESC, conname)
+    INTO v_constraints
+    FROM pg_constraint
+    WHERE conrelid = format('raw_data.%I', p_table)::regclass AND contype IN ('u', 'f');
+
+    SELECT array_agg(pg_get_indexdef(i.indexrelid))
+    INTO v_indexes
+    FROM pg_index i
+    WHERE i.indrelid = format('raw_data.%I', p_table)::regclass
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid);
+
+    SELECT array_agg(s.seq),
+           array_agg(format('ALTER SEQUENCE %s OWNED BY raw_data.%I.%I', s.seq, p_table, a.attname))
+    INTO v_sequences, v_sequence_owners
+    FROM pg_attribute a
+    CROSS JOIN LATERAL pg_get_serial_sequence(format('raw_data.%I', p_table), a.attname) AS s (seq)
+    WHERE a.attrelid = format('raw_data.%I', p_table)::regclass AND a.attnum > 0
+      AND NOT a.attisdropped AND s.seq IS NOT NULL;
+
+    -- Build the partitioned table next to the old one and copy the rows
+    EXECUTE format('ALTER TABLE raw_data.%I RENAME TO %I', p_table, v_old);
+    EXECUTE format(
+        'CREATE TABLE raw_data.%I (LIKE raw_data.%I INCLUDING DEFAULTS) PARTITION BY RANGE (date_id)',
+        p_table, v_old
+    );
+    EXECUTE format(
+        'CREATE TABLE raw_data.%I PARTITION OF raw_data.%I DEFAULT',
+        p_table || '_default', p_table
+    );
+
+    FOR v_year IN EXECUTE format(
+        'SELECT date_id / 10000 FROM raw_data.dim_date
+         UNION
+         SELECT date_id / 10000 FROM raw_data.%I
+         ORDER BY 1',
+        v_old
+    )
+    LOOP
+        PERFORM raw_data.create_year_partition(p_table, v_year);
+    END LOOP;
+
+    EXECUTE format('INSERT INTO raw_data.%I SELECT * FROM raw_data.%I', p_table, v_old);
+
+    -- Keep the serial sequences alive when the old table is dropped
+    FOR v_statement IN SELECT unnest(coalesce(v_sequences, '{}')) LOOP
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', v_statement);
+    END LOOP;
+    EXECUTE format('DROP TABLE raw_data.%I', v_old);
+
+    -- Constraints and indexes under their original names
+    EXECUTE format('ALTER TABLE raw_data.%I ADD CONSTRAINT %I PRIMARY KEY (%s, date_id)',
+                   p_table, v_pk_name, v_pk_columns);
+    FOR v_statement IN SELECT unnest(coalesce(v_constraints, '{}') || coalesce(v_indexes, '{}')) LOOP
+        EXECUTE v_statement;
+    END LOOP;
+
+    FOR v_statement IN SELECT unnest(coalesce(v_sequence_owners, '{}')) LOOP
+        EXECUTE v_statement;
+    END LOOP;
+
+    EXECUTE format('COMMENT ON TABLE raw_data.%I IS %L', p_table, v_comment);
+    EXECUTE format('ANALYZE raw_data.%I', p_table);
+END;
+$$;
+
+SELECT raw_data.partition_fact_table_by_year('fact_financials_monthly');
+SELECT raw_data.partition_fact_table_by_year('fact_kpis_monthly');
@@ -6,6 +6,8 @@
 CREATE SCHEMA IF NOT EXISTS raw_data;
 
 -- Drop existing tables if they exist (in reverse dependency order)
+DROP TABLE IF EXISTS raw_data.etl_run_log CASCADE;
+DROP TABLE IF EXISTS raw_data.etl_state CASCADE;
 DROP TABLE IF EXISTS raw_data.fact_comments CASCADE;
 DROP TABLE IF EXISTS raw_data.fact_budget CASCADE;
 DROP TABLE IF EXISTS raw_data.fact_kpis_monthly CASCADE;
@@ -151,6 +153,47 @@ CREATE TABLE raw_data.fact_comments (
     FOREIGN KEY (date_id) REFERENCES raw_data.dim_date(date_id)
 );
 
+-- ============================================
+-- INDEXES
+-- ============================================
+-- (company_id, date_id) lookups on financials and KPIs use the UNIQUE
+-- constraint indexes; existing databases get these via migrations/001
+
+-- Joins to dim_date and period filters
+CREATE INDEX idx_fact_financials_monthly_date_id ON raw_data.fact_financials_monthly (date_id);
+CREATE INDEX idx_fact_kpis_monthly_date_id ON raw_data.fact_kpis_monthly (date_id);
+CREATE INDEX idx_fact_comments_date_id ON raw_data.fact_comments (date_id);
+
+-- Per-KPI series lookups, answered from the index alone
+CREATE INDEX idx_fact_kpis_monthly_kpi_company_date
+    ON raw_data.fact_kpis_monthly (kpi_id, company_id, date_id) INCLUDE (kpi_value);
+
+-- Company filters on comments
+CREATE INDEX idx_fact_comments_company_date ON raw_data.fact_comments (company_id, date_id);
+
+-- ============================================
+-- ETL STATE
+-- ============================================
+
+-- Incremental load watermarks (one row per sheet and company)
+CREATE TABLE raw_data.etl_state (
+    sheet_name VARCHAR(50) NOT NULL,
+    company_id VARCHAR(50) NOT NULL,
+    last_period INTEGER NOT NULL,
+    content_hash VARCHAR(16) NOT NULL,
+    changed_from_period INTEGER,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (sheet_name, company_id)
+);
+
+-- One row per finished ETL run (the dashboard's data version)
+CREATE TABLE raw_data.etl_run_log (
+    run_id VARCHAR(64) PRIMARY KEY,
+    mode VARCHAR(20) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
 -- ============================================
 -- COMMENTS FOR DOCUMENTATION
 -- ============================================
@@ -165,3 +208,5 @@ COMMENT ON TABLE raw_data.fact_financials_monthly IS 'Fact table containing mont
 COMMENT ON TABLE raw_data.fact_kpis_monthly IS 'Fact table containing monthly KPI values (varies by company)';
 COMMENT ON TABLE raw_data.fact_budget IS 'Fact table containing annual budget data';
 COMMENT ON TABLE raw_data.fact_comments IS 'Fact table containing portfolio company comments and notes';
+COMMENT ON TABLE raw_data.etl_state IS 'Incremental ETL watermarks: last loaded period (date_id, or fiscal year for Annual_Budget) and content hash per sheet and company';
+COMMENT ON TABLE raw_data.etl_run_log IS 'Finished ETL runs; each insert is announced on the data_version NOTIFY channel';
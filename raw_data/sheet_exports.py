@@ -0,0 +1,87 @@
+"""
+PE Portfolio Monitoring - Sheet Exports
+CSV/Parquet exports of the workbook sheets, read in fixed-size chunks so
+large fact sheets are loaded with bounded memory
+
+Usage (export the workbook once):
+    python sheet_exports.py "portfolio_monitoring_case_data (1).xlsx" exports/ --format parquet
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from workbook_reader import SHEETS, read_workbook
+
+EXPORT_FORMATS = ('parquet', 'csv')
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+@dataclass
+class SheetExport:
+    """One exported sheet, read lazily in chunks of chunk_size rows"""
+    path: str
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    def chunks(self, columns=None):
+        """Yield DataFrames of at most chunk_size rows"""
+        if self.path.endswith('.parquet'):
+            parquet_file = pq.ParquetFile(self.path)
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.path, usecols=columns, chunksize=self.chunk_size)
+
+    def read(self):
+        """The whole sheet as one DataFrame (for small dimension sheets)"""
+        if self.path.endswith('.parquet'):
+            return pd.read_parquet(self.path)
+        return pd.read_csv(self.path)
+
+def iter_chunks(source, columns=None):
+    """Chunks of a sheet given either as a DataFrame (one chunk) or a SheetExport"""
+    if isinstance(source, pd.DataFrame):
+        yield source if columns is None else source[columns]
+    else:
+        yield from source.chunks(columns)
+
+def find_exports(source_dir, sheets=SHEETS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return {sheet_name: SheetExport}, preferring Parquet over CSV"""
+    exports = {}
+    for sheet_name in sheets:
+        for export_format in EXPORT_FORMATS:
+            path = os.path.join(source_dir, f"{sheet_name}.{export_format}")
+            if os.path.exists(path):
+                exports[sheet_name] = SheetExport(path, chunk_size)
+                break
+        else:
+            raise FileNotFoundError(
+                f"No export of sheet {sheet_name} in {source_dir} "
+                f"(expected {sheet_name}.parquet or {sheet_name}.csv)"
+            )
+    return exports
+
+def export_workbook(path, out_dir, export_format='parquet'):
+    """Write every sheet of the workbook to out_dir in the given format"""
+    os.makedirs(out_dir, exist_ok=True)
+    for sheet_name, df in read_workbook(path, cache_dir=None).items():
+        out_path = os.path.join(out_dir, f"{sheet_name}.{export_format}")
+        if export_format == 'parquet':
+            df.to_parquet(out_path, index=False)
+        else:
+            df.to_csv(out_path, index=False)
+        print(f"Exported {sheet_name} ({len(df)} rows) to {out_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the workbook sheets as CSV or Parquet files")
+    parser.add_argument('workbook')
+    parser.add_argument('out_dir')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='parquet')
+    args = parser.parse_args()
+    export_workbook(args.workbook, args.out_dir, args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+PE Portfolio Monitoring - Workbook Reader
+Parses the source workbook sheet by sheet in a process pool and caches
+each parsed sheet as Parquet, keyed by the workbook's content hash
+"""
+
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+SHEETS = (
+    'Companies',
+    'Funds',
+    'Investments',
+    'Financials_Monthly',
+    'KPIs_Monthly',
+    'Annual_Budget',
+    'Comments',
+)
+
+ENGINES = ('calamine', 'openpyxl')
+
+DEFAULT_CACHE_DIR = '.workbook_cache'
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of the file contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_sheet(path, sheet_name, engine='calamine'):
+    """Parse a single sheet (runs in a worker process)"""
+    return pd.read_excel(path, sheet_name=sheet_name, engine=engine)
+
+def _cache_path(cache_dir, cache_key, sheet_name):
+    return os.path.join(cache_dir, cache_key, f"{sheet_name}.parquet")
+
+def _load_cached(cache_dir, cache_key, sheets):
+    """Sheets already parsed for this workbook version"""
+    cached = {}
+    for sheet_name in sheets:
+        path = _cache_path(cache_dir, cache_key, sheet_name)
+        if os.path.exists(path):
+            cached[sheet_name] = pd.read_parquet(path)
+    return cached
+
+def _store_cached(cache_dir, cache_key, parsed):
+    """Write parsed sheets to the cache and drop caches of other workbook versions"""
+    os.makedirs(os.path.join(cache_dir, cache_key), exist_ok=True)
+    for entry in os.listdir(cache_dir):
+        if entry != cache_key:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+    for sheet_name, df in parsed.items():
+        path = _cache_path(cache_dir, cache_key, sheet_name)
+        try:
+            df.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            # e.g. a column mixing numbers and text; the sheet is simply re-parsed next run
+            print(f"Not caching sheet {sheet_name}: {e}")
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")
+
+def read_workbook(path, sheets=SHEETS, engine='calamine', workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Return {sheet_name: DataFrame} for the requested sheets.
+
+    Sheets found in the Parquet cache for this exact workbook (same content
+    hash and engine) are read from there; the rest are parsed in parallel,
+    one sheet per worker process. Pass cache_dir=None to disable the cache.
+    """
+    cache_key = f"{file_hash(path)}-{engine}" if cache_dir else None
+    dfs = _load_cached(cache_dir, cache_key, sheets) if cache_dir else {}
+
+    missing = [sheet_name for sheet_name in sheets if sheet_name not in dfs]
+    if missing:
+        workers = min(workers or os.cpu_count() or 1, len(missing))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = dict(zip(missing, pool.map(
+                    read_sheet, [path] * len(missing), missing, [engine] * len(missing)
+                )))
+        else:
+            parsed = {sheet_name: read_sheet(path, sheet_name, engine) for sheet_name in missing}
+
+        if cache_dir:
+            _store_cached(cache_dir, cache_key, parsed)
+        dfs.update(parsed)
+
+    print(f"Read {len(sheets)} sheets ({len(sheets) - len(missing)} from cache, "
+          f"{len(missing)} parsed with {engine})")
+    return {sheet_name: dfs[sheet_name] for sheet_name in sheets}
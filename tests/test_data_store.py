@@ -0,0 +1,120 @@
+"""
+Tests for pe_dashboard/data_store.py.
+
+The store is built from small in-memory frames, sorted the way
+PortfolioStore.load reads them, so no database is needed. The page getters
+are checked against plain filters of the loaded frames.
+
+Usage:
+    python -m pytest tests/
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pe_dashboard'))
+
+import data_store
+from data_store import DATASETS, PortfolioStore
+
+COMPANIES = ['C001', 'C002', 'C003']
+FUNDS = {'F1': ['C001', 'C003'], 'F2': ['C002']}
+DATES = pd.date_range('2024-01-01', periods=4, freq='MS').date
+
+def make_frames():
+    """One frame per dataset, ordered by key and order_by as the store loads them"""
+    monthly = pd.DataFrame(
+        [(c, d) for c in COMPANIES for d in DATES], columns=['company_id', 'date']
+    )
+    monthly['company_name'] = 'Company ' + monthly['company_id']
+    monthly['revenue'] = np.arange(len(monthly), dtype='float64')
+
+    kpis = monthly[['company_id', 'date']].merge(pd.DataFrame({'kpi_name': ['churn', 'nps']}), how='cross')
+    kpis['kpi_value'] = np.arange(len(kpis), dtype='float64')
+
+    comments = pd.DataFrame({
+        'company_id': ['C001', 'C001', 'C003'],
+        'comment_date': [DATES[2], DATES[0], DATES[1]],
+        'comment_text': ['later', 'earlier', 'only'],
+    })
+
+    portfolio = pd.DataFrame(
+        [(f, f'Fund {f}', 2020, c, f'Company {c}') for f, companies in FUNDS.items() for c in companies],
+        columns=['fund_id', 'fund_name', 'vintage_year', 'company_id', 'company_name'],
+    )
+
+    latest = pd.DataFrame({'fund_id': list(FUNDS), 'company_count': [2, 1]})
+
+    alerts = pd.DataFrame({
+        'company_id': ['C001', 'C002', 'C002', 'C003'],
+        'source': ['financials', 'budget', 'kpi', 'kpi'],
+        'rule_id': ['revenue_decline', 'budget_shortfall', 'high_churn', 'high_churn'],
+    })
+
+    return {
+        'financials': monthly,
+        'budget_variance': monthly.rename(columns={'revenue': 'variance_revenue_pct'}),
+        'kpis': kpis,
+        'comments': comments,
+        'fund_portfolio': portfolio,
+        'fund_latest': latest,
+        'risk_alerts': alerts,
+    }
+
+@pytest.fixture
+def store(monkeypatch):
+    store = PortfolioStore(make_frames(), 'dbt:test|etl:test')
+    monkeypatch.setattr(data_store, 'get_store', lambda: store)
+    return store
+
+def test_frames_cover_every_dataset():
+    assert set(make_frames()) == set(DATASETS)
+
+@pytest.mark.parametrize('getter, dataset', [
+    (data_store.get_company_financials, 'financials'),
+    (data_store.get_company_budget_variance, 'budget_variance'),
+    (data_store.get_company_kpis, 'kpis'),
+    (data_store.get_company_comments, 'comments'),
+])
+@pytest.mark.parametrize('company_id', COMPANIES)
+def test_company_getters_match_filtered_frames(store, getter, dataset, company_id):
+    frame = store.frames[dataset]
+    expected = frame[frame['company_id'] == company_id].reset_index(drop=True)
+    pd.testing.assert_frame_equal(getter(company_id), expected)
+
+def test_fund_getters_match_filtered_frames(store):
+    for fund_id in FUNDS:
+        for getter, dataset in ((data_store.get_fund_portfolio, 'fund_portfolio'),
+                                (data_store.get_fund_latest, 'fund_latest')):
+            frame = store.frames[dataset]
+            expected = frame[frame['fund_id'] == fund_id].reset_index(drop=True)
+            pd.testing.assert_frame_equal(getter(fund_id), expected)
+
+def test_unknown_key_is_empty_with_columns(store):
+    rows = data_store.get_company_financials('C999')
+    assert rows.empty
+    assert list(rows.columns) == list(store.frames['financials'].columns)
+
+def test_rows_share_data_with_store(store):
+    frame = store.frames['financials']
+    index = frame.index.copy()
+    rows = store.rows('financials', 'C002')
+    assert np.shares_memory(rows['revenue'].to_numpy(), frame['revenue'].to_numpy())
+    assert isinstance(rows.index, pd.RangeIndex) and rows.index[0] == 0
+    # Re-indexing the slice leaves the shared frame's index alone
+    pd.testing.assert_index_equal(frame.index, index)
+
+def test_current_risk_alerts_for_fund(store):
+    assert list(data_store.get_current_risk_alerts()['company_id']) == ['C001', 'C002', 'C002', 'C003']
+    alerts = data_store.get_current_risk_alerts('F1')
+    assert list(alerts['rule_id']) == ['revenue_decline', 'high_churn']
+    assert isinstance(alerts.index, pd.RangeIndex)
+
+def test_fund_and_company_lists(store):
+    assert list(data_store.get_fund_list()['fund_id']) == ['F1', 'F2']
+    assert list(data_store.get_company_list()['company_id']) == COMPANIES
+    assert list(data_store.get_company_list('F1')['company_id']) == ['C001', 'C003']
@@ -0,0 +1,184 @@
+"""
+Tests for pe_dashboard/metrics_engine.py.
+
+The unit tests need no database. test_parity_with_dbt_model runs the
+compiled stg_financials_enhanced model against the engine (as
+benchmarks/metrics_engine_parity.py does) and is skipped unless the database
+from .env is reachable and dbt is installed.
+
+Usage:
+    python -m pytest tests/
+"""
+
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'pe_dashboard'))
+sys.path.append(os.path.join(ROOT, 'benchmarks'))
+
+from metrics_engine import BASE_MEASURES, METRIC_COLUMNS, RISK_FLAGS, compute_metrics, round_half_away
+
+def make_base(companies, revenue=None, **measures):
+    """base_data-shaped rows: {company_id: (first month, months)} from January 2023.
+
+    revenue and any other BASE_MEASURES column can be given as one value per
+    row (in company, then date order); the rest default to 10.0.
+    """
+    frames = []
+    for company_id, (start, months) in companies.items():
+        dates = pd.date_range('2023-01-01', periods=start + months, freq='MS')[start:]
+        frames.append(pd.DataFrame({
+            'company_id': company_id,
+            'date': dates.date,
+            'year': dates.year,
+            'employees': 100.0,
+        }))
+    base = pd.concat(frames, ignore_index=True)
+    for name in BASE_MEASURES:
+        base[name] = 10.0
+    if revenue is not None:
+        measures['revenue'] = revenue
+    for name, values in measures.items():
+        base[name] = np.asarray(values, dtype='float64')
+    return base
+
+def column(metrics, company_id, name):
+    return metrics.loc[metrics['company_id'] == company_id, name].to_numpy()
+
+def test_lags_do_not_cross_companies():
+    # B starts a year after A; its first row must not lag into A's last
+    revenue = np.r_[np.arange(1.0, 25.0), np.arange(100.0, 114.0)]
+    metrics = compute_metrics(make_base({'A': (0, 24), 'B': (12, 14)}, revenue))
+
+    mom = column(metrics, 'B', 'revenue_mom_growth_pct')
+    assert np.isnan(mom[0])
+    assert mom[1] == 1.0
+
+    yoy = column(metrics, 'B', 'revenue_yoy_growth_pct')
+    assert np.isnan(yoy[:12]).all()
+    assert yoy[12] == 12.0
+
+def test_rows_sorted_by_company_and_date():
+    base = make_base({'A': (0, 3), 'B': (0, 3)})
+    shuffled = base.iloc[[4, 0, 5, 2, 3, 1]]
+    metrics = compute_metrics(shuffled)
+    assert list(metrics['company_id']) == ['A', 'A', 'A', 'B', 'B', 'B']
+    assert list(metrics['date']) == list(base['date'])
+
+def test_ltm_needs_twelve_rows():
+    metrics = compute_metrics(make_base({'A': (0, 14)}, np.arange(1.0, 15.0)))
+    ltm = column(metrics, 'A', 'ltm_revenue')
+    assert np.isnan(ltm[:11]).all()
+    assert ltm[11] == sum(range(1, 13))
+    assert ltm[13] == sum(range(3, 15))
+
+def test_ltm_skips_nulls_and_is_null_when_all_are():
+    revenue = np.arange(1.0, 14.0)
+    revenue[5] = np.nan
+    capex = np.full(13, np.nan)
+    metrics = compute_metrics(make_base({'A': (0, 13)}, revenue, capex=capex))
+    assert column(metrics, 'A', 'ltm_revenue')[11] == sum(range(1, 13)) - 6
+    assert np.isnan(column(metrics, 'A', 'ltm_capex')).all()
+
+def test_ytd_only_for_latest_year():
+    # 2023 and the first five months of 2024; YTD restarts in January
+    metrics = compute_metrics(make_base({'A': (0, 17)}, np.arange(1.0, 18.0)))
+    ytd = column(metrics, 'A', 'ytd_revenue')
+    assert np.isnan(ytd[:12]).all()
+    np.testing.assert_array_equal(ytd[12:], np.cumsum(np.arange(13.0, 18.0)))
+
+def test_ytd_latest_year_is_portfolio_wide():
+    # B stops in 2023: the latest year is 2024 for every company
+    metrics = compute_metrics(make_base({'A': (0, 14), 'B': (0, 12)}))
+    assert np.isnan(column(metrics, 'B', 'ytd_revenue')).all()
+
+@pytest.mark.parametrize('value, decimals, expected', [
+    (12.25, 1, 12.3),
+    (-12.25, 1, -12.3),
+    (2.5, 0, 3.0),
+    (-2.5, 0, -3.0),
+    (2.675, 2, 2.68),
+    (1.005, 2, 1.01),
+    (0.0, 2, 0.0),
+])
+def test_round_half_away_from_zero(value, decimals, expected):
+    assert round_half_away(np.array([value]), decimals)[0] == expected
+
+def test_cash_conversion_tie_rounds_away():
+    metrics = compute_metrics(make_base({'A': (0, 1)}, ebitda=[4.0], cash_from_ops=[0.49]))
+    assert column(metrics, 'A', 'cash_conversion_pct')[0] == 12.3
+
+def test_ratios_null_without_positive_denominator():
+    metrics = compute_metrics(make_base({'A': (0, 3)}, [10.0, 0.0, 5.0], ebitda=[0.0, -1.0, 2.0]))
+    assert np.isnan(column(metrics, 'A', 'gross_margin_pct')[1])
+    assert np.isnan(column(metrics, 'A', 'revenue_mom_growth_pct')[2])
+    assert np.isnan(column(metrics, 'A', 'cash_conversion_pct')[:2]).all()
+
+def test_null_metrics_raise_no_flags():
+    # First row: no previous month, no LTM, zero EBITDA -> every metric null
+    metrics = compute_metrics(make_base({'A': (0, 1)}, ebitda=[0.0]))
+    for flag in RISK_FLAGS:
+        assert not column(metrics, 'A', flag)[0]
+
+def test_flags_follow_rules():
+    revenue = [100.0, 80.0, 95.0]
+    cash_from_ops = [5.0, 10.0, 10.0]
+    metrics = compute_metrics(make_base({'A': (0, 3)}, revenue, cash_from_ops=cash_from_ops))
+    # -20% MoM breaches revenue_decline (< -10); +18.75% does not
+    np.testing.assert_array_equal(column(metrics, 'A', 'revenue_risk_flag'), [False, True, False])
+    # 50% cash conversion breaches weak_cash_conversion (< 70)
+    np.testing.assert_array_equal(column(metrics, 'A', 'liquidity_risk_flag'), [True, False, False])
+
+def test_flags_use_given_rules():
+    rules = pd.DataFrame({
+        'flag': ['revenue_risk_flag'],
+        'metric': ['revenue_mom_growth_pct'],
+        'operator': ['>='],
+        'threshold': [0.0],
+    })
+    metrics = compute_metrics(make_base({'A': (0, 3)}, [100.0, 80.0, 95.0]), rules)
+    np.testing.assert_array_equal(column(metrics, 'A', 'revenue_risk_flag'), [False, False, True])
+    assert not metrics['liquidity_risk_flag'].any()
+
+def test_existing_metric_columns_are_replaced():
+    base = make_base({'A': (0, 2)})
+    first = compute_metrics(base)
+    again = compute_metrics(first)
+    assert list(again.columns) == list(first.columns)
+    pd.testing.assert_frame_equal(again, first)
+
+def _database_available():
+    if shutil.which('dbt') is None:
+        return False
+    try:
+        import psycopg2
+        from db_connection import get_connection_string
+        psycopg2.connect(get_connection_string(), connect_timeout=3).close()
+        return True
+    except Exception:
+        return False
+
+@pytest.mark.skipif(not _database_available(), reason="needs the database from .env and dbt")
+def test_parity_with_dbt_model():
+    import psycopg2
+    from db_connection import get_connection_string
+    from metrics_engine_parity import compare, compile_model, run_model, synthetic_base
+
+    base = synthetic_base(60, 30)
+    conn = psycopg2.connect(get_connection_string())
+    try:
+        expected = run_model(conn.cursor(), base, compile_model())
+    finally:
+        conn.rollback()
+        conn.close()
+
+    differences = compare(expected, compute_metrics(base))
+    assert len(expected) == len(base)
+    assert {name: count for name, count in differences.items() if count} == {}
+    assert set(differences) == set(METRIC_COLUMNS)